@@ -6,14 +6,18 @@ Provides REST API endpoints for all core operations.
 import logging
 from typing import Optional, List, Dict, Any
 import os
+import hashlib
+import tempfile
 from datetime import datetime, timezone
 from uuid import uuid4
 import aiofiles
 import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
-from fastapi import FastAPI, File, UploadFile, HTTPException, BackgroundTasks, Request
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, File, UploadFile, HTTPException, BackgroundTasks, Request, Query
+from fastapi.responses import JSONResponse, Response, StreamingResponse, FileResponse
 from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.base import BaseHTTPMiddleware
@@ -32,8 +36,10 @@ from src.storage.repository import DatabaseRepository
 from src.services.service_orchestrator import (
     ProjectService, DocumentService, ExtractionService,
     ReviewService, ComparisonService, EvaluationService, TaskService,
-    DiffService, AnnotationService, ReExtractionService,
+    DiffService, AnnotationService, ReExtractionService, ChangeFeedService,
+    ExportService,
 )
+from src.services.table_snapshot import TableSnapshotStore
 
 # Setup logging
 logging.basicConfig(
@@ -134,20 +140,74 @@ app.add_middleware(RateLimitMiddleware, max_requests=200, window_seconds=60)
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./legal_review.db")
 repo = DatabaseRepository(DATABASE_URL)
 
+# Comparison tables are materialized per project; extraction and review
+# writes update them in place and the table, diff and exports read them
+table_snapshots = TableSnapshotStore(repo)
+
 project_service = ProjectService(repo)
 document_service = DocumentService(repo)
-extraction_service = ExtractionService(repo)
-review_service = ReviewService(repo)
-comparison_service = ComparisonService(repo)
+extraction_service = ExtractionService(repo, table_snapshots)
+review_service = ReviewService(repo, table_snapshots)
+comparison_service = ComparisonService(repo, table_snapshots)
 evaluation_service = EvaluationService(repo)
 task_service = TaskService(repo)
-diff_service = DiffService(repo)
-annotation_service = AnnotationService(repo)
-re_extraction_service = ReExtractionService(repo)
+diff_service = DiffService(repo, table_snapshots)
+annotation_service = AnnotationService(repo, table_snapshots)
+re_extraction_service = ReExtractionService(repo, table_snapshots)
+change_feed_service = ChangeFeedService(repo)
+export_service = ExportService(repo)
 
 # Global lock for document ingestion to prevent SQLite concurrency issues
 ingest_lock = asyncio.Lock()
 
+# Handlers never call the repository or services on the event loop. Short
+# calls go to the default thread pool with run_in_threadpool; table builds,
+# exports and diffs, which take seconds on large projects, go to this
+# separate pool so they cannot take all of the default pool's threads
+HEAVY_WORKERS = int(os.getenv("HEAVY_WORKERS", "4"))
+heavy_executor = ThreadPoolExecutor(max_workers=HEAVY_WORKERS, thread_name_prefix="heavy")
+
+
+async def run_heavy(func, *args, **kwargs):
+    """Run a slow synchronous call on the heavy pool and await its result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(heavy_executor, functools.partial(func, *args, **kwargs))
+
+
+# ==================== CONDITIONAL GET ====================
+
+# Project read views (table, diff, extractions, annotations, pending
+# reviews) are tagged with the project's revision, which every write to the
+# project bumps. A client or proxy that sends back the ETag it holds gets a
+# 304 without the view being computed.
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag."""
+    def opaque(tag: str) -> str:
+        tag = tag.strip()
+        return tag[2:] if tag.startswith('W/') else tag
+    candidates = [opaque(tag) for tag in if_none_match.split(',')]
+    return '*' in candidates or opaque(etag) in candidates
+
+
+async def check_project_etag(project_id: str, request: Request, response: Response) -> Optional[Response]:
+    """
+    Tag a project read view with the project's revision.
+
+    Returns a 304 response if the request's If-None-Match matches; the
+    handler returns it as is. Otherwise sets the ETag on response and returns
+    None. Unknown projects get no ETag.
+    """
+    revision = await run_in_threadpool(repo.get_project_revision, project_id)
+    if revision is None:
+        return None
+    headers = {"ETag": f'W/"{revision}"', "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
 
 # ==================== HEALTH CHECK ====================
 
@@ -166,7 +226,8 @@ async def health_check():
 async def create_project(request: ProjectCreateRequest):
     """Create a new project."""
     try:
-        project = project_service.create_project(
+        project = await run_in_threadpool(
+            project_service.create_project,
             name=request.name,
             description=request.description,
             field_template_id=request.field_template_id,
@@ -181,7 +242,7 @@ async def create_project(request: ProjectCreateRequest):
 async def get_project(project_id: str):
     """Get project information."""
     try:
-        project = project_service.get_project_info(project_id)
+        project = await run_in_threadpool(project_service.get_project_info, project_id)
         if not project:
             raise HTTPException(status_code=404, detail="Project not found")
         return project
@@ -194,7 +255,7 @@ async def get_project(project_id: str):
 async def list_projects(skip: int = 0, limit: int = 100):
     """List all projects."""
     try:
-        projects = project_service.list_projects(skip, limit)
+        projects = await run_in_threadpool(project_service.list_projects, skip, limit)
         return {
             "projects": projects,
             "total": len(projects),
@@ -208,7 +269,8 @@ async def list_projects(skip: int = 0, limit: int = 100):
 async def update_project(project_id: str, request: ProjectUpdateRequest):
     """Update project."""
     try:
-        project = project_service.update_project(
+        project = await run_in_threadpool(
+            project_service.update_project,
             project_id=project_id,
             name=request.name,
             description=request.description,
@@ -226,11 +288,12 @@ async def delete_project(project_id: str):
     """Delete project and all related data."""
     logger.info(f"Deleting project {project_id}")
     try:
-        deleted = repo.delete_project(project_id)
+        deleted = await run_in_threadpool(repo.delete_project, project_id)
         if not deleted:
             logger.warning(f"Project {project_id} not found for deletion")
             raise HTTPException(status_code=404, detail="Project not found")
         logger.info(f"Successfully deleted project {project_id}")
+        await run_in_threadpool(repo.delete_unreferenced_blobs)
         return {"status": "deleted", "project_id": project_id}
     except HTTPException:
         raise
@@ -254,26 +317,33 @@ async def upload_document(
         
         # Sanitize filename
         safe_filename = os.path.basename(file.filename)
-        file_path = os.path.join(upload_dir, safe_filename)
-        
-        # Handle duplicate filenames by appending timestamp
-        if os.path.exists(file_path):
-            name, ext = os.path.splitext(safe_filename)
-            timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-            file_path = os.path.join(upload_dir, f"{name}_{timestamp}{ext}")
-            
-        # Stream file to disk in chunks to avoid memory spikes
+        _, ext = os.path.splitext(safe_filename)
+
+        # Stream file to disk in chunks to avoid memory spikes, hashing as we go
         CHUNK_SIZE = 1024 * 1024
-        async with aiofiles.open(file_path, "wb") as f:
-            while True:
-                chunk = await file.read(CHUNK_SIZE)
-                if not chunk:
-                    break
-                await f.write(chunk)
+        digest = hashlib.sha256()
+        temp_path = os.path.join(upload_dir, f".{uuid4().hex}.part")
+        try:
+            async with aiofiles.open(temp_path, "wb") as f:
+                while True:
+                    chunk = await file.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    digest.update(chunk)
+                    await f.write(chunk)
+
+            # Files are stored by content hash, so identical uploads share one copy
+            content_hash = digest.hexdigest()
+            file_path = os.path.join(upload_dir, f"{content_hash}{ext.lower()}")
+            if not os.path.exists(file_path):
+                os.replace(temp_path, file_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
 
         # Ingest document
-        # NOTE: Removed ingest_lock to allow parallel ingestion. 
-        # DatabaseRepository now handles concurrency with retry_on_lock.
+        # NOTE: Removed ingest_lock to allow parallel ingestion.
+        # DatabaseRepository serializes SQLite writes itself.
         logger.info(f"Invoking ingest_document for {file.filename} (Size: {os.path.getsize(file_path)} bytes)")
         
         start_time = datetime.now()
@@ -283,6 +353,7 @@ async def upload_document(
                 project_id=project_id,
                 filename=file.filename,
                 file_path=file_path,
+                content_hash=content_hash,
             )
             duration = (datetime.now() - start_time).total_seconds()
             logger.info(f"Ingestion successful for {file.filename} (Duration: {duration:.2f}s), Document ID: {document.get('id')}")
@@ -300,7 +371,7 @@ async def upload_document(
 async def list_project_documents(project_id: str):
     """List documents in project."""
     try:
-        documents = document_service.list_project_documents(project_id)
+        documents = await run_in_threadpool(document_service.list_project_documents, project_id)
         return {
             "documents": documents,
             "total": len(documents),
@@ -317,7 +388,8 @@ async def create_field_template(request: FieldTemplateCreate):
     """Create field template."""
     try:
         fields = [field.model_dump() for field in request.fields]
-        template = repo.create_field_template(
+        template = await run_in_threadpool(
+            repo.create_field_template,
             name=request.name,
             description=request.description,
             fields=fields,
@@ -341,7 +413,7 @@ async def create_field_template(request: FieldTemplateCreate):
 async def list_field_templates():
     """List field templates."""
     try:
-        templates = repo.list_field_templates()
+        templates = await run_in_threadpool(repo.list_field_templates)
         return {
             "templates": [
                 {
@@ -375,7 +447,7 @@ async def extract_fields(
     """Extract fields from documents."""
     try:
         # Get project and template
-        project = repo.get_project(project_id)
+        project = await run_in_threadpool(repo.get_project, project_id)
         if not project:
             raise HTTPException(status_code=404, detail="Project not found")
 
@@ -606,21 +678,22 @@ async def extract_fields(
                     "required": False,
                 },
             ]
-            template = repo.create_field_template(
+            template = await run_in_threadpool(
+                repo.create_field_template,
                 name="Default Template",
                 description="Auto-created template",
                 fields=default_fields,
             )
-            project = repo.update_project(project_id, field_template_id=template.id)
+            project = await run_in_threadpool(repo.update_project, project_id, field_template_id=template.id)
         else:
-            template = repo.get_field_template(project.field_template_id)
+            template = await run_in_threadpool(repo.get_field_template, project.field_template_id)
             if not template:
                 raise HTTPException(status_code=404, detail="Field template not found")
 
         field_definitions = template.fields
 
         # Create task
-        task = task_service.create_task("extract", project_id)
+        task = await run_in_threadpool(task_service.create_task, "extract", project_id)
 
         # Run extraction in background
         if background_tasks:
@@ -667,6 +740,7 @@ def _run_extraction(
             status='COMPLETED',
             result=result,
         )
+        repo.compact_change_log(project_id)
     except Exception as e:
         logger.error(f"Error in extraction background task: {str(e)}")
         task_service.repo.update_task(
@@ -685,7 +759,8 @@ async def review_extraction(
 ):
     """Review and update extraction."""
     try:
-        result = review_service.update_extraction_review(
+        result = await run_in_threadpool(
+            review_service.update_extraction_review,
             extraction_id=extraction_id,
             status=request.status.value,
             manual_value=request.manual_value,
@@ -699,10 +774,13 @@ async def review_extraction(
 
 
 @app.get("/projects/{project_id}/reviews/pending")
-async def get_pending_reviews(project_id: str):
+async def get_pending_reviews(project_id: str, request: Request, response: Response):
     """Get pending reviews for project."""
     try:
-        reviews = review_service.get_pending_reviews(project_id)
+        not_modified = await check_project_etag(project_id, request, response)
+        if not_modified is not None:
+            return not_modified
+        reviews = await run_in_threadpool(review_service.get_pending_reviews, project_id)
         return {
             "reviews": reviews,
             "total": len(reviews),
@@ -712,48 +790,96 @@ async def get_pending_reviews(project_id: str):
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@app.get("/extractions/{extraction_id}/citations")
+async def list_extraction_citations(extraction_id: str):
+    """List the source passages cited for an extraction, with their offsets in the document text."""
+    try:
+        citations = await run_in_threadpool(repo.get_citations_for_extraction, extraction_id)
+        return {
+            "citations": [
+                {
+                    'id': c.id,
+                    'document_id': c.document_id,
+                    'chunk_id': c.chunk_id,
+                    'citation_text': c.citation_text,
+                    'start_offset': c.start_offset,
+                    'end_offset': c.end_offset,
+                    'page_number': c.page_number,
+                    'section_title': c.section_title,
+                    'relevance_score': c.relevance_score,
+                }
+                for c in citations
+            ],
+            "total": len(citations),
+        }
+    except Exception as e:
+        logger.error(f"Error listing citations: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 # ==================== COMPARISON TABLE ENDPOINTS ====================
 
 @app.get("/projects/{project_id}/table")
-async def get_comparison_table(project_id: str):
+async def get_comparison_table(project_id: str, request: Request, response: Response):
     """Get comparison table for project."""
     try:
-        table = comparison_service.generate_comparison_table(project_id)
+        not_modified = await check_project_etag(project_id, request, response)
+        if not_modified is not None:
+            return not_modified
+        table = await run_heavy(comparison_service.generate_comparison_table, project_id)
         return table
     except Exception as e:
         logger.error(f"Error generating comparison table: {str(e)}")
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@app.get("/projects/{project_id}/table/window")
+async def get_comparison_table_window(
+    project_id: str,
+    field: Optional[List[str]] = Query(None),
+    document: Optional[List[str]] = Query(None),
+    status: Optional[List[str]] = Query(None),
+    max_confidence: Optional[float] = None,
+    row_cursor: Optional[str] = None,
+    column_cursor: Optional[str] = None,
+    row_offset: int = 0,
+    column_offset: int = 0,
+    rows: int = 50,
+    columns: int = 20,
+):
+    """
+    Get one window of the comparison table.
+
+    Rows are fields, columns are documents. Filter with repeated field,
+    document and status parameters and max_confidence; page with the
+    next_row_cursor and next_column_cursor of the previous response, or with
+    offsets.
+    """
+    try:
+        return await run_in_threadpool(
+            comparison_service.get_table_window,
+            project_id,
+            field_names=field,
+            document_ids=document,
+            statuses=status,
+            max_confidence=max_confidence,
+            row_cursor=row_cursor,
+            column_cursor=column_cursor,
+            row_offset=row_offset,
+            column_offset=column_offset,
+            row_limit=rows,
+            column_limit=columns,
+        )
+    except Exception as e:
+        logger.error(f"Error loading table window: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @app.post("/projects/{project_id}/table/export-csv")
 async def export_table_to_csv(project_id: str):
     """Export comparison table to CSV."""
     try:
-        import csv
-        import io
-
-        table = comparison_service.generate_comparison_table(project_id)
-
-        # Generate CSV
-        output = io.StringIO()
-        writer = csv.writer(output)
-
-        # Headers
-        headers = ["Field Name", "Field Type"]
-        headers.extend([doc['filename'] for doc in table.get('documents', [])])
-        writer.writerow(headers)
-
-        # Rows
-        for row in table.get('rows', []):
-            row_data = [row['field_name'], row['field_type']]
-            for doc in table.get('documents', []):
-                doc_id = doc['id']
-                result = row['document_results'].get(doc_id, {})
-                value = result.get('extracted_value', 'N/A')
-                row_data.append(value)
-            writer.writerow(row_data)
-
-        csv_content = output.getvalue()
+        csv_content = await run_heavy(_build_csv_export, project_id)
         return {
             "format": "csv",
             "content": csv_content,
@@ -765,6 +891,103 @@ async def export_table_to_csv(project_id: str):
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@app.get("/projects/{project_id}/export/csv")
+async def stream_table_csv(project_id: str):
+    """
+    Stream the comparison table as CSV.
+
+    Rows are written as they are read from the database, so memory stays
+    flat and the header arrives at once, however large the project.
+    """
+    return await _stream_export(
+        project_id, export_service.iter_table_csv, "text/csv", f"legal_review_{project_id}.csv"
+    )
+
+
+@app.get("/projects/{project_id}/export/jsonl")
+async def stream_extractions_jsonl(project_id: str):
+    """Stream every extraction with its review state and citations as JSON lines."""
+    return await _stream_export(
+        project_id, export_service.iter_extractions_jsonl, "application/x-ndjson",
+        f"legal_review_{project_id}.jsonl",
+    )
+
+
+async def _stream_export(project_id: str, produce, media_type: str, filename: str) -> StreamingResponse:
+    if await run_in_threadpool(repo.get_project_revision, project_id) is None:
+        raise HTTPException(status_code=404, detail="Project not found")
+    # Starlette iterates a synchronous generator on the thread pool, so
+    # database reads never block the event loop
+    return StreamingResponse(
+        produce(project_id),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+COLUMNAR_MEDIA_TYPES = {
+    'parquet': ("application/vnd.apache.parquet", "parquet"),
+    'arrow': ("application/vnd.apache.arrow.stream", "arrows"),
+}
+
+
+@app.get("/exports/columnar")
+async def export_columnar(
+    project_id: List[str] = Query(...),
+    table: str = "extractions",
+    format: str = "parquet",
+):
+    """
+    Stream extractions (with review outcomes) or citations of one or more
+    projects as Parquet or an Arrow IPC stream, for loading into pandas or
+    other dataframe tools.
+    """
+    try:
+        produce = await run_in_threadpool(export_service.iter_columnar, project_id, table, format)
+    except ImportError:
+        raise HTTPException(
+            status_code=501,
+            detail="pyarrow is required for columnar export. Install: pip install pyarrow"
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    media_type, extension = COLUMNAR_MEDIA_TYPES[format]
+    return StreamingResponse(
+        produce,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="legal_review_{table}.{extension}"'},
+    )
+
+
+def _build_csv_export(project_id: str) -> str:
+    """Build the CSV export of a project's comparison table."""
+    import csv
+    import io
+
+    table = comparison_service.generate_comparison_table(project_id)
+
+    # Generate CSV
+    output = io.StringIO()
+    writer = csv.writer(output)
+
+    # Headers
+    headers = ["Field Name", "Field Type"]
+    headers.extend([doc['filename'] for doc in table.get('documents', [])])
+    writer.writerow(headers)
+
+    # Rows
+    for row in table.get('rows', []):
+        row_data = [row['field_name'], row['field_type']]
+        for doc in table.get('documents', []):
+            doc_id = doc['id']
+            result = row['document_results'].get(doc_id, {})
+            value = result.get('extracted_value', 'N/A')
+            row_data.append(value)
+        writer.writerow(row_data)
+
+    return output.getvalue()
+
+
 # ==================== EVALUATION ENDPOINTS ====================
 
 @app.post("/projects/{project_id}/evaluate")
@@ -776,7 +999,7 @@ async def evaluate_project(
     """Evaluate extraction quality."""
     try:
         # Create task
-        task = task_service.create_task("evaluate", project_id)
+        task = await run_in_threadpool(task_service.create_task, "evaluate", project_id)
 
         # Run evaluation in background
         if background_tasks:
@@ -840,7 +1063,7 @@ def _run_evaluation(
 async def get_evaluation_report(project_id: str):
     """Get evaluation report for project."""
     try:
-        report = evaluation_service.generate_evaluation_report(project_id)
+        report = await run_heavy(evaluation_service.generate_evaluation_report, project_id)
         return report
     except Exception as e:
         logger.error(f"Error getting evaluation report: {str(e)}")
@@ -853,7 +1076,7 @@ async def get_evaluation_report(project_id: str):
 async def get_task_status(task_id: str):
     """Get async task status."""
     try:
-        status = task_service.get_task_status(task_id)
+        status = await run_in_threadpool(task_service.get_task_status, task_id)
         if not status:
             raise HTTPException(status_code=404, detail="Task not found")
         return status
@@ -867,10 +1090,25 @@ async def get_task_status(task_id: str):
 # ==================== DIFF ENDPOINTS ====================
 
 @app.get("/projects/{project_id}/diff")
-async def get_project_diff(project_id: str):
-    """Compute cross-document diff highlighting for a project."""
+async def get_project_diff(
+    project_id: str,
+    request: Request,
+    response: Response,
+    full_matrix: bool = False,
+    top_k: int = Query(5, ge=1, le=50),
+):
+    """
+    Compute cross-document diff highlighting for a project.
+
+    Distinct values are compared with their top_k nearest values;
+    full_matrix=true also returns the similarity of every document pair,
+    for projects of up to DiffService.MAX_MATRIX_DOCUMENTS documents.
+    """
     try:
-        diff_result = diff_service.compute_diff(project_id)
+        not_modified = await check_project_etag(project_id, request, response)
+        if not_modified is not None:
+            return not_modified
+        diff_result = await run_heavy(diff_service.compute_diff, project_id, full_matrix, top_k)
         return diff_result
     except Exception as e:
         logger.error(f"Error computing diff: {str(e)}")
@@ -883,7 +1121,8 @@ async def get_project_diff(project_id: str):
 async def create_annotation(request: AnnotationCreateRequest):
     """Create an annotation on an extraction."""
     try:
-        annotation = annotation_service.create_annotation(
+        annotation = await run_in_threadpool(
+            annotation_service.create_annotation,
             extraction_id=request.extraction_id,
             comment_text=request.comment_text,
             annotated_by=request.annotated_by,
@@ -898,7 +1137,7 @@ async def create_annotation(request: AnnotationCreateRequest):
 async def list_extraction_annotations(extraction_id: str):
     """List annotations for a specific extraction."""
     try:
-        annotations = annotation_service.list_annotations_for_extraction(extraction_id)
+        annotations = await run_in_threadpool(annotation_service.list_annotations_for_extraction, extraction_id)
         return {"annotations": annotations, "total": len(annotations)}
     except Exception as e:
         logger.error(f"Error listing annotations: {str(e)}")
@@ -906,10 +1145,13 @@ async def list_extraction_annotations(extraction_id: str):
 
 
 @app.get("/projects/{project_id}/annotations")
-async def list_project_annotations(project_id: str):
+async def list_project_annotations(project_id: str, request: Request, response: Response):
     """List all annotations for a project."""
     try:
-        annotations = annotation_service.list_annotations_for_project(project_id)
+        not_modified = await check_project_etag(project_id, request, response)
+        if not_modified is not None:
+            return not_modified
+        annotations = await run_in_threadpool(annotation_service.list_annotations_for_project, project_id)
         return {"annotations": annotations, "total": len(annotations)}
     except Exception as e:
         logger.error(f"Error listing project annotations: {str(e)}")
@@ -920,7 +1162,7 @@ async def list_project_annotations(project_id: str):
 async def update_annotation(annotation_id: str, request: AnnotationUpdateRequest):
     """Update an annotation."""
     try:
-        annotation = annotation_service.update_annotation(annotation_id, request.comment_text)
+        annotation = await run_in_threadpool(annotation_service.update_annotation, annotation_id, request.comment_text)
         return annotation
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
@@ -933,7 +1175,7 @@ async def update_annotation(annotation_id: str, request: AnnotationUpdateRequest
 async def delete_annotation(annotation_id: str):
     """Delete an annotation."""
     try:
-        deleted = annotation_service.delete_annotation(annotation_id)
+        deleted = await run_in_threadpool(annotation_service.delete_annotation, annotation_id)
         if not deleted:
             raise HTTPException(status_code=404, detail="Annotation not found")
         return {"status": "deleted", "annotation_id": annotation_id}
@@ -953,13 +1195,13 @@ async def re_extract_project(
 ):
     """Re-extract all fields for a project (deletes old extractions first)."""
     try:
-        project = repo.get_project(project_id)
+        project = await run_in_threadpool(repo.get_project, project_id)
         if not project:
             raise HTTPException(status_code=404, detail="Project not found")
 
         template = None
         if project.field_template_id:
-            template = repo.get_field_template(project.field_template_id)
+            template = await run_in_threadpool(repo.get_field_template, project.field_template_id)
         if not template:
             raise HTTPException(
                 status_code=400,
@@ -967,7 +1209,7 @@ async def re_extract_project(
             )
 
         field_definitions = template.fields
-        task = task_service.create_task("re-extract", project_id)
+        task = await run_in_threadpool(task_service.create_task, "re-extract", project_id)
 
         if background_tasks:
             background_tasks.add_task(
@@ -997,11 +1239,31 @@ def _run_re_extraction(
         task_service.repo.update_task(task_id, status='PROCESSING')
         result = re_extraction_service.re_extract_project(project_id, field_definitions)
         task_service.repo.update_task(task_id, status='COMPLETED', result=result)
+        repo.compact_change_log(project_id)
     except Exception as e:
         logger.error(f"Error in re-extraction background task: {str(e)}")
         task_service.repo.update_task(task_id, status='FAILED', error_message=str(e))
 
 
+# ==================== CHANGE FEED ENDPOINT ====================
+
+@app.get("/projects/{project_id}/changes")
+async def get_project_changes(project_id: str, since: int):
+    """
+    Documents, extractions, reviews and annotations changed after revision since.
+
+    Pass the revision of the previous response as since. If full_refresh is
+    true, reload the project's views instead.
+    """
+    try:
+        return await run_in_threadpool(change_feed_service.get_changes, project_id, since)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error reading change feed: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 # ==================== FIELD TEMPLATE UPDATE ENDPOINT ====================
 
 @app.put("/field-templates/{template_id}")
@@ -1009,7 +1271,8 @@ async def update_field_template(template_id: str, request: FieldTemplateCreate):
     """Update a field template (creates new version)."""
     try:
         fields = [field.model_dump() for field in request.fields]
-        template = repo.update_field_template(
+        template = await run_in_threadpool(
+            repo.update_field_template,
             template_id=template_id,
             name=request.name,
             description=request.description,
@@ -1038,7 +1301,7 @@ async def update_field_template(template_id: str, request: FieldTemplateCreate):
 async def get_field_template(template_id: str):
     """Get a specific field template."""
     try:
-        template = repo.get_field_template(template_id)
+        template = await run_in_threadpool(repo.get_field_template, template_id)
         if not template:
             raise HTTPException(status_code=404, detail="Field template not found")
         return {
@@ -1064,88 +1327,7 @@ async def get_field_template(template_id: str):
 async def export_table_to_excel(project_id: str):
     """Export comparison table to Excel (XLSX)."""
     try:
-        import io
-        import openpyxl
-        from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-
-        table = comparison_service.generate_comparison_table(project_id)
-
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        ws.title = "Legal Review Comparison"
-
-        # Styles
-        header_font = Font(bold=True, color="FFFFFF", size=11)
-        header_fill = PatternFill(start_color="2B579A", end_color="2B579A", fill_type="solid")
-        header_align = Alignment(horizontal="center", vertical="center", wrap_text=True)
-        thin_border = Border(
-            left=Side(style='thin'), right=Side(style='thin'),
-            top=Side(style='thin'), bottom=Side(style='thin'),
-        )
-        high_conf_fill = PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid")
-        med_conf_fill = PatternFill(start_color="FFEB9C", end_color="FFEB9C", fill_type="solid")
-        low_conf_fill = PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type="solid")
-
-        # Headers
-        headers = ["Field Name", "Field Type"]
-        doc_names = []
-        for doc in table.get('documents', []):
-            doc_names.append(doc['filename'])
-            headers.append(f"{doc['filename']} (Value)")
-            headers.append(f"{doc['filename']} (Confidence)")
-
-        for col_idx, header in enumerate(headers, 1):
-            cell = ws.cell(row=1, column=col_idx, value=header)
-            cell.font = header_font
-            cell.fill = header_fill
-            cell.alignment = header_align
-            cell.border = thin_border
-
-        # Data rows
-        for row_idx, row in enumerate(table.get('rows', []), 2):
-            ws.cell(row=row_idx, column=1, value=row['field_name']).border = thin_border
-            ws.cell(row=row_idx, column=2, value=str(row['field_type'])).border = thin_border
-
-            col = 3
-            for doc in table.get('documents', []):
-                doc_id = doc['id']
-                result = row['document_results'].get(doc_id, {})
-                value = result.get('extracted_value', 'N/A')
-                confidence = result.get('confidence_score', 0.0)
-
-                value_cell = ws.cell(row=row_idx, column=col, value=value)
-                value_cell.border = thin_border
-                value_cell.alignment = Alignment(wrap_text=True)
-
-                conf_cell = ws.cell(row=row_idx, column=col + 1, value=f"{confidence * 100:.0f}%")
-                conf_cell.border = thin_border
-                conf_cell.alignment = Alignment(horizontal="center")
-
-                # Color-code confidence
-                if confidence > 0.8:
-                    conf_cell.fill = high_conf_fill
-                elif confidence > 0.6:
-                    conf_cell.fill = med_conf_fill
-                elif confidence > 0:
-                    conf_cell.fill = low_conf_fill
-
-                col += 2
-
-        # Auto-fit column widths
-        for col_idx in range(1, len(headers) + 1):
-            max_len = max(
-                (len(str(ws.cell(row=r, column=col_idx).value or "")) for r in range(1, ws.max_row + 1)),
-                default=10
-            )
-            ws.column_dimensions[openpyxl.utils.get_column_letter(col_idx)].width = min(max_len + 4, 50)
-
-        # Freeze header row
-        ws.freeze_panes = "A2"
-
-        # Save to bytes
-        output = io.BytesIO()
-        wb.save(output)
-        excel_bytes = output.getvalue()
+        excel_bytes = await run_heavy(_build_excel_export, project_id)
 
         import base64
         excel_b64 = base64.b64encode(excel_bytes).decode('utf-8')
@@ -1167,13 +1349,118 @@ async def export_table_to_excel(project_id: str):
         raise HTTPException(status_code=400, detail=str(e))
 
 
+def _build_excel_export(project_id: str) -> bytes:
+    """Build the XLSX export of a project's comparison table."""
+    import io
+    output = io.BytesIO()
+    export_service.write_table_xlsx(project_id, output)
+    return output.getvalue()
+
+
+# Large workbooks are written by a background task to a file under
+# EXPORT_DIR; the task's result holds the link the file is downloaded from.
+# Files older than EXPORT_TTL_SECONDS are removed when the next export starts.
+EXPORT_DIR = os.getenv("EXPORT_DIR", os.path.join(tempfile.gettempdir(), "legal_review_exports"))
+EXPORT_TTL_SECONDS = int(os.getenv("EXPORT_TTL_SECONDS", str(24 * 3600)))
+
+
+@app.post("/projects/{project_id}/exports/xlsx")
+async def start_excel_export(project_id: str, background_tasks: BackgroundTasks):
+    """Start writing the comparison table to an XLSX file in the background."""
+    try:
+        if await run_in_threadpool(repo.get_project_revision, project_id) is None:
+            raise HTTPException(status_code=404, detail="Project not found")
+        task = await run_in_threadpool(task_service.create_task, "export", project_id)
+        # Awaited by the background task, so the workbook is written on the heavy pool
+        background_tasks.add_task(run_heavy, _run_excel_export, project_id, task['task_id'])
+        return {
+            "task_id": task['task_id'],
+            "status": "started",
+            "message": "Export started in background",
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error starting Excel export: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _export_path(task_id: str) -> str:
+    return os.path.join(EXPORT_DIR, f"{task_id}.xlsx")
+
+
+def _run_excel_export(project_id: str, task_id: str):
+    """Background task writing an XLSX export to EXPORT_DIR."""
+    path = _export_path(task_id)
+    try:
+        task_service.repo.update_task(task_id, status='PROCESSING', started_at=datetime.now(timezone.utc))
+        os.makedirs(EXPORT_DIR, exist_ok=True)
+        _remove_expired_exports()
+
+        # Written under a temporary name so a download never sees a partial file
+        partial = path + ".part"
+        export_service.write_table_xlsx(project_id, partial)
+        os.replace(partial, path)
+
+        task_service.repo.update_task(
+            task_id,
+            status='COMPLETED',
+            completed_at=datetime.now(timezone.utc),
+            result={
+                "filename": f"legal_review_{project_id}.xlsx",
+                "size_bytes": os.path.getsize(path),
+                "download_url": f"/exports/{task_id}/download",
+            },
+        )
+    except Exception as e:
+        logger.error(f"Error in Excel export background task: {str(e)}")
+        if os.path.exists(path + ".part"):
+            os.unlink(path + ".part")
+        task_service.repo.update_task(
+            task_id,
+            status='FAILED',
+            error_message=str(e),
+        )
+
+
+def _remove_expired_exports():
+    cutoff = time.time() - EXPORT_TTL_SECONDS
+    for entry in os.scandir(EXPORT_DIR):
+        try:
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                os.unlink(entry.path)
+        except OSError:
+            pass
+
+
+@app.get("/exports/{task_id}/download")
+async def download_export(task_id: str):
+    """Download the file written by a completed export task."""
+    task = await run_in_threadpool(task_service.get_task_status, task_id)
+    if not task or task['task_type'] != "export":
+        raise HTTPException(status_code=404, detail="Export not found")
+    if task['status'] != "COMPLETED":
+        raise HTTPException(status_code=409, detail=f"Export is {task['status']}")
+    path = _export_path(task_id)
+    if not os.path.exists(path):
+        raise HTTPException(status_code=410, detail="Export file has expired")
+    return FileResponse(
+        path,
+        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        filename=task['result'].get("filename", f"{task_id}.xlsx"),
+    )
+
+
 # ==================== PROJECT EXTRACTIONS LISTING ====================
 
 @app.get("/projects/{project_id}/extractions")
-async def list_project_extractions(project_id: str):
+async def list_project_extractions(project_id: str, request: Request, response: Response):
     """List all extractions for a project (for annotation lookup)."""
     try:
-        extractions = repo.list_extractions_by_project(project_id)
+        not_modified = await check_project_etag(project_id, request, response)
+        if not_modified is not None:
+            return not_modified
+        extractions = await run_in_threadpool(repo.list_extractions_by_project, project_id)
         return {
             "extractions": [
                 {
@@ -0,0 +1,57 @@
+"""
+Benchmark PDF extraction backends on the sample contracts in data/.
+
+Reports pages per second, extracted characters and the text quality score
+used by the backend selector for every installed engine, followed by the
+backend the selector would choose for each file.
+
+Usage (from backend/):
+    python benchmarks/bench_pdf_backends.py [pdf ...]
+"""
+
+import glob
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.services.pdf_backends import available_backends, select_backend, text_quality
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'data')
+
+
+def bench_file(file_path: str) -> None:
+    print(f"\n{os.path.basename(file_path)}")
+    print(f"  {'backend':<10} {'pages':>5} {'seconds':>8} {'pages/s':>8} {'chars':>8} {'quality':>8}")
+    for backend in available_backends():
+        start = time.perf_counter()
+        try:
+            pages = backend.open(file_path)
+            try:
+                texts = [pages.extract_page(n) for n in range(1, pages.page_count + 1)]
+            finally:
+                pages.close()
+        except Exception as e:
+            print(f"  {backend.name:<10} failed: {e}")
+            continue
+        seconds = time.perf_counter() - start
+        text = '\n'.join(texts)
+        print(
+            f"  {backend.name:<10} {len(texts):>5} {seconds:>8.2f} {len(texts) / seconds:>8.1f} "
+            f"{len(text):>8} {text_quality(text):>8.3f}"
+        )
+
+    backend, _ = select_backend(file_path)
+    print(f"  selected: {backend.name}")
+
+
+def main() -> None:
+    files = sys.argv[1:] or sorted(glob.glob(os.path.join(DATA_DIR, '*.pdf')))
+    print(f"Installed backends: {', '.join(b.name for b in available_backends())}")
+    for file_path in files:
+        bench_file(file_path)
+
+
+if __name__ == '__main__':
+    main()
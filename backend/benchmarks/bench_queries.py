@@ -0,0 +1,167 @@
+"""
+Benchmark the repository's hot queries with and without secondary indexes.
+
+Fills a database with synthetic projects, documents, chunks, extractions,
+citations and review states, then times the repository methods behind the
+table, review and citation views. The same queries are timed again after
+dropping every declared secondary index.
+
+Usage (from backend/):
+    python benchmarks/bench_queries.py [extraction_rows ...] [--url DATABASE_URL]
+
+Defaults to 10000 and 100000 extraction rows in a temporary SQLite file.
+A --url database is filled and emptied; never point it at real data.
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from uuid import uuid4
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from sqlalchemy import text
+
+from src.models.schema import (
+    Base, Project, Document, DocumentChunk, ExtractionResult, Citation, ReviewState,
+    ExtractionStatus, FieldType, DocumentStatus, ProjectStatus,
+)
+from src.storage.repository import DatabaseRepository
+
+PROJECTS = 20
+FIELDS = 30
+CHUNKS_PER_DOCUMENT = 20
+CITATIONS_PER_EXTRACTION = 2
+
+
+def best_of(fn, repeat: int = 20):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def fill(repo: DatabaseRepository, extraction_rows: int):
+    """Insert synthetic rows and return (project_id, document_id, field_name, extraction_id) to query."""
+    now = datetime.now(timezone.utc)
+    rng = random.Random(0)
+    documents_per_project = max(1, extraction_rows // (PROJECTS * FIELDS))
+    rows = {table: [] for table in ('projects', 'documents', 'chunks', 'extractions', 'citations', 'reviews')}
+
+    for p in range(PROJECTS):
+        project_id = str(uuid4())
+        rows['projects'].append(dict(id=project_id, name=f"Project {p}", status=ProjectStatus.READY,
+                                     created_at=now, updated_at=now))
+        for d in range(documents_per_project):
+            document_id = str(uuid4())
+            rows['documents'].append(dict(
+                id=document_id, project_id=project_id, filename=f"doc{d}.pdf", file_type='pdf',
+                file_path='/tmp/doc.pdf', file_size=1, content_text='', parsed_metadata={},
+                status=DocumentStatus.INDEXED, created_at=now, updated_at=now,
+            ))
+            for c in range(CHUNKS_PER_DOCUMENT):
+                rows['chunks'].append(dict(id=str(uuid4()), document_id=document_id, chunk_index=c,
+                                           text='chunk text', extra_metadata={}))
+            for f in range(FIELDS):
+                extraction_id = str(uuid4())
+                rows['extractions'].append(dict(
+                    id=extraction_id, project_id=project_id, document_id=document_id,
+                    field_name=f"field_{f}", field_type=FieldType.TEXT, extracted_value='value',
+                    confidence_score=0.9, status=ExtractionStatus.PENDING, extra_metadata={},
+                    created_at=now, updated_at=now,
+                ))
+                for _ in range(CITATIONS_PER_EXTRACTION):
+                    rows['citations'].append(dict(
+                        id=str(uuid4()), extraction_id=extraction_id, document_id=document_id,
+                        citation_text='citation', relevance_score=rng.random(), created_at=now,
+                    ))
+                status = ExtractionStatus.PENDING if rng.random() < 0.1 else ExtractionStatus.CONFIRMED
+                rows['reviews'].append(dict(
+                    id=str(uuid4()), project_id=project_id, extraction_id=extraction_id,
+                    status=status, created_at=now, updated_at=now,
+                ))
+
+    session = repo.get_session()
+    try:
+        for model, table in ((Project, 'projects'), (Document, 'documents'), (DocumentChunk, 'chunks'),
+                             (ExtractionResult, 'extractions'), (Citation, 'citations'),
+                             (ReviewState, 'reviews')):
+            session.bulk_insert_mappings(model, rows[table])
+        session.commit()
+    finally:
+        session.close()
+
+    probe = rows['extractions'][len(rows['extractions']) // 2]
+    return probe['project_id'], probe['document_id'], probe['field_name'], probe['id'], len(rows['extractions'])
+
+
+def drop_secondary_indexes(repo: DatabaseRepository) -> None:
+    with repo.engine.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                connection.execute(text(f"DROP INDEX IF EXISTS {index.name}"))
+
+
+def analyze(repo: DatabaseRepository) -> None:
+    with repo.engine.begin() as connection:
+        connection.execute(text("ANALYZE"))
+
+
+def time_queries(repo: DatabaseRepository, project_id, document_id, field_name, extraction_id):
+    return [
+        ('extractions by project+document', lambda: repo.list_extractions_by_project(
+            project_id, document_id=document_id)),
+        ('extractions by project+field', lambda: repo.list_extractions_by_project(
+            project_id, field_name=field_name)),
+        ('pending reviews', lambda: repo.list_pending_reviews(project_id)),
+        ('citations for extraction', lambda: repo.get_citations_for_extraction(extraction_id)),
+        ('chunks for document', lambda: repo.get_document_chunks(document_id)),
+        ('project documents', lambda: repo.list_project_documents(project_id)),
+        ('table window 50x20', lambda: repo.get_table_window(project_id)),
+        ('table window, low confidence', lambda: repo.get_table_window(project_id, max_confidence=0.5)),
+    ]
+
+
+def bench(database_url: str, extraction_rows: int) -> None:
+    repo = DatabaseRepository(database_url)
+    Base.metadata.drop_all(bind=repo.engine)
+    Base.metadata.create_all(bind=repo.engine)
+    start = time.perf_counter()
+    project_id, document_id, field_name, extraction_id, count = fill(repo, extraction_rows)
+    print(f"\n{count:,} extraction rows (filled in {time.perf_counter() - start:.1f}s)")
+    print(f"  {'query':<34} {'indexed':>10} {'no index':>10}")
+
+    cases = time_queries(repo, project_id, document_id, field_name, extraction_id)
+    analyze(repo)
+    indexed = [best_of(fn) for _, fn in cases]
+    drop_secondary_indexes(repo)
+    analyze(repo)
+    unindexed = [best_of(fn, repeat=5) for _, fn in cases]
+    for (name, _), with_index, without_index in zip(cases, indexed, unindexed):
+        print(f"  {name:<34} {with_index * 1000:8.2f}ms {without_index * 1000:8.2f}ms")
+
+    Base.metadata.drop_all(bind=repo.engine)
+    repo.engine.dispose()
+
+
+def main() -> None:
+    args = sys.argv[1:]
+    database_url = None
+    if '--url' in args:
+        position = args.index('--url')
+        database_url = args[position + 1]
+        del args[position:position + 2]
+    sizes = [int(arg) for arg in args] or [10000, 100000]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            bench(database_url or f"sqlite:///{os.path.join(tmp, f'bench_{size}.db')}", size)
+
+
+if __name__ == '__main__':
+    main()
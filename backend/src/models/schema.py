@@ -8,9 +8,9 @@ from enum import Enum
 from typing import Optional, List, Dict, Any
 from uuid import uuid4
 
-from sqlalchemy import Column, String, DateTime, Float, Integer, Boolean, Text, JSON, ForeignKey, Enum as SQLEnum, Table
+from sqlalchemy import Column, String, DateTime, Float, Integer, Boolean, Text, JSON, ForeignKey, Enum as SQLEnum, Table, Index
 from sqlalchemy.orm import declarative_base
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 from pydantic import BaseModel, Field
 
 Base = declarative_base()
@@ -83,6 +83,13 @@ class Project(Base):
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
     updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc), nullable=False)
     extra_metadata = Column("metadata", JSON, default={}, nullable=False)
+    # Bumped once per committed transaction that writes the project's
+    # documents, extractions, reviews or annotations; NULL on rows older
+    # than the column
+    revision = Column(Integer, default=0, nullable=True)
+    # The change log holds every change after this revision; older `since`
+    # revisions need a full reload
+    change_log_floor = Column(Integer, default=0, nullable=True)
 
     # Relationships
     documents = relationship("Document", back_populates="project", cascade="all, delete-orphan")
@@ -96,6 +103,11 @@ class Project(Base):
 class Document(Base):
     """Represents a legal document uploaded to a project."""
     __tablename__ = "documents"
+    __table_args__ = (
+        # Table windows page a project's documents in upload order
+        Index("ix_documents_project_created", "project_id", "created_at", "id"),
+        Index("ix_documents_content_hash", "content_hash"),
+    )
 
     id = Column(String(36), primary_key=True, default=lambda: str(uuid4()))
     project_id = Column(String(36), ForeignKey("projects.id"), nullable=False)
@@ -103,8 +115,12 @@ class Document(Base):
     file_type = Column(String(10), nullable=False)  # pdf, docx, html, txt
     file_path = Column(String(1024), nullable=False)
     file_size = Column(Integer, nullable=False)
-    content_text = Column(Text, nullable=False)
-    parsed_metadata = Column(JSON, default={}, nullable=False)
+    # Large columns are deferred so listing documents does not read every
+    # contract's text; get_document loads them
+    content_text = deferred(Column(Text, nullable=False))  # Empty when shared via parsed_contents
+    blob_key = Column(String(64), nullable=True)  # Text in the blob store; content_text is then empty
+    content_hash = Column(String(64), ForeignKey("parsed_contents.content_hash"), nullable=True)
+    parsed_metadata = deferred(Column(JSON, default={}, nullable=False))
     status = Column(SQLEnum(DocumentStatus), default=DocumentStatus.UPLOADED, nullable=False)
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
     updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc), nullable=False)
@@ -112,6 +128,8 @@ class Document(Base):
     # Relationships
     project = relationship("Project", back_populates="documents")
     chunks = relationship("DocumentChunk", back_populates="document", cascade="all, delete-orphan")
+    sections = relationship("DocumentSection", back_populates="document", cascade="all, delete-orphan")
+    clauses = relationship("ChunkClause", back_populates="document", cascade="all, delete-orphan")
     citations = relationship("Citation", back_populates="document", cascade="all, delete-orphan")
     extractions = relationship("ExtractionResult", back_populates="document", cascade="all, delete-orphan")
 
@@ -119,18 +137,81 @@ class Document(Base):
 class DocumentChunk(Base):
     """Represents indexed chunks of a document for retrieval."""
     __tablename__ = "document_chunks"
+    __table_args__ = (
+        Index("ix_document_chunks_document_index", "document_id", "chunk_index"),
+    )
 
     id = Column(String(36), primary_key=True, default=lambda: str(uuid4()))
     document_id = Column(String(36), ForeignKey("documents.id"), nullable=False)
     chunk_index = Column(Integer, nullable=False)
-    text = Column(Text, nullable=False)
+    text = Column(Text, nullable=False)  # Empty when stored as a span of the document text in the blob store
     page_number = Column(Integer, nullable=True)
     section_title = Column(String(512), nullable=True)
+    start_offset = Column(Integer, nullable=True)  # Span of the chunk in the document text
+    end_offset = Column(Integer, nullable=True)
+    token_count = Column(Integer, nullable=True)  # Estimated LLM tokens, for prompt packing
     embedding = Column(JSON, nullable=True)  # Vector embedding for similarity search
     extra_metadata = Column("metadata", JSON, default={}, nullable=False)
 
     # Relationships
     document = relationship("Document", back_populates="chunks")
+    citations = relationship("Citation", back_populates="chunk")
+
+
+class DocumentSection(Base):
+    """Node of a document's contract hierarchy (article, section or clause)."""
+    __tablename__ = "document_sections"
+    __table_args__ = (
+        Index("ix_document_sections_document_index", "document_id", "section_index"),
+    )
+
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid4()))
+    document_id = Column(String(36), ForeignKey("documents.id"), nullable=False)
+    section_index = Column(Integer, nullable=False)  # Position in document order
+    parent_index = Column(Integer, nullable=True)
+    level = Column(Integer, nullable=False)  # 1 article, 2-4 numbered sections, 5-6 clauses
+    number = Column(String(64), nullable=False)  # e.g. "ARTICLE IV", "2.01", "(a)"
+    title = Column(String(512), nullable=False, default="")
+    start_offset = Column(Integer, nullable=False)
+    end_offset = Column(Integer, nullable=False)
+
+    # Relationships
+    document = relationship("Document", back_populates="sections")
+
+
+class ChunkClause(Base):
+    """Clause family a document chunk was tagged with at ingest."""
+    __tablename__ = "chunk_clauses"
+    __table_args__ = (
+        Index("ix_chunk_clauses_document_family", "document_id", "family"),
+    )
+
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid4()))
+    document_id = Column(String(36), ForeignKey("documents.id"), nullable=False)
+    chunk_index = Column(Integer, nullable=False)
+    family = Column(String(64), nullable=False)  # e.g. "governing_law", see clause_classifier
+    score = Column(Integer, nullable=False)
+
+    # Relationships
+    document = relationship("Document", back_populates="clauses")
+
+
+class ParsedContent(Base):
+    """Content-addressed parse cache shared by documents with identical bytes."""
+    __tablename__ = "parsed_contents"
+
+    content_hash = Column(String(64), primary_key=True)  # SHA-256 of the uploaded file
+    file_type = Column(String(10), nullable=False)
+    file_path = Column(String(1024), nullable=False)
+    file_size = Column(Integer, nullable=False)
+    content_text = Column(Text, nullable=False)  # Empty when stored in the blob store
+    blob_key = Column(String(64), nullable=True)
+    parsed_metadata = Column(JSON, default={}, nullable=False)
+    chunk_config = Column(String(64), nullable=False)  # Chunker settings the spans were built with
+    chunk_spans = Column(JSON, default=[], nullable=False)  # [start, end, page_number, section_title]
+    sections = Column(JSON, nullable=True)  # Section tree from DocumentChunker.detect_sections
+    ref_count = Column(Integer, default=0, nullable=False)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
 
 
 class FieldTemplate(Base):
@@ -153,6 +234,14 @@ class FieldTemplate(Base):
 class ExtractionResult(Base):
     """Stores extracted field values from documents."""
     __tablename__ = "extraction_results"
+    __table_args__ = (
+        # list_extractions_by_project filters by project, then document and/or field
+        Index("ix_extraction_results_project_document_field", "project_id", "document_id", "field_name"),
+        Index("ix_extraction_results_project_field", "project_id", "field_name"),
+        # Table window filters on review status and low confidence
+        Index("ix_extraction_results_project_status_confidence", "project_id", "status", "confidence_score"),
+        Index("ix_extraction_results_document", "document_id"),
+    )
 
     id = Column(String(36), primary_key=True, default=lambda: str(uuid4()))
     project_id = Column(String(36), ForeignKey("projects.id"), nullable=False)
@@ -160,7 +249,7 @@ class ExtractionResult(Base):
     field_name = Column(String(256), nullable=False)
     field_type = Column(SQLEnum(FieldType), nullable=False)
     extracted_value = Column(Text, nullable=True)
-    raw_text = Column(Text, nullable=True)
+    raw_text = deferred(Column(Text, nullable=True))  # Loaded by get_extraction only
     normalized_value = Column(Text, nullable=True)
     confidence_score = Column(Float, default=0.0, nullable=False)
     status = Column(SQLEnum(ExtractionStatus), default=ExtractionStatus.PENDING, nullable=False)
@@ -178,12 +267,18 @@ class ExtractionResult(Base):
 class Citation(Base):
     """Stores references to source text supporting extracted fields."""
     __tablename__ = "citations"
+    __table_args__ = (
+        Index("ix_citations_extraction_relevance", "extraction_id", "relevance_score"),
+        Index("ix_citations_document", "document_id"),
+    )
 
     id = Column(String(36), primary_key=True, default=lambda: str(uuid4()))
     extraction_id = Column(String(36), ForeignKey("extraction_results.id"), nullable=False)
     document_id = Column(String(36), ForeignKey("documents.id"), nullable=False)
     chunk_id = Column(String(36), ForeignKey("document_chunks.id"), nullable=True)
-    citation_text = Column(Text, nullable=False)
+    citation_text = Column(Text, nullable=False)  # Empty when stored as a span of the document text
+    start_offset = Column(Integer, nullable=True)  # Span of the cited passage in the document text
+    end_offset = Column(Integer, nullable=True)
     page_number = Column(Integer, nullable=True)
     section_title = Column(String(512), nullable=True)
     relevance_score = Column(Float, default=0.0, nullable=False)
@@ -192,11 +287,16 @@ class Citation(Base):
     # Relationships
     extraction = relationship("ExtractionResult", back_populates="citations")
     document = relationship("Document", back_populates="citations")
+    chunk = relationship("DocumentChunk", back_populates="citations")  # Orders deletes: citations before chunks
 
 
 class ReviewState(Base):
     """Tracks review status and manual edits for extracted fields."""
     __tablename__ = "review_states"
+    __table_args__ = (
+        Index("ix_review_states_project_status", "project_id", "status"),
+        Index("ix_review_states_extraction", "extraction_id"),
+    )
 
     id = Column(String(36), primary_key=True, default=lambda: str(uuid4()))
     project_id = Column(String(36), ForeignKey("projects.id"), nullable=False)
@@ -219,6 +319,9 @@ class ReviewState(Base):
 class Annotation(Base):
     """Stores annotations and comments on fields for collaboration."""
     __tablename__ = "annotations"
+    __table_args__ = (
+        Index("ix_annotations_extraction_created", "extraction_id", "created_at"),
+    )
 
     id = Column(String(36), primary_key=True, default=lambda: str(uuid4()))
     extraction_id = Column(String(36), ForeignKey("extraction_results.id"), nullable=False)
@@ -228,9 +331,29 @@ class Annotation(Base):
     updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc), nullable=False)
 
 
+class ChangeLogEntry(Base):
+    """Append-only log of writes to a project's rows, read by the change feed."""
+    __tablename__ = "change_log"
+    __table_args__ = (
+        Index("ix_change_log_project_revision", "project_id", "revision"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    # No foreign key: entries are deleted with their project explicitly
+    project_id = Column(String(36), nullable=False)
+    revision = Column(Integer, nullable=False)
+    entity = Column(String(32), nullable=False)  # document, extraction, review, annotation
+    entity_id = Column(String(36), nullable=False)
+    operation = Column(String(16), nullable=False)  # insert, update, delete
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+
+
 class Task(Base):
     """Tracks async processing tasks (ingestion, extraction, evaluation)."""
     __tablename__ = "tasks"
+    __table_args__ = (
+        Index("ix_tasks_project", "project_id"),
+    )
 
     id = Column(String(36), primary_key=True, default=lambda: str(uuid4()))
     task_type = Column(String(64), nullable=False)  # ingest, extract, evaluate
@@ -250,6 +373,9 @@ class Task(Base):
 class EvaluationResult(Base):
     """Stores evaluation metrics comparing AI vs. human extraction."""
     __tablename__ = "evaluation_results"
+    __table_args__ = (
+        Index("ix_evaluation_results_project_document", "project_id", "document_id"),
+    )
 
     id = Column(String(36), primary_key=True, default=lambda: str(uuid4()))
     project_id = Column(String(36), ForeignKey("projects.id"), nullable=False)
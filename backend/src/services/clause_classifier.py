@@ -0,0 +1,203 @@
+"""
+Ingest-time clause classification.
+
+Each chunk is tagged with the clause families it discusses (governing law,
+termination, indemnification, ...) by keyword scoring, so field extraction
+can look only at the chunks tagged with the field's family instead of
+searching the whole document for every field.
+"""
+
+import re
+from typing import Dict, List, Optional
+
+# family -> (field name markers, chunk keywords). Families mirror the clause
+# fields handled by FieldExtractor._get_patterns_for_field.
+CLAUSE_FAMILIES: Dict[str, tuple] = {
+    'governing_law': (
+        ('governing law', 'law'),
+        ('governing law', 'governed by', 'construed in accordance', 'laws of the state'),
+    ),
+    'confidentiality': (
+        ('confidential', 'confidentiality', 'non disclosure'),
+        ('confidential', 'non-disclosure', 'nondisclosure', 'proprietary information', 'disclose'),
+    ),
+    'termination': (
+        ('termination', 'terminate'),
+        ('terminat', 'for cause', 'for convenience', 'material breach'),
+    ),
+    'indemnification': (
+        ('indemnification', 'indemnity', 'indemnify'),
+        ('indemnif', 'indemnit', 'hold harmless', 'defend'),
+    ),
+    'liability': (
+        ('liability cap', 'liability', 'liable', 'cap'),
+        ('limitation of liability', 'aggregate liability', 'shall not exceed', 'consequential damages', 'liable'),
+    ),
+    'jurisdiction': (
+        ('jurisdiction', 'venue'),
+        ('jurisdiction', 'venue', 'courts of', 'submit to'),
+    ),
+    'notice': (
+        ('notice', 'notices'),
+        ('notices', 'written notice', 'certified mail', 'registered mail', 'courier', 'address for notice'),
+    ),
+    'assignment': (
+        ('assignment', 'assign'),
+        ('assign', 'successors and permitted', 'delegate'),
+    ),
+    'force_majeure': (
+        ('force majeure',),
+        ('force majeure', 'beyond its reasonable control', 'beyond their reasonable control', 'acts of god'),
+    ),
+    'dispute_resolution': (
+        ('dispute', 'disputes', 'arbitration'),
+        ('arbitrat', 'dispute resolution', 'mediation', 'disputes'),
+    ),
+    'warranties': (
+        ('warranty', 'warranties'),
+        ('warrant', 'merchantability', 'fitness for a particular purpose'),
+    ),
+    'exclusivity': (
+        ('exclusivity', 'exclusive'),
+        ('exclusiv', 'sole supplier', 'sole source'),
+    ),
+    'change_of_control': (
+        ('change of control',),
+        ('change of control', 'change in control', 'merger', 'acquisition of'),
+    ),
+    'amendment': (
+        ('amendment', 'amendments', 'modification'),
+        ('amend', 'modif', 'in writing signed by'),
+    ),
+    'severability': (
+        ('severability',),
+        ('severab', 'invalid or unenforceable', 'illegal or unenforceable'),
+    ),
+    'waiver': (
+        ('waiver',),
+        ('waive', 'failure to enforce', 'failure or delay'),
+    ),
+    'survival': (
+        ('survival',),
+        ('surviv',),
+    ),
+    'entire_agreement': (
+        ('entire agreement',),
+        ('entire agreement', 'supersede', 'entire understanding'),
+    ),
+    'counterparts': (
+        ('counterparts',),
+        ('counterpart', 'facsimile', 'electronic signature'),
+    ),
+    'audit': (
+        ('audit',),
+        ('audit', 'books and records', 'inspect'),
+    ),
+    'insurance': (
+        ('insurance',),
+        ('insurance', 'insured', 'insurer', 'coverage'),
+    ),
+    'data_privacy': (
+        ('data privacy', 'privacy', 'data protection'),
+        ('personal data', 'data protection', 'privacy', 'personal information', 'gdpr'),
+    ),
+    'non_solicitation': (
+        ('non solicitation', 'solicit', 'solicitation'),
+        ('solicit', 'hire any employee'),
+    ),
+    'non_compete': (
+        ('non compete', 'compete', 'non competition'),
+        ('non-compet', 'noncompet', 'compete'),
+    ),
+    'subcontracting': (
+        ('subcontract', 'subcontracting'),
+        ('subcontract',),
+    ),
+    'intellectual_property': (
+        ('intellectual property', 'ip rights'),
+        ('intellectual property', 'patent', 'trademark', 'copyright', 'trade secret'),
+    ),
+    'publicity': (
+        ('publicity',),
+        ('publicity', 'press release', 'public announcement'),
+    ),
+    'term': (
+        ('term',),
+        ('initial term', 'renewal term', 'term of this agreement', 'automatically renew', 'expir'),
+    ),
+}
+
+# A chunk needs this score to be tagged; a keyword in its heading scores
+# HEADING_WEIGHT, one in its text scores 1
+MIN_SCORE = 2
+HEADING_WEIGHT = 3
+
+_KEYWORD_FAMILY = {
+    keyword: family
+    for family, (_, keywords) in CLAUSE_FAMILIES.items()
+    for keyword in keywords
+}
+
+
+def _keyword_pattern(keywords) -> re.Pattern:
+    """
+    One alternation over all keywords, grouped by first letter so the regex
+    engine only tries the keywords that can match at a word start. Keywords
+    may be word prefixes ("terminat"); longer ones are tried first.
+    """
+    by_first: Dict[str, List[str]] = {}
+    for keyword in sorted(keywords, key=len, reverse=True):
+        by_first.setdefault(keyword[0], []).append(keyword[1:])
+    return re.compile(r'\b(?:' + '|'.join(
+        re.escape(first) + '(?:' + '|'.join(re.escape(rest) for rest in rests) + ')'
+        for first, rests in sorted(by_first.items())
+    ) + ')')
+
+
+_KEYWORDS = _keyword_pattern(_KEYWORD_FAMILY)
+
+
+def family_for_field(field_name: str, display_name: Optional[str] = '') -> Optional[str]:
+    """
+    Get the clause family a field is extracted from, or None.
+
+    Fields that are not clauses (dates, parties, amounts) have no family and
+    are searched in the whole document.
+    """
+    name = ' '.join(re.findall(r'[a-z]+', f"{field_name} {display_name or ''}".lower().replace('-', ' ')))
+    padded = f" {name} "
+    best = None
+    for family, (markers, _) in CLAUSE_FAMILIES.items():
+        for marker in markers:
+            # Prefer the longest matching marker: "liability cap" over "cap"
+            if f" {marker} " in padded and (best is None or len(marker) > best[1]):
+                best = (family, len(marker))
+    return best[0] if best else None
+
+
+def classify_chunk(text: str, heading: Optional[str] = None) -> Dict[str, int]:
+    """Score a chunk against every clause family and return the families it is tagged with."""
+    scores: Dict[str, int] = {}
+    for keyword in _KEYWORDS.findall(text.lower()):
+        family = _KEYWORD_FAMILY[keyword]
+        scores[family] = scores.get(family, 0) + 1
+    if heading:
+        for keyword in _KEYWORDS.findall(heading.lower()):
+            family = _KEYWORD_FAMILY[keyword]
+            scores[family] = scores.get(family, 0) + HEADING_WEIGHT
+    return {family: score for family, score in scores.items() if score >= MIN_SCORE}
+
+
+def classify_chunks(chunks: List[Dict[str, object]]) -> List[Dict[str, object]]:
+    """
+    Tag chunk dicts ('chunk_index', 'text', optional 'section_title').
+
+    Returns:
+        Rows of {'chunk_index', 'family', 'score'}
+    """
+    tags = []
+    for chunk in chunks:
+        families = classify_chunk(chunk['text'], chunk.get('section_title'))
+        for family, score in families.items():
+            tags.append({'chunk_index': chunk['chunk_index'], 'family': family, 'score': score})
+    return tags
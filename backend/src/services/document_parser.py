@@ -5,20 +5,59 @@ Supports multiple formats: PDF, DOCX, HTML, TXT.
 
 import os
 import re
+import bisect
 import mimetypes
+import zipfile
+from datetime import datetime
 from pathlib import Path
-from typing import Tuple, Dict, Any, Optional
+from xml.etree import ElementTree
+from typing import Tuple, Dict, Any, Optional, Iterable, Iterator, List
 from io import BytesIO
 import logging
 
+from src.services.pdf_backends import PDFPages, select_backend, available_backends
+
 logger = logging.getLogger(__name__)
 
+# Contract headings at the start of a line: ARTICLE IV, Section 2.01,
+# numbered "3." / "3.2" headings and lettered or roman "(a)" / "(iv)" clauses.
+SECTION_HEADING = re.compile(
+    r"""^[ \t]*(?P<heading>
+        (?P<article>ARTICLE|Article)[ \t]+(?P<article_num>[IVXLCDM]+|\d{1,3})\b[.:]?[ \t]*(?P<article_title>[^\n]*)
+      | (?:SECTION|Section|\u00a7)[ \t]*(?P<section_num>\d{1,3}(?:\.\d{1,3})*)\.?[ \t]+(?P<section_title>[A-Z][^\n]*)
+      | (?P<numbered_num>\d{1,3}\.(?:\d{1,3}(?:\.\d{1,3})*\.?)?)[ \t]+(?P<numbered_title>[A-Z][^\n]*)
+      | \((?P<clause_num>[a-z]{1,4})\)[ \t]*(?P<clause_title>[^\n]*)
+    )""",
+    re.MULTILINE | re.VERBOSE,
+)
+_ROMAN = re.compile(r'^[ivxl]+$')
+MAX_SECTION_TITLE = 80
+
+
+def _heading_title(line: str) -> str:
+    """Title of a heading line: the text up to its first period, if short."""
+    title = line.strip().split('. ', 1)[0].rstrip('.').strip()
+    return title if len(title) <= MAX_SECTION_TITLE else ''
+
+
+def section_label(section: Dict[str, Any]) -> str:
+    """Display label for a section, e.g. '1.2 Offer' or 'ARTICLE IV Covenants'."""
+    return f"{section['number']} {section['title']}".strip()
+
+# OOXML namespaces used when reading DOCX packages
+_W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+_DC = '{http://purl.org/dc/elements/1.1/}'
+_DCTERMS = '{http://purl.org/dc/terms/}'
+
 
 class DocumentParser:
     """Handles document parsing for multiple formats."""
 
     SUPPORTED_FORMATS = {'.pdf', '.docx', '.html', '.htm', '.txt'}
     MAX_FILE_SIZE = 50 * 1024 * 1024  # 50MB
+    UNIT_SEPARATOR = '\n'  # Joins streamed units back into document text
+    MAX_UNIT_CHARS = 64 * 1024  # Upper bound for a single streamed text unit
+    NO_TEXT_WARNING = "[SYSTEM WARNING: No text could be extracted from this document. It may be a scanned PDF or image-based. Text extraction requires searchable text.]"
 
     @staticmethod
     def is_supported(filename: str) -> bool:
@@ -51,6 +90,181 @@ class DocumentParser:
         else:
             raise ValueError(f"Unsupported file type: {file_type}")
 
+    @staticmethod
+    def iter_units(
+        file_path: str,
+        file_type: str,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream document text as page or paragraph units.
+
+        Each unit is a dict with 'text' and 'page_number'. Joining unit texts
+        with UNIT_SEPARATOR gives the document text. Metadata is filled in
+        place while streaming and is complete once the generator is exhausted;
+        metadata['page_offsets'][n - 1] is the offset where page n starts.
+
+        Args:
+            file_path: Path to the document file
+            file_type: File extension (pdf, docx, html, txt)
+            metadata: Optional dict that receives the document metadata
+
+        Yields:
+            Unit dictionaries in document order
+        """
+        file_type = file_type.lower().strip('.')
+        if metadata is None:
+            metadata = {}
+
+        if file_type == 'pdf':
+            units = DocumentParser._iter_pdf(file_path, metadata)
+        elif file_type == 'txt':
+            units = DocumentParser._iter_txt(file_path, metadata)
+        elif file_type in ['html', 'htm']:
+            units = DocumentParser._iter_html(file_path, metadata)
+        elif file_type == 'docx':
+            units = DocumentParser._iter_docx(file_path, metadata)
+        else:
+            raise ValueError(f"Unsupported file type: {file_type}")
+
+        metadata['word_count'] = 0
+        page_offsets = [0]
+        offset = 0
+        for unit in units:
+            # Pages without text get the offset of the next page that has some
+            page = unit.get('page_number') or 1
+            while len(page_offsets) < page:
+                page_offsets.append(offset)
+            metadata['word_count'] += len(unit['text'].split())
+            offset += len(unit['text']) + len(DocumentParser.UNIT_SEPARATOR)
+            yield unit
+        metadata['page_offsets'] = page_offsets
+
+    @staticmethod
+    def page_for_offset(page_offsets: Optional[List[int]], offset: int) -> int:
+        """Map a character offset in the document text to its page number."""
+        if not page_offsets:
+            return 1
+        return max(bisect.bisect_right(page_offsets, offset), 1)
+
+    @staticmethod
+    def _join_units(file_path: str, file_type: str) -> Tuple[str, Dict[str, Any]]:
+        """Parse a whole document by joining its streamed units."""
+        metadata = {}
+        units = DocumentParser.iter_units(file_path, file_type, metadata)
+        content = DocumentParser.UNIT_SEPARATOR.join(unit['text'] for unit in units)
+        return content, metadata
+
+    @staticmethod
+    def _iter_txt(file_path: str, metadata: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """Stream a plain text file as blank-line separated paragraphs."""
+        metadata.update({'format': 'text', 'pages': 1, 'language': 'en'})
+
+        try:
+            with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+                lines = []
+                size = 0
+                for line in f:
+                    lines.append(line)
+                    size += len(line)
+                    if not line.strip() or size >= DocumentParser.MAX_UNIT_CHARS:
+                        yield {'text': DocumentParser._join_lines(lines), 'page_number': 1}
+                        lines = []
+                        size = 0
+                if lines:
+                    yield {'text': DocumentParser._join_lines(lines), 'page_number': 1}
+        except Exception as e:
+            logger.error(f"Error parsing TXT file {file_path}: {str(e)}")
+            raise
+
+    @staticmethod
+    def _join_lines(lines: List[str]) -> str:
+        """Join raw lines into a unit, leaving the final newline to the separator."""
+        text = ''.join(lines)
+        return text[:-1] if text.endswith('\n') else text
+
+    @staticmethod
+    def _iter_pdf(file_path: str, metadata: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """
+        Stream a PDF page by page.
+
+        The extraction backend is chosen per document by probing its first
+        pages. Pages the chosen backend fails on, or returns no text for,
+        are retried with the other available backends.
+        """
+        try:
+            backend, probe_reports = select_backend(file_path)
+            metadata.update({'format': 'pdf', 'pages': 0, 'pdf_backend': backend.name})
+            if probe_reports:
+                metadata['pdf_backend_probe'] = probe_reports
+
+            pages = backend.open(file_path)
+            fallbacks = {}
+            try:
+                metadata['pages'] = pages.page_count
+
+                # Extract document info
+                metadata.update(pages.metadata())
+
+                # Extract text from each page
+                has_text = False
+                for page_num in range(1, pages.page_count + 1):
+                    text = DocumentParser._extract_pdf_page(pages, page_num, backend.name, fallbacks, metadata)
+                    if text and text.strip():
+                        has_text = True
+                        yield {'text': f"\n--- Page {page_num} ---\n{text}", 'page_number': page_num}
+            finally:
+                pages.close()
+                for fallback_pages in fallbacks.values():
+                    if fallback_pages:
+                        fallback_pages.close()
+
+            if not has_text:
+                logger.warning(f"No text extracted from PDF {file_path}. It might be scanned.")
+                yield {'text': DocumentParser.NO_TEXT_WARNING, 'page_number': 1}
+
+        except Exception as e:
+            logger.error(f"Error parsing PDF file {file_path}: {str(e)}")
+            raise
+
+    @staticmethod
+    def _extract_pdf_page(
+        pages: PDFPages,
+        page_num: int,
+        backend_name: str,
+        fallbacks: Dict[str, Optional[PDFPages]],
+        metadata: Dict[str, Any],
+    ) -> str:
+        """Extract one page, falling back to other backends on failure."""
+        try:
+            text = pages.extract_page(page_num)
+            if text and text.strip():
+                return text
+        except Exception as e:
+            logger.warning(f"PDF backend {backend_name} failed on page {page_num}: {e}")
+
+        for fallback in available_backends():
+            if fallback.name == backend_name:
+                continue
+            if fallback.name not in fallbacks:
+                try:
+                    fallbacks[fallback.name] = fallback.open(pages.file_path)
+                except Exception as e:
+                    logger.warning(f"PDF backend {fallback.name} could not open {pages.file_path}: {e}")
+                    fallbacks[fallback.name] = None
+            fallback_pages = fallbacks[fallback.name]
+            if not fallback_pages:
+                continue
+            try:
+                text = fallback_pages.extract_page(page_num)
+            except Exception as e:
+                logger.warning(f"PDF backend {fallback.name} failed on page {page_num}: {e}")
+                continue
+            if text and text.strip():
+                metadata.setdefault('pdf_fallback_pages', {})[str(page_num)] = fallback.name
+                return text
+        return ''
+
     @staticmethod
     def _parse_txt(file_path: str) -> Tuple[str, Dict[str, Any]]:
         """Parse plain text file."""
@@ -63,6 +277,7 @@ class DocumentParser:
                 'pages': 1,
                 'language': 'en',
                 'word_count': len(content.split()),
+                'page_offsets': [0],
             }
             
             return content, metadata
@@ -72,93 +287,165 @@ class DocumentParser:
 
     @staticmethod
     def _parse_pdf(file_path: str) -> Tuple[str, Dict[str, Any]]:
-        """Parse PDF file using PyPDF2."""
-        try:
-            import PyPDF2
-        except ImportError:
-            raise ImportError("PyPDF2 required for PDF parsing. Install: pip install PyPDF2")
-        
+        """Parse PDF file page by page."""
+        return DocumentParser._join_units(file_path, 'pdf')
+
+    @staticmethod
+    def _iter_docx(file_path: str, metadata: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """
+        Stream a DOCX file straight from word/document.xml.
+
+        Paragraphs and table rows are yielded in document order; table cells
+        are joined with ' | '. Elements are cleared once their text has been
+        read, so memory stays bounded by the largest paragraph or table row.
+        """
+        metadata.update({'format': 'docx', 'pages': 1, 'core_properties': {}})
+
         try:
-            content_parts = []
-            metadata = {'format': 'pdf', 'pages': 0}
-            
-            with open(file_path, 'rb') as f:
-                pdf_reader = PyPDF2.PdfReader(f)
-                num_pages = len(pdf_reader.pages)
-                metadata['pages'] = num_pages
-                
-                # Extract text from each page
-                for page_num, page in enumerate(pdf_reader.pages, 1):
-                    text = page.extract_text()
-                    if text and text.strip():
-                        content_parts.append(f"\n--- Page {page_num} ---\n{text}")
-                
-                if not content_parts:
-                    logger.warning(f"No text extracted from PDF {file_path}. It might be scanned.")
-                    content_parts.append("[SYSTEM WARNING: No text could be extracted from this document. It may be a scanned PDF or image-based. Text extraction requires searchable text.]")
-                
-                # Extract document info
-                if pdf_reader.metadata:
-                    metadata['title'] = pdf_reader.metadata.get('/Title', '')
-                    metadata['author'] = pdf_reader.metadata.get('/Author', '')
-                    metadata['subject'] = pdf_reader.metadata.get('/Subject', '')
-            
-            content = '\n'.join(content_parts)
-            metadata['word_count'] = len(content.split())
-            return content, metadata
-            
+            with zipfile.ZipFile(file_path) as package:
+                metadata['core_properties'] = DocumentParser._read_docx_core_properties(package)
+                with package.open('word/document.xml') as document_xml:
+                    yield from DocumentParser._iter_docx_body(document_xml)
         except Exception as e:
-            logger.error(f"Error parsing PDF file {file_path}: {str(e)}")
+            logger.error(f"Error parsing DOCX file {file_path}: {str(e)}")
             raise
 
+    @staticmethod
+    def _iter_docx_body(document_xml) -> Iterator[Dict[str, Any]]:
+        """Incrementally parse document.xml into paragraph and table-row units."""
+        paragraph_tag, row_tag, cell_tag, table_tag = (
+            _W + 'p', _W + 'tr', _W + 'tc', _W + 'tbl',
+        )
+        # One entry per open table row: the list of cell texts collected so far
+        rows: List[List[str]] = []
+        # One entry per open table cell: the paragraphs collected so far
+        cells: List[List[str]] = []
+        table_depth = 0
+
+        for event, elem in ElementTree.iterparse(document_xml, events=('start', 'end')):
+            tag = elem.tag
+            if event == 'start':
+                if tag == table_tag:
+                    table_depth += 1
+                elif tag == row_tag:
+                    rows.append([])
+                elif tag == cell_tag:
+                    cells.append([])
+                continue
+
+            if tag == paragraph_tag:
+                text = DocumentParser._docx_paragraph_text(elem)
+                elem.clear()
+                if table_depth and cells:
+                    cells[-1].append(text)
+                elif text.strip():
+                    yield {'text': text, 'page_number': 1}
+            elif tag == cell_tag and cells:
+                rows[-1].append('\n'.join(cells.pop()).strip())
+            elif tag == row_tag and rows:
+                row_text = ' | '.join(rows.pop())
+                elem.clear()
+                if cells:
+                    # Nested table: the row belongs to the enclosing cell
+                    cells[-1].append(row_text)
+                elif row_text.strip(' |'):
+                    yield {'text': row_text, 'page_number': 1}
+            elif tag == table_tag:
+                table_depth -= 1
+                elem.clear()
+
+    @staticmethod
+    def _docx_paragraph_text(paragraph) -> str:
+        """Text of a w:p element, with tabs and breaks as python-docx renders them."""
+        parts = []
+        for node in paragraph.iter():
+            tag = node.tag
+            if tag == _W + 't':
+                parts.append(node.text or '')
+            elif tag == _W + 'tab':
+                parts.append('\t')
+            elif tag in (_W + 'br', _W + 'cr'):
+                parts.append('\n')
+        return ''.join(parts)
+
+    @staticmethod
+    def _read_docx_core_properties(package: zipfile.ZipFile) -> Dict[str, Any]:
+        """Read title, author, subject and created date from docProps/core.xml."""
+        try:
+            with package.open('docProps/core.xml') as core_xml:
+                root = ElementTree.parse(core_xml).getroot()
+        except KeyError:
+            return {}
+
+        def text(tag: str) -> str:
+            node = root.find(tag)
+            return (node.text or '').strip() if node is not None else ''
+
+        created = text(_DCTERMS + 'created')
+        if created:
+            try:
+                created = str(datetime.fromisoformat(created.replace('Z', '+00:00')).replace(tzinfo=None))
+            except ValueError:
+                pass
+
+        return {
+            'title': text(_DC + 'title'),
+            'author': text(_DC + 'creator'),
+            'subject': text(_DC + 'subject'),
+            'created': created or None,
+        }
+
     @staticmethod
     def _parse_docx(file_path: str) -> Tuple[str, Dict[str, Any]]:
-        """Parse DOCX file using python-docx."""
+        """Parse DOCX file from its OOXML package."""
+        return DocumentParser._join_units(file_path, 'docx')
+
+    @staticmethod
+    def _iter_html(file_path: str, metadata: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """
+        Stream an HTML file as one unit per block-level line.
+
+        Uses lxml's event-driven parser so no DOM is built; script and style
+        content is skipped and block elements end the current line. Falls back
+        to the BeautifulSoup parse when lxml is not installed.
+        """
         try:
-            from docx import Document
+            from lxml import etree
         except ImportError:
-            raise ImportError("python-docx required for DOCX parsing. Install: pip install python-docx")
-        
+            yield from DocumentParser._iter_parsed_html(file_path, metadata)
+            return
+
+        metadata['format'] = 'html'
+        target = _HTMLTextTarget(metadata)
+        parser = etree.HTMLParser(target=target, encoding='utf-8')
+
         try:
-            doc = Document(file_path)
-            
-            # Extract text from paragraphs
-            paragraphs = [p.text for p in doc.paragraphs if p.text.strip()]
-            content = '\n'.join(paragraphs)
-            
-            # Extract tables
-            for table in doc.tables:
-                table_text = []
-                for row in table.rows:
-                    row_cells = [cell.text.strip() for cell in row.cells]
-                    table_text.append(' | '.join(row_cells))
-                content += '\n\n' + '\n'.join(table_text)
-            
-            # Extract metadata
-            metadata = {
-                'format': 'docx',
-                'core_properties': {},
-            }
-            
-            if doc.core_properties:
-                props = doc.core_properties
-                metadata['core_properties'] = {
-                    'title': props.title or '',
-                    'author': props.author or '',
-                    'subject': props.subject or '',
-                    'created': str(props.created) if props.created else None,
-                }
-            
-            metadata['word_count'] = len(content.split())
-            return content, metadata
-            
+            with open(file_path, 'rb') as f:
+                for block in iter(lambda: f.read(DocumentParser.MAX_UNIT_CHARS), b''):
+                    parser.feed(block)
+                    yield from target.drain()
+            parser.close()
+            yield from target.drain()
         except Exception as e:
-            logger.error(f"Error parsing DOCX file {file_path}: {str(e)}")
+            logger.error(f"Error parsing HTML file {file_path}: {str(e)}")
             raise
 
+    @staticmethod
+    def _iter_parsed_html(file_path: str, metadata: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """Stream the BeautifulSoup parse for environments without lxml."""
+        content, parsed_metadata = DocumentParser._parse_html_soup(file_path)
+        metadata.update(parsed_metadata)
+        for line in content.split('\n'):
+            yield {'text': line, 'page_number': 1}
+
     @staticmethod
     def _parse_html(file_path: str) -> Tuple[str, Dict[str, Any]]:
         """Parse HTML file."""
+        return DocumentParser._join_units(file_path, 'html')
+
+    @staticmethod
+    def _parse_html_soup(file_path: str) -> Tuple[str, Dict[str, Any]]:
+        """Parse HTML file with BeautifulSoup (compatibility fallback)."""
         try:
             from bs4 import BeautifulSoup
         except ImportError:
@@ -204,90 +491,464 @@ class DocumentParser:
             raise
 
 
+class _HTMLTextTarget:
+    """
+    lxml parser target that turns HTML events into lines of text.
+
+    Text inside one block element is collected and whitespace-collapsed when
+    the block ends; table cells are separated by a single space.
+    """
+
+    BLOCK_TAGS = {
+        'address', 'article', 'aside', 'blockquote', 'body', 'br', 'caption', 'dd',
+        'div', 'dl', 'dt', 'figcaption', 'figure', 'footer', 'form', 'h1', 'h2',
+        'h3', 'h4', 'h5', 'h6', 'head', 'header', 'hr', 'html', 'li', 'main', 'nav',
+        'ol', 'p', 'pre', 'section', 'table', 'tbody', 'tfoot', 'thead', 'title',
+        'tr', 'ul',
+    }
+    CELL_TAGS = {'td', 'th'}
+    SKIP_TAGS = {'script', 'style', 'noscript', 'template'}
+
+    def __init__(self, metadata: Dict[str, Any]):
+        self.metadata = metadata
+        self._parts: List[str] = []
+        self._lines: List[str] = []
+        self._skip_depth = 0
+        self._in_title = False
+        self._title_parts: List[str] = []
+
+    def start(self, tag, attrib):
+        tag = tag.lower() if isinstance(tag, str) else ''
+        if tag in self.SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag in self.BLOCK_TAGS:
+            self._flush()
+            self._in_title = tag == 'title'
+        elif tag in self.CELL_TAGS:
+            self._parts.append(' ')
+        elif tag == 'meta':
+            name = (attrib.get('name') or '').lower()
+            if name in ('author', 'description'):
+                self.metadata[name] = attrib.get('content', '')
+
+    def end(self, tag):
+        tag = tag.lower() if isinstance(tag, str) else ''
+        if tag in self.SKIP_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag in self.BLOCK_TAGS:
+            if tag == 'title' and self._in_title:
+                self.metadata['title'] = ' '.join(''.join(self._title_parts).split())
+                self._in_title = False
+            self._flush()
+        elif tag in self.CELL_TAGS:
+            self._parts.append(' ')
+
+    def data(self, text):
+        if self._skip_depth:
+            return
+        self._parts.append(text)
+        if self._in_title:
+            self._title_parts.append(text)
+
+    def comment(self, text):
+        pass
+
+    def close(self):
+        self._flush()
+
+    def _flush(self):
+        if self._parts:
+            line = ' '.join(''.join(self._parts).split())
+            if line:
+                self._lines.append(line)
+            self._parts = []
+
+    def drain(self) -> Iterator[Dict[str, Any]]:
+        """Yield the lines completed so far."""
+        lines, self._lines = self._lines, []
+        for line in lines:
+            yield {'text': line, 'page_number': 1}
+
+
 class DocumentChunker:
     """Chunks documents for indexing and retrieval."""
+
+    # Whitespace after sentence punctuation (group 1). Leading with the
+    # punctuation class scans much faster than an equivalent lookbehind.
+    SENTENCE_BOUNDARY = re.compile(r'[.!?](\s+)')
     
-    def __init__(self, chunk_size: int = 1000, overlap: int = 100):
+    def __init__(self, chunk_size: int = 1000, overlap: int = 100, max_window_chars: int = 256 * 1024):
         """
         Initialize chunker.
         
         Args:
             chunk_size: Number of words per chunk
             overlap: Number of overlapping words between chunks
+            max_window_chars: Longest unterminated sentence kept while streaming
         """
         self.chunk_size = chunk_size
         self.overlap = overlap
+        self.max_window_chars = max_window_chars
 
     def chunk(self, text: str, metadata: Optional[Dict[str, Any]] = None) -> list:
         """
         Split text into overlapping chunks.
+
+        Compatibility output for chunk_spans(): each chunk's text is its
+        sentences joined by single spaces.
         
         Args:
             text: Full document text
-            metadata: Document metadata
+            metadata: Document metadata; its 'page_offsets' give chunk pages
             
         Returns:
             List of chunk dictionaries
         """
-        # Split by sentences first
-        sentences = self._split_sentences(text)
-        
+        page_offsets = (metadata or {}).get('page_offsets')
+        sentences, cumulative_words = self._sentence_spans(text)
+
         chunks = []
-        current_chunk = []
-        current_word_count = 0
-        page_number = 1
-        
-        for i, sentence in enumerate(sentences):
-            words_in_sentence = len(sentence.split())
-            
-            if current_word_count + words_in_sentence > self.chunk_size and current_chunk:
-                # Save current chunk
-                chunk_text = ' '.join(current_chunk)
-                chunks.append({
-                    'text': chunk_text,
-                    'page_number': self._estimate_page(i, len(sentences)),
-                    'section': self._detect_section(chunk_text),
-                    'word_count': len(chunk_text.split()),
-                })
-                
-                # Create overlap
-                overlap_sentences = []
-                word_count = 0
-                for j in range(len(current_chunk) - 1, -1, -1):
-                    overlap_sentences.insert(0, current_chunk[j])
-                    word_count += len(current_chunk[j].split())
-                    if word_count > self.overlap:
-                        break
-                
-                current_chunk = overlap_sentences
-                current_word_count = word_count
-            
-            current_chunk.append(sentence)
-            current_word_count += words_in_sentence
-        
-        # Add final chunk
-        if current_chunk:
-            chunk_text = ' '.join(current_chunk)
+        for first, last in self._chunk_windows(cumulative_words):
+            chunk_text = ' '.join(text[start:end] for start, end in sentences[first:last])
             chunks.append({
                 'text': chunk_text,
-                'page_number': page_number,
+                'page_number': DocumentParser.page_for_offset(page_offsets, sentences[first][0]),
                 'section': self._detect_section(chunk_text),
                 'word_count': len(chunk_text.split()),
             })
-        
         return chunks
 
+    def chunk_spans(self, text: str, pos: int = 0, endpos: Optional[int] = None) -> List[Tuple[int, int, int]]:
+        """
+        Chunk text into (start, end, word_count) character spans.
+
+        Tokenizes the text once and places chunk and overlap boundaries with
+        cumulative word counts, so chunking is linear in the text length and
+        no chunk text is copied. Boundaries match chunk(). pos and endpos
+        restrict chunking to part of the text.
+        """
+        sentences, cumulative_words = self._sentence_spans(text, pos, endpos)
+        return [
+            (sentences[first][0], sentences[last - 1][1], cumulative_words[last] - cumulative_words[first])
+            for first, last in self._chunk_windows(cumulative_words)
+        ]
+
+    def iter_span_chunks(
+        self,
+        text: str,
+        spans: Iterable[Tuple[int, int, int]],
+        metadata: Optional[Dict[str, Any]] = None,
+        sections: Optional[List[Dict[str, Any]]] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Materialize chunk dicts for spans on demand, in the chunk_stream() format.
+
+        With a section tree from detect_sections(), each chunk is labelled
+        with the innermost section containing its start.
+        """
+        page_offsets = (metadata or {}).get('page_offsets')
+        section_starts = [section['start_offset'] for section in sections or []]
+        for start, end, word_count in spans:
+            chunk_text = text[start:end]
+            section = self.section_at(sections, start, section_starts) if sections else None
+            yield {
+                'text': chunk_text,
+                'page_number': DocumentParser.page_for_offset(page_offsets, start),
+                'section': section_label(section) if section else self._detect_section(chunk_text),
+                'word_count': word_count,
+                'start_offset': start,
+                'end_offset': end,
+            }
+
+    def detect_sections(self, text: str) -> List[Dict[str, Any]]:
+        """
+        Detect the contract hierarchy (ARTICLE / Section 1.2 / (a) / (i)) in one pass.
+
+        Returns:
+            Section dicts in document order with 'index', 'parent' (index or
+            None), 'level', 'number', 'title', 'start_offset' and
+            'end_offset'. A section ends where the next section of the same
+            or a higher level starts.
+        """
+        sections = []
+        open_sections = []  # Stack of sections that have not ended yet
+        last_letter = None
+
+        for match in SECTION_HEADING.finditer(text):
+            if match.group('article'):
+                level, number = 1, f"ARTICLE {match.group('article_num')}"
+                title = match.group('article_title')
+            elif match.group('section_num') or match.group('numbered_num'):
+                number = (match.group('section_num') or match.group('numbered_num')).rstrip('.')
+                level = min(2 + number.count('.'), 4)
+                title = match.group('section_title') or match.group('numbered_title')
+            else:
+                label = match.group('clause_num')
+                # "(i)" after "(h)" is a letter, otherwise roman numerals nest below letters
+                roman = bool(_ROMAN.match(label)) and not (label == 'i' and last_letter == 'h')
+                level = 6 if roman else 5
+                if not roman:
+                    last_letter = label
+                number = f"({label})"
+                title = match.group('clause_title')
+                if not title[:1].isupper():
+                    # Wrapped cross-references and list items have no title
+                    title = ''
+
+            start = match.start('heading')
+            while open_sections and open_sections[-1]['level'] >= level:
+                open_sections.pop()['end_offset'] = start
+            section = {
+                'index': len(sections),
+                'parent': open_sections[-1]['index'] if open_sections else None,
+                'level': level,
+                'number': number,
+                'title': _heading_title(title),
+                'start_offset': start,
+                'end_offset': len(text),
+            }
+            sections.append(section)
+            open_sections.append(section)
+
+        return sections
+
     @staticmethod
-    def _split_sentences(text: str) -> list:
-        """Split text into sentences."""
-        # Simple sentence splitter
-        sentences = re.split(r'(?<=[.!?])\s+', text)
-        return [s.strip() for s in sentences if s.strip()]
+    def section_at(
+        sections: List[Dict[str, Any]],
+        offset: int,
+        section_starts: Optional[List[int]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Innermost section containing an offset, found by bisect over section starts."""
+        if section_starts is None:
+            section_starts = [section['start_offset'] for section in sections]
+        idx = bisect.bisect_right(section_starts, offset) - 1
+        section = sections[idx] if idx >= 0 else None
+        while section is not None and section['end_offset'] <= offset:
+            section = sections[section['parent']] if section['parent'] is not None else None
+        return section
+
+    def chunk_structure(
+        self,
+        text: str,
+        sections: List[Dict[str, Any]],
+        break_level: int = 2,
+    ) -> List[Tuple[int, int, int]]:
+        """
+        Chunk text along section boundaries within the chunk_size budget.
+
+        The text between consecutive headings is packed into chunks of up to
+        chunk_size words. A new chunk always starts at a section of
+        `break_level` or above (articles and top-level sections by default);
+        a single clause longer than the budget is split by sentences.
+
+        Returns:
+            List of (start, end, word_count) spans without overlap
+        """
+        boundaries = [0] + [section['start_offset'] for section in sections] + [len(text)]
+        levels = [0] + [section['level'] for section in sections]
+
+        spans = []
+        chunk_start = chunk_end = None
+        chunk_words = 0
+
+        def flush():
+            if chunk_start is not None and chunk_words:
+                spans.append(self._trim_span(text, chunk_start, chunk_end, chunk_words))
+
+        for i in range(len(boundaries) - 1):
+            start, end = boundaries[i], boundaries[i + 1]
+            if start == end:
+                continue
+            words = len(text[start:end].split())
+            if not words:
+                continue
+
+            if words > self.chunk_size:
+                flush()
+                spans.extend(self.chunk_spans(text, start, end))
+                chunk_start, chunk_words = None, 0
+                continue
+
+            if chunk_start is not None and (levels[i] <= break_level or chunk_words + words > self.chunk_size):
+                flush()
+                chunk_start, chunk_words = None, 0
+            if chunk_start is None:
+                chunk_start = start
+            chunk_end = end
+            chunk_words += words
+
+        flush()
+        return spans
 
     @staticmethod
-    def _estimate_page(sentence_index: int, total_sentences: int, avg_page_size: int = 250) -> int:
-        """Estimate page number based on sentence position."""
-        return max(1, (sentence_index * 100) // max(1, total_sentences))
+    def _trim_span(text: str, start: int, end: int, word_count: int) -> Tuple[int, int, int]:
+        """Shrink a span to exclude surrounding whitespace."""
+        while start < end and text[start].isspace():
+            start += 1
+        while end > start and text[end - 1].isspace():
+            end -= 1
+        return start, end, word_count
+
+    def _sentence_spans(
+        self,
+        text: str,
+        pos: int = 0,
+        endpos: Optional[int] = None,
+    ) -> Tuple[List[Tuple[int, int]], List[int]]:
+        """
+        Locate sentences and count words in one pass over text[pos:endpos].
+
+        Returns:
+            Tuple of (sentence (start, end) spans without surrounding
+            whitespace, cumulative word counts where entry i is the number
+            of words before sentence i)
+        """
+        if endpos is None:
+            endpos = len(text)
+        sentences = []
+        cumulative_words = [0]
+        words = 0
+        start = pos
+        boundaries = [m.span(1) for m in self.SENTENCE_BOUNDARY.finditer(text, pos, endpos)]
+        boundaries.append((endpos, endpos))
+        for boundary_start, boundary_end in boundaries:
+            segment = text[start:boundary_start]
+            count = len(segment.split())
+            if count:
+                # Only the first and last segments can carry outer whitespace
+                if segment[0].isspace():
+                    start += len(segment) - len(segment.lstrip())
+                if segment[-1].isspace():
+                    boundary_start -= len(segment) - len(segment.rstrip())
+                sentences.append((start, boundary_start))
+                words += count
+                cumulative_words.append(words)
+            start = boundary_end
+        return sentences, cumulative_words
+
+    def _chunk_windows(self, cumulative_words: List[int]) -> List[Tuple[int, int]]:
+        """
+        Group sentences into overlapping [first, last) index windows.
+
+        A window closes when the next sentence would exceed chunk_size words.
+        The next window starts at the latest sentence whose suffix of the
+        closed window holds more than `overlap` words.
+        """
+        windows = []
+        first = 0
+        for i in range(len(cumulative_words) - 1):
+            if i > first and cumulative_words[i + 1] - cumulative_words[first] > self.chunk_size:
+                windows.append((first, i))
+                target = cumulative_words[i] - self.overlap
+                first = max(bisect.bisect_left(cumulative_words, target, first, i) - 1, first)
+        if len(cumulative_words) > 1:
+            windows.append((first, len(cumulative_words) - 1))
+        return windows
+
+    def chunk_stream(self, units: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """
+        Incrementally chunk a stream of text units.
+
+        Units are the page or paragraph dicts produced by
+        DocumentParser.iter_units. Only the current chunk window and the
+        unit being scanned are held in memory. Chunk boundaries follow the
+        same sentence and overlap rules as chunk(), but each chunk's text is
+        the exact slice of the joined document text between its
+        'start_offset' and 'end_offset'.
+
+        Args:
+            units: Iterable of unit dicts with 'text' and 'page_number'
+
+        Yields:
+            Chunk dictionaries in document order
+        """
+        separator = DocumentParser.UNIT_SEPARATOR
+        buffer = ''        # Text retained from global offset `base` onwards
+        base = 0
+        cursor = 0         # Buffer position where the pending sentence starts
+        unit_offsets = []  # Global start offset of each unit in the buffer
+        unit_pages = []    # Page number of each unit in the buffer
+        window = []        # Sentences of the current chunk: (start, end, words, page)
+        window_words = 0
+
+        def page_at(offset: int) -> Optional[int]:
+            idx = bisect.bisect_right(unit_offsets, offset) - 1
+            return unit_pages[max(idx, 0)] if unit_pages else None
+
+        def make_chunk() -> Dict[str, Any]:
+            start, end = window[0][0], window[-1][1]
+            chunk_text = buffer[start - base:end - base]
+            return {
+                'text': chunk_text,
+                'page_number': window[0][3],
+                'section': self._detect_section(chunk_text),
+                'word_count': sum(s[2] for s in window),
+                'start_offset': start,
+                'end_offset': end,
+            }
+
+        def add_sentence(local_start: int, local_end: int) -> Iterator[Dict[str, Any]]:
+            nonlocal buffer, base, cursor, window, window_words
+            segment = buffer[local_start:local_end]
+            stripped = segment.strip()
+            if not stripped:
+                return
+            start = base + local_start + (len(segment) - len(segment.lstrip()))
+            end = start + len(stripped)
+            words = len(stripped.split())
+
+            if window_words + words > self.chunk_size and window:
+                yield make_chunk()
+
+                # Carry trailing sentences over as overlap
+                overlap_sentences = []
+                overlap_words = 0
+                for sentence in reversed(window):
+                    overlap_sentences.append(sentence)
+                    overlap_words += sentence[2]
+                    if overlap_words > self.overlap:
+                        break
+                overlap_sentences.reverse()
+                window = overlap_sentences
+                window_words = overlap_words
+
+                # Drop text that no chunk can reference any more
+                drop = window[0][0] - base
+                buffer = buffer[drop:]
+                base += drop
+                cursor -= drop
+                keep = max(bisect.bisect_right(unit_offsets, base) - 1, 0)
+                del unit_offsets[:keep]
+                del unit_pages[:keep]
+
+            window.append((start, end, words, page_at(start)))
+            window_words += words
+
+        for unit in units:
+            if unit_offsets:
+                buffer += separator
+            unit_offsets.append(base + len(buffer))
+            unit_pages.append(unit.get('page_number'))
+            buffer += unit['text']
+
+            while True:
+                match = self.SENTENCE_BOUNDARY.search(buffer, cursor)
+                if match:
+                    boundary_start, boundary_end = match.span(1)
+                elif len(buffer) - cursor > self.max_window_chars:
+                    # Force a break in unterminated text to bound the window
+                    limit = cursor + self.max_window_chars
+                    split = buffer.rfind(' ', cursor, limit)
+                    boundary_start = boundary_end = split if split > cursor else limit
+                else:
+                    break
+                sentence_start = cursor
+                cursor = boundary_end
+                yield from add_sentence(sentence_start, boundary_start)
+
+        yield from add_sentence(cursor, len(buffer))
+        if window:
+            yield make_chunk()
 
     @staticmethod
     def _detect_section(text: str, max_length: int = 50) -> str:
@@ -19,8 +19,47 @@ try:
 except ImportError:
     GROQ_AVAILABLE = False
 
+from src.services.document_parser import DocumentParser, section_label
+from src.services.token_budget import context_budget, estimate_tokens, pack_context
+from src.services.clause_classifier import family_for_field
+
 logger = logging.getLogger(__name__)
 
+# Longest passage of a chunk kept as a citation
+CITATION_CHARS = 500
+
+
+class _DocumentContexts:
+    """
+    LLM contexts of one document, packed once per provider and chunk selection.
+
+    Fields without sections or clause chunks of their own share one context
+    per provider, and the whole document's token estimate is computed once.
+    """
+
+    def __init__(self, document_text: str):
+        self.document_text = document_text
+        self._document_tokens: Optional[int] = None
+        self._packed: Dict[tuple, str] = {}
+
+    def get(
+        self,
+        provider: str,
+        chunks: List[Dict[str, Any]],
+        priority_chunks: List[Dict[str, Any]],
+        whole_document: bool = True,
+    ) -> str:
+        key = (provider, whole_document, tuple(map(id, chunks)), tuple(map(id, priority_chunks)))
+        packed = self._packed.get(key)
+        if packed is None:
+            if whole_document and self._document_tokens is None:
+                self._document_tokens = estimate_tokens(self.document_text)
+            packed = self._packed[key] = pack_context(
+                self.document_text, chunks, context_budget(provider), priority_chunks,
+                whole_document=whole_document, document_tokens=self._document_tokens,
+            )
+        return packed
+
 
 class FieldExtractor:
     """Extracts fields from documents with citations and confidence scoring."""
@@ -66,6 +105,9 @@ class FieldExtractor:
         document_chunks: List[Dict[str, Any]],
         field_definitions: List[Dict[str, Any]],
         document_id: str,
+        page_offsets: Optional[List[int]] = None,
+        sections: Optional[List[Dict[str, Any]]] = None,
+        clause_index: Optional[Dict[str, List[int]]] = None,
     ) -> List[Dict[str, Any]]:
         """
         Extract fields from document with citations and confidence.
@@ -75,11 +117,15 @@ class FieldExtractor:
             document_chunks: List of chunks with metadata
             field_definitions: List of fields to extract
             document_id: Document identifier
+            page_offsets: Start offset of each page in document_text
+            sections: Section tree from DocumentChunker.detect_sections
+            clause_index: Clause family -> indexes of the chunks tagged with it
             
         Returns:
             List of extraction results with citations and confidence
         """
         results = []
+        contexts = _DocumentContexts(document_text)
         
         for field_def in field_definitions:
             field_name = field_def.get('name') or field_def.get('display_name') or ''
@@ -102,6 +148,10 @@ class FieldExtractor:
                 document_id=document_id,
                 normalization_rules=normalization_rules,
                 validation_rules=validation_rules,
+                page_offsets=page_offsets,
+                sections=sections,
+                clause_index=clause_index,
+                contexts=contexts,
             )
             
             results.append(extraction)
@@ -119,17 +169,43 @@ class FieldExtractor:
         document_id: str,
         normalization_rules: Optional[Dict[str, Any]] = None,
         validation_rules: Optional[Dict[str, Any]] = None,
+        page_offsets: Optional[List[int]] = None,
+        sections: Optional[List[Dict[str, Any]]] = None,
+        clause_index: Optional[Dict[str, List[int]]] = None,
+        contexts: Optional[_DocumentContexts] = None,
     ) -> Dict[str, Any]:
-        """Extract a single field with citations and confidence."""
+        """
+        Extract a single field with citations and confidence.
+
+        When the section tree has sections titled after the field (e.g.
+        "Governing Law" for governing_law), heuristics search those sections
+        first and citations come from chunks inside them. When chunks were
+        tagged with the field's clause family at ingest, only those chunks
+        are searched and sent to the LLM. LLM prompts get as much of that
+        text as the provider's token budget allows, with the field's
+        sections packed first. Packed contexts are shared through contexts
+        by the fields of one document.
+        """
+        contexts = contexts or _DocumentContexts(document_text)
         
         extraction_result = {'value': None, 'raw_text': None, 'confidence': 0.0}
         method = 'heuristic'
+        target_sections = self._sections_for_field(sections, field_name, display_name)
+        section_chunks = self._chunks_in_sections(document_chunks, target_sections)
+        clause_family = family_for_field(field_name, display_name)
+        clause_chunks = self._chunks_for_clause(document_chunks, clause_index, clause_family)
+        citation_chunks = section_chunks or clause_chunks or document_chunks
+
+        def llm_context(provider: str) -> str:
+            if clause_chunks:
+                return contexts.get(provider, clause_chunks, section_chunks, whole_document=False)
+            return contexts.get(provider, document_chunks, section_chunks)
 
         try:
             # 1. Try Groq if available (User preference: Best Model)
             if self.groq_client:
                 extraction_result = self._extract_with_groq(
-                    document_text, field_name, field_type, description
+                    llm_context('groq'), field_name, field_type, description
                 )
                 method = 'groq'
                 
@@ -138,7 +214,7 @@ class FieldExtractor:
                 if not extraction_result.get('value') and self.gemini_model:
                     logger.info(f"Groq extraction failed/empty for {field_name}, attempting Gemini fallback")
                     gemini_result = self._extract_with_gemini(
-                        document_text, field_name, field_type, description
+                        llm_context('gemini'), field_name, field_type, description
                     )
                     if gemini_result.get('value'):
                         extraction_result = gemini_result
@@ -147,14 +223,14 @@ class FieldExtractor:
             # 2. Try Gemini if Groq not available (Primary)
             elif self.gemini_model:
                 extraction_result = self._extract_with_gemini(
-                    document_text, field_name, field_type, description
+                    llm_context('gemini'), field_name, field_type, description
                 )
                 method = 'gemini'
             
             # 3. Try generic LLM if others not available
             elif self.llm_client:
                 extraction_result = self._extract_with_llm(
-                    document_text, field_name, field_type, description
+                    llm_context('llm'), field_name, field_type, description
                 )
                 method = 'llm'
 
@@ -171,9 +247,21 @@ class FieldExtractor:
                 if method != 'heuristic':
                     logger.info(f"LLM extraction ({method}) failed/noise for {field_name}, falling back to heuristics")
                 
-                heuristic_result = self._extract_with_heuristics(
-                    document_text, document_chunks, field_name, field_type, display_name
-                )
+                heuristic_result = {}
+                if target_sections:
+                    heuristic_result = self._extract_with_heuristics(
+                        self._section_text(document_text, target_sections),
+                        citation_chunks, field_name, field_type, display_name
+                    )
+                if not heuristic_result.get('value') and clause_chunks:
+                    heuristic_result = self._extract_with_heuristics(
+                        '\n\n'.join(chunk['text'] for chunk in clause_chunks),
+                        clause_chunks, field_name, field_type, display_name
+                    )
+                elif not heuristic_result.get('value'):
+                    heuristic_result = self._extract_with_heuristics(
+                        document_text, document_chunks, field_name, field_type, display_name
+                    )
                 
                 # Only override if heuristic found something
                 if heuristic_result.get('value'):
@@ -190,9 +278,10 @@ class FieldExtractor:
             # Find and rank citations
             citations = self._find_citations(
                 raw_text or extracted_value,
-                document_chunks,
+                citation_chunks,
                 document_id,
-                top_k=3
+                top_k=3,
+                page_offsets=page_offsets,
             )
             
             # Normalize value
@@ -215,6 +304,8 @@ class FieldExtractor:
                 'extraction_metadata': {
                     'method': method,
                     'extracted_at': datetime.now(timezone.utc).isoformat(),
+                    'sections': [section_label(section) for section in target_sections],
+                    'clause_family': clause_family if clause_chunks else None,
                 }
             }
         except Exception as e:
@@ -237,9 +328,7 @@ class FieldExtractor:
         field_type: str,
         description: str,
     ) -> Dict[str, Any]:
-        """Extract field using Google Gemini LLM."""
-        # Gemini 1.5 Flash has a large context window, so we can use more text
-        # Limit to 50k chars to be safe but informative
+        """Extract field using Google Gemini LLM. document_text is the packed context."""
         prompt = f"""
 You are a legal expert extracting information from a contract.
 Extract the following field:
@@ -249,7 +338,7 @@ Type: {field_type}
 Description: {description}
 
 Context (Document Excerpt):
-{document_text[:50000]}...
+{document_text}
 
 Instructions:
 1. Analyze the context to find the best value for the field.
@@ -317,7 +406,7 @@ Output strictly in JSON format (no markdown fences):
         field_type: str,
         description: str,
     ) -> Dict[str, Any]:
-        """Extract field using Groq LLM."""
+        """Extract field using Groq LLM. document_text is the packed context."""
         prompt = f"""
 You are a legal expert extracting information from a contract.
 Extract the following field:
@@ -327,7 +416,7 @@ Type: {field_type}
 Description: {description}
 
 Context (Document Excerpt):
-{document_text[:30000]}...
+{document_text}
 
 Instructions:
 1. Analyze the context to find the best value for the field.
@@ -428,7 +517,7 @@ Output strictly in JSON format (no markdown fences):
         field_type: str,
         description: str,
     ) -> Dict[str, Any]:
-        """Extract field using LLM."""
+        """Extract field using LLM. document_text is the packed context."""
         prompt = f"""
 Extract the following field from the legal document:
 
@@ -437,7 +526,7 @@ Field Type: {field_type}
 Description: {description}
 
 Document:
-{document_text[:5000]}...
+{document_text}
 
 Please provide:
 1. The extracted value
@@ -937,14 +1026,89 @@ Respond in JSON format:
             return None
         return sentence[:400]
 
+    @staticmethod
+    def _sections_for_field(
+        sections: Optional[List[Dict[str, Any]]],
+        field_name: str,
+        display_name: str,
+    ) -> List[Dict[str, Any]]:
+        """Outermost sections whose title names the field."""
+        if not sections:
+            return []
+        aliases = {
+            alias.replace('_', ' ').lower().strip()
+            for alias in (field_name, display_name) if alias
+        }
+        aliases.discard('')
+        matched = []
+        matched_end = -1
+        for section in sections:
+            # Sections start in document order, so anything starting before
+            # the end of the last match is nested inside it
+            if section['start_offset'] < matched_end or not section['title']:
+                continue
+            title = section['title'].lower()
+            if any(alias in title for alias in aliases):
+                matched.append(section)
+                matched_end = section['end_offset']
+        return matched
+
+    @staticmethod
+    def _section_text(document_text: str, sections: List[Dict[str, Any]]) -> str:
+        """Text of the given sections, joined by blank lines."""
+        return '\n\n'.join(
+            document_text[section['start_offset']:section['end_offset']] for section in sections
+        )
+
+    @staticmethod
+    def _chunks_in_sections(
+        document_chunks: List[Dict[str, Any]],
+        sections: List[Dict[str, Any]],
+    ) -> List[Dict[str, Any]]:
+        """Chunks whose offsets overlap any of the sections."""
+        if not sections:
+            return []
+        return [
+            chunk for chunk in document_chunks
+            if chunk.get('start_offset') is not None and any(
+                chunk['start_offset'] < section['end_offset']
+                and (chunk.get('end_offset') or chunk['start_offset']) > section['start_offset']
+                for section in sections
+            )
+        ]
+
+    @staticmethod
+    def _chunks_for_clause(
+        document_chunks: List[Dict[str, Any]],
+        clause_index: Optional[Dict[str, List[int]]],
+        family: Optional[str],
+    ) -> List[Dict[str, Any]]:
+        """Chunks tagged with a clause family at ingest."""
+        if not family or not clause_index or not clause_index.get(family):
+            return []
+        tagged = set(clause_index[family])
+        return [chunk for chunk in document_chunks if chunk.get('chunk_index') in tagged]
+
     def _find_citations(
         self,
         query_text: str,
         document_chunks: List[Dict[str, Any]],
         document_id: str,
         top_k: int = 3,
+        page_offsets: Optional[List[int]] = None,
     ) -> List[Dict[str, Any]]:
-        """Find relevant citations in document chunks."""
+        """
+        Find relevant citations in document chunks.
+
+        Chunks carrying 'start_offset' are cited on the page where the query
+        text occurs (or where the chunk starts) using page_offsets.
+
+        A citation is a window of at most CITATION_CHARS characters of its
+        chunk, centred on the query text when the chunk contains it. Its
+        'start_offset' and 'end_offset' locate the window in the document
+        text when the chunk's own offsets are known, and 'chunk_index'
+        names the chunk.
+        """
         citations = []
         
         if not query_text:
@@ -964,32 +1128,56 @@ Respond in JSON format:
             similarity = intersection / union if union > 0 else 0.0
             
             # Boost score if query text is directly in chunk
-            if query_text.lower() in chunk_text.lower():
+            match_position = chunk_text.lower().find(query_text.lower())
+            if match_position >= 0:
                 similarity = min(1.0, similarity + 0.3)
+
+            page = chunk.get('page_number', 1)
+            if page_offsets and chunk.get('start_offset') is not None:
+                page = DocumentParser.page_for_offset(
+                    page_offsets, chunk['start_offset'] + max(match_position, 0)
+                )
             
             scored_chunks.append({
-                'text': chunk_text,
+                'chunk': chunk,
+                'match_position': match_position,
                 'similarity': similarity,
-                'page': chunk.get('page_number', 1),
+                'page': page,
                 'section': chunk.get('section', 'Main'),
-                'chunk_id': str(i),
             })
         
         # Sort and get top-k
         scored_chunks.sort(key=lambda x: x['similarity'], reverse=True)
         
-        for i, chunk in enumerate(scored_chunks[:top_k]):
-            if chunk['similarity'] > 0.0:
+        for scored in scored_chunks[:top_k]:
+            if scored['similarity'] > 0.0:
+                chunk = scored['chunk']
+                chunk_text = chunk.get('text', '')
+                start, end = self._citation_window(len(chunk_text), scored['match_position'], len(query_text))
+                chunk_start = chunk.get('start_offset')
                 citations.append({
-                    'citation_text': chunk['text'][:500],
-                    'page_number': chunk['page'],
-                    'section_title': chunk['section'],
-                    'relevance_score': chunk['similarity'],
-                    'chunk_id': chunk['chunk_id'],
+                    'citation_text': chunk_text[start:end],
+                    'page_number': scored['page'],
+                    'section_title': scored['section'],
+                    'relevance_score': scored['similarity'],
+                    'chunk_index': chunk.get('chunk_index'),
+                    'start_offset': chunk_start + start if chunk_start is not None else None,
+                    'end_offset': chunk_start + end if chunk_start is not None else None,
                 })
         
         return citations
 
+    @staticmethod
+    def _citation_window(chunk_length: int, match_position: int, match_length: int) -> Tuple[int, int]:
+        """Span of a chunk cited: up to CITATION_CHARS around the match, or the chunk's start."""
+        if chunk_length <= CITATION_CHARS:
+            return 0, chunk_length
+        if match_position < 0:
+            return 0, CITATION_CHARS
+        start = max(0, match_position - max(0, CITATION_CHARS - match_length) // 2)
+        start = min(start, chunk_length - CITATION_CHARS)
+        return start, start + CITATION_CHARS
+
     @staticmethod
     def _normalize_value(value: Optional[str], field_type: str) -> Optional[str]:
         """Normalize extracted value based on field type."""
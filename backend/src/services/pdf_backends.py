@@ -0,0 +1,351 @@
+"""
+Pluggable PDF text-extraction backends.
+
+Each backend wraps one local extraction engine (PyPDF2, pypdf, pdfminer.six
+or the poppler `pdftotext` binary). `select_backend` probes the first pages
+of a document with every available engine and picks the one with the best
+text quality, preferring the faster engine when quality is comparable.
+"""
+
+import os
+import re
+import shutil
+import subprocess
+import time
+import logging
+from typing import Dict, Any, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Short words that are legitimately one or two letters long
+_SHORT_WORDS = {
+    'a', 'i', 'an', 'as', 'at', 'be', 'by', 'do', 'if', 'in', 'is', 'it',
+    'no', 'of', 'on', 'or', 'so', 'to', 'up', 'us', 'we',
+}
+_TOKEN_PATTERN = re.compile(r'[A-Za-z]+')
+
+
+class PDFPages:
+    """An open PDF document that extracts text one page at a time."""
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+
+    @property
+    def page_count(self) -> int:
+        raise NotImplementedError
+
+    def metadata(self) -> Dict[str, Any]:
+        """Return title, author and subject when the engine exposes them."""
+        return {}
+
+    def extract_page(self, page_number: int) -> str:
+        """Extract text for a 1-based page number."""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class PDFBackend:
+    """Base class for PDF text-extraction engines."""
+
+    name = ''
+
+    @classmethod
+    def is_available(cls) -> bool:
+        raise NotImplementedError
+
+    def open(self, file_path: str) -> PDFPages:
+        raise NotImplementedError
+
+
+# ==================== PyPDF2 / pypdf ====================
+
+class _ReaderPages(PDFPages):
+    """Pages of a PyPDF2 or pypdf PdfReader."""
+
+    def __init__(self, file_path: str, reader_class):
+        super().__init__(file_path)
+        self._file = open(file_path, 'rb')
+        try:
+            self._reader = reader_class(self._file)
+        except Exception:
+            self._file.close()
+            raise
+
+    @property
+    def page_count(self) -> int:
+        return len(self._reader.pages)
+
+    def metadata(self) -> Dict[str, Any]:
+        info = self._reader.metadata
+        if not info:
+            return {}
+        return {
+            'title': info.get('/Title', ''),
+            'author': info.get('/Author', ''),
+            'subject': info.get('/Subject', ''),
+        }
+
+    def extract_page(self, page_number: int) -> str:
+        return self._reader.pages[page_number - 1].extract_text() or ''
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class PyPDF2Backend(PDFBackend):
+    """PyPDF2, the default engine."""
+
+    name = 'pypdf2'
+
+    @classmethod
+    def is_available(cls) -> bool:
+        try:
+            import PyPDF2  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+    def open(self, file_path: str) -> PDFPages:
+        import PyPDF2
+        return _ReaderPages(file_path, PyPDF2.PdfReader)
+
+
+class PypdfBackend(PDFBackend):
+    """pypdf, the maintained successor of PyPDF2."""
+
+    name = 'pypdf'
+
+    @classmethod
+    def is_available(cls) -> bool:
+        try:
+            import pypdf  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+    def open(self, file_path: str) -> PDFPages:
+        import pypdf
+        return _ReaderPages(file_path, pypdf.PdfReader)
+
+
+# ==================== pdfminer.six ====================
+
+class _PdfminerPages(PDFPages):
+    """Pages of a pdfminer document, laid out one page at a time."""
+
+    def __init__(self, file_path: str):
+        super().__init__(file_path)
+        from pdfminer.pdfparser import PDFParser
+        from pdfminer.pdfdocument import PDFDocument
+        from pdfminer.pdfpage import PDFPage
+
+        self._file = open(file_path, 'rb')
+        try:
+            self._document = PDFDocument(PDFParser(self._file))
+            self._pages = list(PDFPage.create_pages(self._document))
+        except Exception:
+            self._file.close()
+            raise
+
+    @property
+    def page_count(self) -> int:
+        return len(self._pages)
+
+    def metadata(self) -> Dict[str, Any]:
+        info = self._document.info[0] if self._document.info else {}
+
+        def decode(value):
+            if isinstance(value, bytes):
+                return value.decode('utf-8', errors='replace')
+            return str(value) if value is not None else ''
+
+        return {
+            'title': decode(info.get('Title')),
+            'author': decode(info.get('Author')),
+            'subject': decode(info.get('Subject')),
+        }
+
+    def extract_page(self, page_number: int) -> str:
+        from io import StringIO
+        from pdfminer.converter import TextConverter
+        from pdfminer.layout import LAParams
+        from pdfminer.pdfinterp import PDFResourceManager, PDFPageInterpreter
+
+        output = StringIO()
+        manager = PDFResourceManager()
+        device = TextConverter(manager, output, laparams=LAParams())
+        try:
+            PDFPageInterpreter(manager, device).process_page(self._pages[page_number - 1])
+        finally:
+            device.close()
+        return output.getvalue()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class PdfminerBackend(PDFBackend):
+    """pdfminer.six, slower but layout-aware."""
+
+    name = 'pdfminer'
+
+    @classmethod
+    def is_available(cls) -> bool:
+        try:
+            import pdfminer.high_level  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+    def open(self, file_path: str) -> PDFPages:
+        return _PdfminerPages(file_path)
+
+
+# ==================== poppler pdftotext ====================
+
+class _PdftotextPages(PDFPages):
+    """Pages extracted by running the poppler command-line tools."""
+
+    TIMEOUT_SECONDS = 60
+
+    def __init__(self, file_path: str):
+        super().__init__(file_path)
+        self._info = self._run(['pdfinfo', file_path])
+        match = re.search(r'^Pages:\s+(\d+)', self._info, re.MULTILINE)
+        if not match:
+            raise ValueError(f"pdfinfo could not read page count for {file_path}")
+        self._page_count = int(match.group(1))
+
+    def _run(self, args: List[str]) -> str:
+        result = subprocess.run(
+            args, capture_output=True, timeout=self.TIMEOUT_SECONDS, check=True,
+        )
+        return result.stdout.decode('utf-8', errors='replace')
+
+    @property
+    def page_count(self) -> int:
+        return self._page_count
+
+    def metadata(self) -> Dict[str, Any]:
+        metadata = {}
+        for key in ('Title', 'Author', 'Subject'):
+            match = re.search(rf'^{key}:\s*(.*)$', self._info, re.MULTILINE)
+            metadata[key.lower()] = match.group(1).strip() if match else ''
+        return metadata
+
+    def extract_page(self, page_number: int) -> str:
+        page = str(page_number)
+        return self._run(['pdftotext', '-layout', '-enc', 'UTF-8', '-f', page, '-l', page, self.file_path, '-'])
+
+
+class PdftotextBackend(PDFBackend):
+    """poppler's pdftotext, fast and good with spaced-out glyphs."""
+
+    name = 'pdftotext'
+
+    @classmethod
+    def is_available(cls) -> bool:
+        return shutil.which('pdftotext') is not None and shutil.which('pdfinfo') is not None
+
+    def open(self, file_path: str) -> PDFPages:
+        return _PdftotextPages(file_path)
+
+
+# ==================== SELECTION ====================
+
+# Fallback order once the selected backend fails on a page
+BACKENDS = [PyPDF2Backend, PypdfBackend, PdftotextBackend, PdfminerBackend]
+
+
+def available_backends() -> List[PDFBackend]:
+    """Instantiate every backend whose engine is installed."""
+    return [backend() for backend in BACKENDS if backend.is_available()]
+
+
+def get_backend(name: str) -> Optional[PDFBackend]:
+    """Get an available backend by name."""
+    for backend in available_backends():
+        if backend.name == name:
+            return backend
+    return None
+
+
+def text_quality(text: str) -> float:
+    """
+    Score extracted text between 0.0 and 1.0.
+
+    Text made of letter fragments ("GIGAF ACT ORY", "A M E N D E D") scores
+    low, as does text with too few letters to be real content.
+    """
+    tokens = _TOKEN_PATTERN.findall(text)
+    if not tokens:
+        return 0.0
+    fragments = sum(1 for t in tokens if len(t) <= 2 and t.lower() not in _SHORT_WORDS)
+    fragment_ratio = fragments / len(tokens)
+    letters = sum(len(t) for t in tokens)
+    return (1.0 - fragment_ratio) * min(1.0, letters / 200)
+
+
+def probe_backend(backend: PDFBackend, file_path: str, probe_pages: int = 3) -> Dict[str, Any]:
+    """Extract the first pages with one backend and report quality and speed."""
+    start = time.perf_counter()
+    try:
+        pages = backend.open(file_path)
+        try:
+            count = min(probe_pages, pages.page_count)
+            texts = [pages.extract_page(n) for n in range(1, count + 1)]
+        finally:
+            pages.close()
+    except Exception as e:
+        logger.warning(f"PDF backend {backend.name} failed probing {file_path}: {e}")
+        return {'backend': backend.name, 'quality': 0.0, 'seconds': float('inf'), 'error': str(e)}
+
+    return {
+        'backend': backend.name,
+        'quality': round(sum(text_quality(t) for t in texts) / max(1, len(texts)), 4),
+        'seconds': time.perf_counter() - start,
+    }
+
+
+def select_backend(
+    file_path: str,
+    probe_pages: int = 3,
+    tolerance: float = 0.05,
+) -> Tuple[PDFBackend, List[Dict[str, Any]]]:
+    """
+    Pick the extraction backend for a document.
+
+    The PDF_BACKEND environment variable forces a backend by name. Otherwise
+    every available backend extracts the first `probe_pages` pages and the
+    fastest backend within `tolerance` of the best quality wins.
+
+    Returns:
+        Tuple of (backend, probe_reports)
+    """
+    backends = available_backends()
+    if not backends:
+        raise ImportError("A PDF engine is required for PDF parsing. Install: pip install PyPDF2")
+
+    forced = os.getenv("PDF_BACKEND")
+    if forced:
+        for backend in backends:
+            if backend.name == forced:
+                return backend, []
+        logger.warning(f"PDF_BACKEND={forced} is not available, probing instead")
+
+    if len(backends) == 1:
+        return backends[0], []
+
+    reports = [probe_backend(backend, file_path, probe_pages) for backend in backends]
+    best_quality = max(r['quality'] for r in reports)
+    candidates = [
+        (report['seconds'], backend)
+        for backend, report in zip(backends, reports)
+        if report['quality'] >= best_quality - tolerance and 'error' not in report
+    ]
+    if not candidates:
+        return backends[0], reports
+    return min(candidates, key=lambda c: c[0])[1], reports
@@ -4,16 +4,26 @@ Orchestrates document ingestion, extraction, review, evaluation,
 diff highlighting, and annotation workflows.
 """
 
+import csv
+import hashlib
+import io
+import json
 import logging
+import os
 import uuid
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Iterable, Iterator
 from datetime import datetime, timezone
 from collections import defaultdict
-from difflib import SequenceMatcher
 
 from src.storage.repository import DatabaseRepository
 from src.services.document_parser import DocumentParser, DocumentChunker
 from src.services.field_extractor import FieldExtractor
+from src.services.token_budget import estimate_tokens
+from src.services.clause_classifier import classify_chunks
+from src.services.table_snapshot import TableSnapshotStore, display_field_name
+from src.services.value_similarity import (
+    canonical_value, near_duplicate_pairs, clusters as value_clusters, similarity as value_similarity,
+)
 from src.models.schema import (
     ProjectStatus, DocumentStatus, ExtractionStatus, FieldType, TaskStatus
 )
@@ -53,9 +63,6 @@ class ProjectService:
         if not project:
             return None
 
-        documents = self.repo.list_project_documents(project_id)
-        extractions = self.repo.list_extractions_by_project(project_id)
-        
         return {
             'id': project.id,
             'name': project.name,
@@ -63,8 +70,8 @@ class ProjectService:
             'status': project.status.value,
             'created_at': project.created_at.isoformat(),
             'updated_at': project.updated_at.isoformat(),
-            'document_count': len(documents),
-            'extraction_count': len(extractions),
+            'document_count': self.repo.count_project_documents(project_id),
+            'extraction_count': self.repo.count_extractions_by_project(project_id),
             'field_template_id': project.field_template_id,
         }
 
@@ -88,9 +95,6 @@ class ProjectService:
         if not project:
             return None
         
-        documents = self.repo.list_project_documents(project_id)
-        extractions = self.repo.list_extractions_by_project(project_id)
-
         return {
             'id': project.id,
             'name': project.name,
@@ -98,8 +102,8 @@ class ProjectService:
             'status': project.status.value,
             'created_at': project.created_at.isoformat(),
             'updated_at': project.updated_at.isoformat(),
-            'document_count': len(documents),
-            'extraction_count': len(extractions),
+            'document_count': self.repo.count_project_documents(project_id),
+            'extraction_count': self.repo.count_extractions_by_project(project_id),
             'field_template_id': project.field_template_id,
         }
 
@@ -121,18 +125,65 @@ class ProjectService:
 class DocumentService:
     """Service for document management and parsing."""
 
-    def __init__(self, repo: DatabaseRepository):
+    CHUNKING_MODES = ('sentence', 'structure')
+
+    def __init__(
+        self,
+        repo: DatabaseRepository,
+        chunk_batch_size: int = 200,
+        max_window_chars: int = 256 * 1024,
+        chunking_mode: Optional[str] = None,
+    ):
+        """
+        Args:
+            repo: Database repository
+            chunk_batch_size: Number of chunks written per bulk insert
+            max_window_chars: Longest unterminated text the chunker buffers
+            chunking_mode: 'sentence' (streaming, overlapping windows) or
+                'structure' (aligned to articles, sections and clauses);
+                defaults to the CHUNKING_MODE environment variable
+        """
         self.repo = repo
         self.parser = DocumentParser()
-        self.chunker = DocumentChunker()
+        self.chunker = DocumentChunker(max_window_chars=max_window_chars)
+        self.chunk_batch_size = chunk_batch_size
+        self.chunking_mode = chunking_mode or os.getenv("CHUNKING_MODE", "sentence")
+        if self.chunking_mode not in self.CHUNKING_MODES:
+            raise ValueError(f"Unsupported chunking mode: {self.chunking_mode}")
+
+    @staticmethod
+    def compute_content_hash(file_path: str, block_size: int = 1024 * 1024) -> str:
+        """Compute the SHA-256 content hash of a file."""
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(block_size), b''):
+                digest.update(block)
+        return digest.hexdigest()
 
     def ingest_document(
         self,
         project_id: str,
         filename: str,
         file_path: str,
+        content_hash: Optional[str] = None,
     ) -> Dict[str, Any]:
-        """Ingest and parse document."""
+        """
+        Ingest and parse document.
+
+        The file is streamed through the parser and chunker unit by unit, and
+        chunks are written in batches of chunk_batch_size, so parsing and
+        chunking memory is bounded by the chunker window rather than the
+        document size. Structure chunking needs the whole text first. The
+        document's section tree is detected and stored in either mode.
+
+        Parsed text, metadata and chunk spans are cached by content hash.
+        A file whose bytes were already ingested, in any project, reuses the
+        cache entry and skips parsing and chunking.
+
+        If ingestion fails after the document record is created, the
+        document is kept with ERROR status and no chunks.
+        """
+        document = None
         try:
             logger.info(f"Starting ingestion for {filename} in project {project_id}")
             
@@ -144,76 +195,137 @@ class DocumentService:
             _, ext = filename.rsplit('.', 1)
             file_type = ext.lower()
 
-            # Parse document
-            try:
-                content, metadata = self.parser.parse(file_path, file_type)
-            except Exception as parse_error:
-                logger.error(f"Error parsing document {filename}: {str(parse_error)}")
-                # Create document with ERROR status
-                import os
-                file_size = os.path.getsize(file_path)
-                try:
-                    document = self.repo.create_document(
-                        project_id=project_id,
-                        filename=filename,
-                        file_type=file_type,
-                        file_path=file_path,
-                        file_size=file_size,
-                        content_text="",
-                        parsed_metadata={"error": str(parse_error)},
-                    )
-                    self.repo.update_document_status(document.id, DocumentStatus.ERROR)
-                    return {
-                        'id': document.id,
-                        'project_id': document.project_id,
-                        'filename': document.filename,
-                        'file_type': document.file_type,
-                        'file_size': document.file_size,
-                        'status': DocumentStatus.ERROR.value,
-                        'chunk_count': 0,
-                        'created_at': document.created_at.isoformat(),
-                        'updated_at': document.updated_at.isoformat(),
-                        'error': str(parse_error)
-                    }
-                except Exception as db_error:
-                    logger.error(f"DB error while saving failed doc {filename}: {str(db_error)}")
-                    raise db_error
+            if content_hash is None:
+                content_hash = self.compute_content_hash(file_path)
+            chunk_config = self._chunk_config()
 
-            # Get file size
-            import os
-            file_size = os.path.getsize(file_path)
+            cached = self.repo.get_parsed_content(content_hash)
+            if cached and cached.file_type == file_type and cached.chunk_config == chunk_config:
+                return self._ingest_cached(project_id, filename, file_path, cached)
 
-            # Create document record
+            # Create document record up front so chunks can reference it
+            file_size = os.path.getsize(file_path)
             document = self.repo.create_document(
                 project_id=project_id,
                 filename=filename,
                 file_type=file_type,
                 file_path=file_path,
                 file_size=file_size,
-                content_text=content,
-                parsed_metadata=metadata,
+                content_text="",
             )
+            self.repo.update_document_status(document.id, DocumentStatus.PARSING)
 
-            # Create chunks
-            chunks_data = self.chunker.chunk(content, metadata)
-            
-            # Prepare chunks for bulk insert
-            bulk_chunks = []
-            for i, chunk_data in enumerate(chunks_data):
-                bulk_chunks.append({
+            # Stream units into the chunker and insert chunks in batches.
+            # Document text is stored whole, so the unit texts are the one
+            # full copy of the document kept while streaming; they are
+            # joined once and the parts dropped.
+            metadata: Dict[str, Any] = {}
+            content_parts: List[str] = []
+            parse_errors: List[Exception] = []
+
+            def units():
+                try:
+                    for unit in self.parser.iter_units(file_path, file_type, metadata):
+                        content_parts.append(unit['text'])
+                        yield unit
+                except Exception as parse_error:
+                    parse_errors.append(parse_error)
+
+            sections: List[Dict[str, Any]] = []
+            if self.chunking_mode == 'structure':
+                chunk_source = self._structure_chunks(units(), content_parts, metadata, sections)
+            else:
+                chunk_source = self.chunker.chunk_stream(units())
+
+            chunk_count = 0
+            chunk_spans = []
+            clause_tags = []
+            batch = []
+            # Full batches are queued to the writer and committed while the
+            # next batch is parsed
+            pending_writes = []
+            for chunk_data in chunk_source:
+                chunk_spans.append([
+                    chunk_data['start_offset'],
+                    chunk_data['end_offset'],
+                    chunk_data.get('page_number'),
+                    chunk_data.get('section'),
+                ])
+                batch.append({
                     'document_id': document.id,
-                    'chunk_index': i,
+                    'chunk_index': chunk_count,
                     'text': chunk_data['text'],
                     'page_number': chunk_data.get('page_number'),
                     'section_title': chunk_data.get('section'),
+                    'start_offset': chunk_data['start_offset'],
+                    'end_offset': chunk_data['end_offset'],
+                    'token_count': estimate_tokens(chunk_data['text']),
                 })
-            
-            # Bulk create chunks
-            if bulk_chunks:
-                self.repo.create_chunks_bulk(bulk_chunks)
+                chunk_count += 1
+                if len(batch) >= self.chunk_batch_size:
+                    clause_tags.extend(classify_chunks(batch))
+                    pending_writes.append(self.repo.submit_write(self.repo.create_chunks_bulk, batch))
+                    batch = []
 
-            # Update document status
-            self.repo.update_document_status(document.id, DocumentStatus.INDEXED)
+            for future in pending_writes:
+                future.result()
+
+            if parse_errors:
+                parse_error = parse_errors[0]
+                logger.error(f"Error parsing document {filename}: {str(parse_error)}")
+                self._mark_failed(document.id, parse_error)
+                return {
+                    'id': document.id,
+                    'project_id': document.project_id,
+                    'filename': document.filename,
+                    'file_type': document.file_type,
+                    'file_size': document.file_size,
+                    'status': DocumentStatus.ERROR.value,
+                    'chunk_count': 0,
+                    'created_at': document.created_at.isoformat(),
+                    'updated_at': document.updated_at.isoformat(),
+                    'error': str(parse_error)
+                }
+
+            content = self._join_units(content_parts)
+            if not sections:
+                sections = self.chunker.detect_sections(content)
+
+            # Streamed chunk batches are committed as they go so parsing does
+            # not hold the write lock; everything else lands in one transaction
+            with self.repo.unit_of_work():
+                if batch:
+                    clause_tags.extend(classify_chunks(batch))
+                    self.repo.create_chunks_bulk(batch)
+                self.repo.create_chunk_clauses_bulk(document.id, clause_tags)
+
+                self.repo.create_sections_bulk(document.id, sections)
+
+                # Store the text in the shared parse cache unless this hash is
+                # already cached for another file type
+                if not cached or cached.file_type == file_type:
+                    self.repo.save_parsed_content(
+                        content_hash=content_hash,
+                        file_type=file_type,
+                        file_path=file_path,
+                        file_size=file_size,
+                        content_text=content,
+                        parsed_metadata=metadata,
+                        chunk_config=chunk_config,
+                        chunk_spans=chunk_spans,
+                        sections=sections,
+                    )
+                    self.repo.link_parsed_content(document.id, content_hash)
+                    update_data = {}
+                else:
+                    update_data = {'content_text': content}
+
+                self.repo.update_document(
+                    document.id,
+                    parsed_metadata=metadata,
+                    status=DocumentStatus.INDEXED,
+                    **update_data,
+                )
 
             logger.info(f"Successfully ingested {filename}")
             return {
@@ -223,7 +335,7 @@ class DocumentService:
                 'file_type': document.file_type,
                 'file_size': document.file_size,
                 'status': DocumentStatus.INDEXED.value,
-                'chunk_count': len(chunks_data),
+                'chunk_count': chunk_count,
                 'created_at': document.created_at.isoformat(),
                 'updated_at': document.updated_at.isoformat(),
             }
@@ -231,8 +343,128 @@ class DocumentService:
         except Exception as e:
             logger.error(f"Critical error ingesting document {filename}: {str(e)}")
             # Attempt to record failure if possible, but re-raise to notify caller
+            if document is not None:
+                try:
+                    self._mark_failed(document.id, e)
+                except Exception as mark_error:
+                    logger.error(f"Could not mark document {document.id} as failed: {mark_error}")
             raise
 
+    def _mark_failed(self, document_id: str, error: Exception) -> None:
+        """Keep a document with ERROR status and no partial chunks."""
+        self.repo.delete_document_chunks(document_id)
+        self.repo.update_document(
+            document_id,
+            parsed_metadata={"error": str(error)},
+            status=DocumentStatus.ERROR,
+        )
+
+    def _chunk_config(self) -> str:
+        """Identify the chunker settings cached chunk spans depend on."""
+        config = f"{self.chunker.chunk_size}:{self.chunker.overlap}"
+        if self.chunking_mode != 'sentence':
+            config += f":{self.chunking_mode}"
+        return config
+
+    @staticmethod
+    def _join_units(content_parts: List[str]) -> str:
+        """
+        Join unit texts into the document text, replacing the parts with it.
+
+        Joining the single remaining part returns it without a copy, so a
+        second call reuses the text the first built.
+        """
+        text = DocumentParser.UNIT_SEPARATOR.join(content_parts)
+        content_parts[:] = [text]
+        return text
+
+    def _structure_chunks(
+        self,
+        units: Iterable[Dict[str, Any]],
+        content_parts: List[str],
+        metadata: Dict[str, Any],
+        sections: List[Dict[str, Any]],
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Chunk along the document's section tree.
+
+        Needs the whole text, so units are consumed before the first chunk
+        is produced. The detected tree is appended to `sections`.
+        """
+        for _ in units:
+            pass
+        text = self._join_units(content_parts)
+        sections.extend(self.chunker.detect_sections(text))
+        spans = self.chunker.chunk_structure(text, sections)
+        yield from self.chunker.iter_span_chunks(text, spans, metadata, sections)
+
+    def _ingest_cached(
+        self,
+        project_id: str,
+        filename: str,
+        file_path: str,
+        cached,
+    ) -> Dict[str, Any]:
+        """Create a document from a parse cache entry without parsing."""
+        # One transaction: the document appears fully indexed or not at all
+        with self.repo.unit_of_work():
+            document = self.repo.create_document(
+                project_id=project_id,
+                filename=filename,
+                file_type=cached.file_type,
+                file_path=file_path,
+                file_size=cached.file_size,
+                content_text="",
+                parsed_metadata=cached.parsed_metadata,
+                content_hash=cached.content_hash,
+            )
+
+            content = cached.content_text
+            clause_tags = []
+            batch = []
+            for i, (start, end, page_number, section_title) in enumerate(cached.chunk_spans):
+                text = content[start:end]
+                batch.append({
+                    'document_id': document.id,
+                    'chunk_index': i,
+                    'text': text,
+                    'page_number': page_number,
+                    'section_title': section_title,
+                    'start_offset': start,
+                    'end_offset': end,
+                    'token_count': estimate_tokens(text),
+                })
+                if len(batch) >= self.chunk_batch_size:
+                    clause_tags.extend(classify_chunks(batch))
+                    self.repo.create_chunks_bulk(batch)
+                    batch = []
+            if batch:
+                clause_tags.extend(classify_chunks(batch))
+                self.repo.create_chunks_bulk(batch)
+            self.repo.create_chunk_clauses_bulk(document.id, clause_tags)
+
+            sections = cached.sections
+            if sections is None:
+                # Cache entries written before section trees were stored
+                sections = self.chunker.detect_sections(content)
+            self.repo.create_sections_bulk(document.id, sections)
+
+            self.repo.update_document_status(document.id, DocumentStatus.INDEXED)
+
+        logger.info(f"Reused cached parse {cached.content_hash[:12]} for {filename}")
+        return {
+            'id': document.id,
+            'project_id': document.project_id,
+            'filename': document.filename,
+            'file_type': document.file_type,
+            'file_size': document.file_size,
+            'status': DocumentStatus.INDEXED.value,
+            'chunk_count': len(cached.chunk_spans),
+            'deduplicated': True,
+            'created_at': document.created_at.isoformat(),
+            'updated_at': document.updated_at.isoformat(),
+        }
+
     def list_project_documents(self, project_id: str) -> List[Dict[str, Any]]:
         """List documents in project."""
         documents = self.repo.list_project_documents(project_id)
@@ -252,9 +484,15 @@ class DocumentService:
 class ExtractionService:
     """Service for field extraction and normalization."""
 
-    def __init__(self, repo: DatabaseRepository):
+    def __init__(self, repo: DatabaseRepository, snapshots: Optional[TableSnapshotStore] = None):
+        """
+        Args:
+            repo: Database repository
+            snapshots: Comparison table snapshots to apply new extractions to
+        """
         self.repo = repo
         self.extractor = FieldExtractor()
+        self.snapshots = snapshots
 
     def extract_fields_for_document(
         self,
@@ -264,73 +502,102 @@ class ExtractionService:
     ) -> List[Dict[str, Any]]:
         """Extract fields from document."""
         try:
-            # Get document and chunks
-            document = self.repo.get_document(document_id)
-            if not document:
+            # Get document and chunks; the text is read once, not with the document
+            metadata = self.repo.get_document_metadata(document_id)
+            if metadata is None:
                 raise ValueError(f"Document not found: {document_id}")
+            document_text = self.repo.get_document_text(document_id)
 
             chunks = self.repo.get_document_chunks(document_id)
             chunks_data = [
                 {
+                    'chunk_index': c.chunk_index,
                     'text': c.text,
                     'page_number': c.page_number,
                     'section': c.section_title or 'Main',
+                    'start_offset': c.start_offset,
+                    'end_offset': c.end_offset,
+                    'token_count': c.token_count,
                 }
                 for c in chunks
             ]
+            chunk_ids = {c.chunk_index: c.id for c in chunks}
+            page_offsets = metadata.get('page_offsets')
+            sections = self.repo.get_document_sections(document_id)
+            clause_index = self.repo.get_chunk_clauses(document_id)
 
             # Extract fields
             extraction_results = self.extractor.extract_fields(
-                document_text=document.content_text,
+                document_text=document_text,
                 document_chunks=chunks_data,
                 field_definitions=field_definitions,
                 document_id=document_id,
+                page_offsets=page_offsets,
+                sections=sections,
+                clause_index=clause_index,
             )
 
-            # Store extraction results
-            stored_results = []
-            for result in extraction_results:
-                extraction = self.repo.create_extraction(
-                    project_id=project_id,
-                    document_id=document_id,
-                    field_name=result['field_name'],
-                    field_type=result['field_type'],
-                    extracted_value=result.get('extracted_value'),
-                    raw_text=result.get('raw_text'),
-                    normalized_value=result.get('normalized_value'),
-                    confidence_score=result.get('confidence_score', 0.0),
-                    extra_metadata=result.get('extraction_metadata', {}),
-                )
+            # Store extraction results, citations and review states in one
+            # transaction instead of a commit per row
+            with self.repo.unit_of_work():
+                stored_results = []
+                extractions = []
+                citations = []
+                for result in extraction_results:
+                    extraction = self.repo.create_extraction(
+                        project_id=project_id,
+                        document_id=document_id,
+                        field_name=result['field_name'],
+                        field_type=result['field_type'],
+                        extracted_value=result.get('extracted_value'),
+                        raw_text=result.get('raw_text'),
+                        normalized_value=result.get('normalized_value'),
+                        confidence_score=result.get('confidence_score', 0.0),
+                        extra_metadata=result.get('extraction_metadata', {}),
+                    )
+                    extractions.append(extraction)
+
+                    # Citations reference their chunk and span; their text
+                    # is read from the document text when they are read
+                    for citation_data in result.get('citations', []):
+                        citations.append({
+                            'extraction_id': extraction.id,
+                            'document_id': document_id,
+                            'chunk_id': chunk_ids.get(citation_data.get('chunk_index')),
+                            'citation_text': citation_data['citation_text'],
+                            'start_offset': citation_data.get('start_offset'),
+                            'end_offset': citation_data.get('end_offset'),
+                            'page_number': citation_data.get('page_number'),
+                            'section_title': citation_data.get('section_title'),
+                            'relevance_score': citation_data.get('relevance_score', 0.0),
+                        })
 
-                # Store citations
-                for citation_data in result.get('citations', []):
-                    self.repo.create_citation(
+                    # Create review state
+                    self.repo.create_review_state(
+                        project_id=project_id,
                         extraction_id=extraction.id,
-                        document_id=document_id,
-                        citation_text=citation_data['citation_text'],
-                        page_number=citation_data.get('page_number'),
-                        section_title=citation_data.get('section_title'),
-                        relevance_score=citation_data.get('relevance_score', 0.0),
+                        ai_value=extraction.extracted_value,
                     )
 
-                # Create review state
-                self.repo.create_review_state(
-                    project_id=project_id,
-                    extraction_id=extraction.id,
-                    ai_value=extraction.extracted_value,
-                )
+                    stored_results.append({
+                        'id': extraction.id,
+                        'field_name': extraction.field_name,
+                        'extracted_value': extraction.extracted_value,
+                        'normalized_value': extraction.normalized_value,
+                        'confidence_score': extraction.confidence_score,
+                        'status': extraction.status.value,
+                    })
 
-                stored_results.append({
-                    'id': extraction.id,
-                    'field_name': extraction.field_name,
-                    'extracted_value': extraction.extracted_value,
-                    'normalized_value': extraction.normalized_value,
-                    'confidence_score': extraction.confidence_score,
-                    'status': extraction.status.value,
-                })
+                if citations:
+                    self.repo.create_citations_bulk(citations)
+
+                # Update document status
+                self.repo.update_document_status(document_id, DocumentStatus.EXTRACTED)
+                revision = self.repo.get_project_revision(project_id)
 
-            # Update document status
-            self.repo.update_document_status(document_id, DocumentStatus.EXTRACTED)
+            # Only once committed; an enclosing unit of work could still roll back
+            if self.snapshots is not None and not self.repo.in_unit_of_work:
+                self.snapshots.apply_extractions(project_id, revision, extractions)
 
             return stored_results
 
@@ -365,8 +632,14 @@ class ExtractionService:
 class ReviewService:
     """Service for review workflow and manual edits."""
 
-    def __init__(self, repo: DatabaseRepository):
+    def __init__(self, repo: DatabaseRepository, snapshots: Optional[TableSnapshotStore] = None):
+        """
+        Args:
+            repo: Database repository
+            snapshots: Comparison table snapshots to apply status changes to
+        """
         self.repo = repo
+        self.snapshots = snapshots
 
     def update_extraction_review(
         self,
@@ -378,45 +651,51 @@ class ReviewService:
     ) -> Dict[str, Any]:
         """Update review state for extraction."""
         try:
-            # Get extraction
-            extraction = self.repo.get_extraction(extraction_id)
-            if not extraction:
-                raise ValueError(f"Extraction not found: {extraction_id}")
-
-            # Get review state
-            review_states = self.repo.list_pending_reviews(extraction.project_id)
-            review_state = next(
-                (r for r in review_states if r.extraction_id == extraction_id),
-                None
-            )
+            # Review state and extraction status change together
+            with self.repo.unit_of_work():
+                # Get extraction
+                extraction = self.repo.get_extraction(extraction_id)
+                if not extraction:
+                    raise ValueError(f"Extraction not found: {extraction_id}")
 
-            if not review_state:
-                # Create if doesn't exist
-                review_state = self.repo.create_review_state(
-                    extraction.project_id,
-                    extraction_id,
-                    extraction.extracted_value,
+                # Get review state
+                review_states = self.repo.list_pending_reviews(extraction.project_id)
+                review_state = next(
+                    (r for r in review_states if r.extraction_id == extraction_id),
+                    None
                 )
 
-            # Update review state
-            update_data = {
-                'status': ExtractionStatus[status],
-                'manual_value': manual_value,
-                'reviewer_notes': reviewer_notes,
-                'reviewed_by': reviewed_by,
-                'reviewed_at': datetime.now(timezone.utc),
-            }
+                if not review_state:
+                    # Create if doesn't exist
+                    review_state = self.repo.create_review_state(
+                        extraction.project_id,
+                        extraction_id,
+                        extraction.extracted_value,
+                    )
 
-            review_state = self.repo.update_review_state(
-                review_state.id,
-                **update_data
-            )
+                # Update review state
+                update_data = {
+                    'status': ExtractionStatus[status],
+                    'manual_value': manual_value,
+                    'reviewer_notes': reviewer_notes,
+                    'reviewed_by': reviewed_by,
+                    'reviewed_at': datetime.now(timezone.utc),
+                }
 
-            # Update extraction status
-            self.repo.update_extraction(
-                extraction_id,
-                status=ExtractionStatus[status],
-            )
+                review_state = self.repo.update_review_state(
+                    review_state.id,
+                    **update_data
+                )
+
+                # Update extraction status
+                extraction = self.repo.update_extraction(
+                    extraction_id,
+                    status=ExtractionStatus[status],
+                )
+                revision = self.repo.get_project_revision(extraction.project_id)
+
+            if self.snapshots is not None and not self.repo.in_unit_of_work:
+                self.snapshots.apply_extractions(extraction.project_id, revision, [extraction])
 
             return {
                 'id': review_state.id,
@@ -450,87 +729,436 @@ class ReviewService:
 class ComparisonService:
     """Service for generating comparison tables."""
 
-    def __init__(self, repo: DatabaseRepository):
+    MAX_WINDOW_ROWS = 500
+    MAX_WINDOW_COLUMNS = 200
+
+    def __init__(self, repo: DatabaseRepository, snapshots: Optional[TableSnapshotStore] = None):
+        """
+        Args:
+            repo: Database repository
+            snapshots: Comparison table snapshots to serve tables from; a
+                private store is used if not given
+        """
         self.repo = repo
+        self.snapshots = snapshots or TableSnapshotStore(repo)
 
     def generate_comparison_table(self, project_id: str) -> Dict[str, Any]:
-        """Generate comparison table for all documents."""
+        """
+        Generate comparison table for all documents.
+
+        Served from the project's table snapshot, which is rebuilt only when
+        the project's revision moved past it. The result is shared and must
+        not be modified.
+        """
         try:
-            documents = self.repo.list_project_documents(project_id)
-            extractions = self.repo.list_extractions_by_project(project_id)
+            return self.snapshots.table(project_id)
+        except Exception as e:
+            logger.error(f"Error generating comparison table: {str(e)}")
+            raise
 
-            if not documents or not extractions:
-                return {
-                    'project_id': project_id,
-                    'document_count': len(documents),
-                    'row_count': 0,
-                    'rows': [],
-                    'generation_timestamp': datetime.now(timezone.utc).isoformat(),
-                }
+    def get_table_window(
+        self,
+        project_id: str,
+        field_names: Optional[List[str]] = None,
+        document_ids: Optional[List[str]] = None,
+        statuses: Optional[List[str]] = None,
+        max_confidence: Optional[float] = None,
+        row_cursor: Optional[str] = None,
+        column_cursor: Optional[str] = None,
+        row_offset: int = 0,
+        column_offset: int = 0,
+        row_limit: int = 50,
+        column_limit: int = 20,
+    ) -> Dict[str, Any]:
+        """
+        Get one window of the comparison table for a virtualized grid.
 
-            # Group extractions by field
-            field_groups = {}
-            for extraction in extractions:
-                # Convert field name to Title Case for display (e.g. "audit_policy" -> "Audit Policy")
-                raw_field_name = extraction.field_name
-                # If the field name has underscores, replace them with spaces. 
-                # Then convert to Title Case.
-                if raw_field_name:
-                    field_name = raw_field_name.replace('_', ' ').title()
-                else:
-                    field_name = "Unknown Field"
-                
-                if field_name not in field_groups:
-                    field_groups[field_name] = {
-                        'field_name': field_name,
-                        'field_type': extraction.field_type,
-                        'results': {},
-                    }
-                    
-                doc_id = extraction.document_id
-                field_groups[field_name]['results'][doc_id] = {
-                    'id': extraction.id,
-                    'extracted_value': extraction.extracted_value,
-                    'normalized_value': extraction.normalized_value,
-                    'confidence_score': extraction.confidence_score,
-                    'status': extraction.status.value,
-                }
+        Rows are fields and columns are documents; see
+        DatabaseRepository.get_table_window for the filters. Rows are keyed
+        by the stored field name, with the display name alongside. Cells that
+        are missing or filtered out are absent from document_results.
+        """
+        try:
+            status_filter = [ExtractionStatus[s] for s in statuses] if statuses else None
+        except KeyError as e:
+            raise ValueError(f"Unknown review status: {e.args[0]}")
+
+        window = self.repo.get_table_window(
+            project_id,
+            field_names=field_names,
+            document_ids=document_ids,
+            statuses=status_filter,
+            max_confidence=max_confidence,
+            row_cursor=row_cursor,
+            column_cursor=column_cursor,
+            row_offset=max(0, row_offset),
+            column_offset=max(0, column_offset),
+            row_limit=max(1, min(row_limit, self.MAX_WINDOW_ROWS)),
+            column_limit=max(1, min(column_limit, self.MAX_WINDOW_COLUMNS)),
+        )
+
+        cells: Dict[str, Dict[str, Any]] = defaultdict(dict)
+        for extraction in window['extractions']:
+            cells[extraction.field_name][extraction.document_id] = {
+                'id': extraction.id,
+                'extracted_value': extraction.extracted_value,
+                'normalized_value': extraction.normalized_value,
+                'confidence_score': extraction.confidence_score,
+                'status': extraction.status.value,
+            }
 
-            # Create rows
-            rows = [
+        documents, rows = window['documents'], window['rows']
+        return {
+            'project_id': project_id,
+            'revision': self.repo.get_project_revision(project_id),
+            'total_rows': window['total_rows'],
+            'total_columns': window['total_columns'],
+            'documents': [
+                {'id': d.id, 'filename': d.filename, 'file_type': d.file_type}
+                for d in documents
+            ],
+            'rows': [
                 {
-                    'field_name': group['field_name'],
-                    'field_type': group['field_type'],
-                    'document_results': {
-                        doc.id: group['results'].get(doc.id, {
-                            'extracted_value': 'N/A',
-                            'confidence_score': 0.0,
-                        })
-                        for doc in documents
-                    }
+                    'field_key': field_name,
+                    'field_name': display_field_name(field_name),
+                    'field_type': field_type,
+                    'document_results': cells.get(field_name, {}),
                 }
-                for group in field_groups.values()
-            ]
+                for field_name, field_type in rows
+            ],
+            'next_row_cursor': rows[-1][0] if window['more_rows'] else None,
+            'next_column_cursor': documents[-1].id if window['more_columns'] else None,
+        }
 
-            return {
-                'project_id': project_id,
-                'document_count': len(documents),
-                'row_count': len(rows),
-                'documents': [
-                    {
-                        'id': d.id,
-                        'filename': d.filename,
-                        'file_type': d.file_type,
+
+class _ChunkSink:
+    """Write-only file object that hands out what was written since the last drain."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def writable(self) -> bool:
+        return True
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+class ExportService:
+    """Service for streaming exports of project data."""
+
+    COLUMNAR_TABLES = ('extractions', 'citations')
+    COLUMNAR_FORMATS = ('parquet', 'arrow')
+    # Low-cardinality string columns, written dictionary-encoded
+    DICTIONARY_COLUMNS = ('field_name', 'field_type', 'status', 'review_status')
+
+    def __init__(self, repo: DatabaseRepository, batch_size: int = 1000, columnar_batch_size: int = 10000):
+        """
+        Args:
+            repo: Database repository
+            batch_size: Rows read from the database and written out per chunk
+            columnar_batch_size: Rows per record batch of columnar exports
+        """
+        self.repo = repo
+        self.batch_size = batch_size
+        self.columnar_batch_size = columnar_batch_size
+
+    def iter_table_csv(self, project_id: str) -> Iterator[str]:
+        """
+        Stream the comparison table as CSV, a row per field and a column per document.
+
+        The header is yielded first, then one chunk of rows per database
+        batch, so memory holds one batch and one table row at a time.
+        """
+        documents = self.repo.list_project_documents(project_id)
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(["Field Name", "Field Type"] + [d.filename for d in documents])
+        yield self._drain(buffer)
+
+        for rows in self._iter_table_rows(project_id, documents):
+            for field_name, field_type, cells in rows:
+                writer.writerow(
+                    [field_name, field_type.value]
+                    + [cell.extracted_value if cell is not None else 'N/A' for cell in cells]
+                )
+            yield self._drain(buffer)
+
+    def write_table_xlsx(self, project_id: str, output: Any) -> None:
+        """
+        Write the comparison table as XLSX, a value and a confidence column per document.
+
+        Uses an openpyxl write-only workbook: rows go to disk as they are
+        read, and every cell refers to one of a few named styles instead of
+        carrying style objects of its own. A write-only sheet stores its
+        column widths ahead of the rows, so the widths come from the longest
+        stored value of each column, measured in the database.
+
+        Args:
+            output: Path or binary file object the workbook is saved to
+
+        Raises:
+            ImportError: If openpyxl is not installed
+        """
+        import openpyxl
+        from openpyxl.cell import WriteOnlyCell
+        from openpyxl.styles import Alignment, Border, Font, NamedStyle, PatternFill, Side
+        from openpyxl.utils import get_column_letter
+
+        wb = openpyxl.Workbook(write_only=True)
+        ws = wb.create_sheet("Legal Review Comparison")
+
+        border = Border(
+            left=Side(style='thin'), right=Side(style='thin'),
+            top=Side(style='thin'), bottom=Side(style='thin'),
+        )
+        for style in (
+            NamedStyle(
+                name="lr_header", border=border,
+                font=Font(bold=True, color="FFFFFF", size=11),
+                fill=PatternFill(start_color="2B579A", end_color="2B579A", fill_type="solid"),
+                alignment=Alignment(horizontal="center", vertical="center", wrap_text=True),
+            ),
+            NamedStyle(name="lr_cell", border=border),
+            NamedStyle(name="lr_value", border=border, alignment=Alignment(wrap_text=True)),
+            NamedStyle(name="lr_confidence", border=border, alignment=Alignment(horizontal="center")),
+        ):
+            wb.add_named_style(style)
+        for name, color in (("high", "C6EFCE"), ("medium", "FFEB9C"), ("low", "FFC7CE")):
+            wb.add_named_style(NamedStyle(
+                name=f"lr_confidence_{name}", border=border, alignment=Alignment(horizontal="center"),
+                fill=PatternFill(start_color=color, end_color=color, fill_type="solid"),
+            ))
+
+        def cell(value, style):
+            c = WriteOnlyCell(ws, value=value)
+            c.style = style
+            return c
+
+        documents = self.repo.list_project_documents(project_id)
+        headers = ["Field Name", "Field Type"]
+        for doc in documents:
+            headers += [f"{doc.filename} (Value)", f"{doc.filename} (Confidence)"]
+
+        lengths = self.repo.get_value_lengths(project_id)
+        widths = [len(header) for header in headers]
+        widths[0] = max(widths[0], lengths['field_name'])
+        widths[1] = max([widths[1]] + [len(t.value) for t in FieldType])
+        for i, doc in enumerate(documents):
+            widths[2 + 2 * i] = max(widths[2 + 2 * i], lengths['values'].get(doc.id, 0), len('N/A'))
+        for i, width in enumerate(widths, 1):
+            ws.column_dimensions[get_column_letter(i)].width = min(width + 4, 50)
+        ws.freeze_panes = "A2"
+
+        ws.append([cell(header, "lr_header") for header in headers])
+        for rows in self._iter_table_rows(project_id, documents):
+            for field_name, field_type, cells in rows:
+                line = [cell(field_name, "lr_cell"), cell(field_type.value, "lr_cell")]
+                for extraction in cells:
+                    if extraction is None:
+                        value, confidence = 'N/A', 0.0
+                    else:
+                        value, confidence = extraction.extracted_value, extraction.confidence_score or 0.0
+                    if confidence > 0.8:
+                        style = "lr_confidence_high"
+                    elif confidence > 0.6:
+                        style = "lr_confidence_medium"
+                    elif confidence > 0:
+                        style = "lr_confidence_low"
+                    else:
+                        style = "lr_confidence"
+                    line += [cell(value, "lr_value"), cell(f"{confidence * 100:.0f}%", style)]
+                ws.append(line)
+        wb.save(output)
+
+    def iter_columnar(
+        self, project_ids: List[str], table: str = 'extractions', format: str = 'parquet'
+    ) -> Iterator[bytes]:
+        """
+        Stream extractions or citations of one or more projects as Parquet or Arrow IPC.
+
+        'extractions' has a row per extraction with its review outcome;
+        'citations' a row per citation. Record batches are built straight
+        from the column tuples the repository reads, and field names,
+        types and statuses are dictionary-encoded. 'arrow' is the IPC
+        stream format, which pyarrow.ipc.open_stream reads.
+
+        Raises:
+            ValueError: If table or format is unknown
+            ImportError: If pyarrow is not installed
+        """
+        if table not in self.COLUMNAR_TABLES:
+            raise ValueError(f"Unknown table: {table}")
+        if format not in self.COLUMNAR_FORMATS:
+            raise ValueError(f"Unknown format: {format}")
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        dictionary = pa.dictionary(pa.int32(), pa.string())
+        if table == 'extractions':
+            schema = pa.schema([
+                ('project_id', pa.string()), ('document_id', pa.string()), ('filename', pa.string()),
+                ('extraction_id', pa.string()), ('field_name', dictionary), ('field_type', dictionary),
+                ('extracted_value', pa.string()), ('normalized_value', pa.string()),
+                ('confidence_score', pa.float64()), ('status', dictionary),
+                ('created_at', pa.timestamp('us')), ('review_status', dictionary),
+                ('manual_value', pa.string()), ('reviewer_notes', pa.string()),
+                ('reviewed_by', pa.string()), ('reviewed_at', pa.timestamp('us')),
+            ])
+            batches = self.repo.iter_extraction_columns(project_ids, self.columnar_batch_size)
+        else:
+            schema = pa.schema([
+                ('project_id', pa.string()), ('document_id', pa.string()), ('extraction_id', pa.string()),
+                ('field_name', dictionary), ('citation_text', pa.string()),
+                ('start_offset', pa.int64()), ('end_offset', pa.int64()), ('page_number', pa.int64()),
+                ('section_title', pa.string()), ('relevance_score', pa.float64()),
+            ])
+            batches = self.repo.iter_citation_columns(project_ids, self.columnar_batch_size)
+
+        return self._write_columnar(pa, pq, schema, batches, format)
+
+    def _write_columnar(self, pa, pq, schema, batches: Iterator[Dict[str, tuple]], format: str) -> Iterator[bytes]:
+        sink = _ChunkSink()
+        writer = pq.ParquetWriter(sink, schema) if format == 'parquet' else pa.ipc.new_stream(sink, schema)
+        # One code per distinct value for the whole export; a dictionary that
+        # grows between batches is written as a replacement
+        codes: Dict[str, Dict[Optional[str], int]] = {name: {} for name in self.DICTIONARY_COLUMNS}
+        try:
+            for columns in batches:
+                arrays = []
+                for field in schema:
+                    values = columns[field.name]
+                    if field.name in codes:
+                        index = codes[field.name]
+                        for value in set(values):
+                            if value is not None and value not in index:
+                                index[value] = len(index)
+                        arrays.append(pa.DictionaryArray.from_arrays(
+                            pa.array([index.get(value) for value in values], pa.int32()),
+                            pa.array(list(index), pa.string()),
+                        ))
+                    else:
+                        arrays.append(pa.array(values, field.type))
+                writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+                yield sink.drain()
+        finally:
+            writer.close()
+        yield sink.drain()
+
+    def _iter_table_rows(self, project_id: str, documents: List[Any]) -> Iterator[List[Any]]:
+        """
+        Stream the comparison table's rows, one list of completed rows per database batch.
+
+        A row is (field_name, field_type, cells) with one extraction row or
+        None per document, in the order of documents. Like the table
+        snapshot, fields are grouped by display name, so "audit_policy" and
+        "Audit Policy" make one row; a row is complete once every field name
+        that displays as it has been read.
+        """
+        columns = {d.id: i for i, d in enumerate(documents)}
+        pending: Dict[str, set] = defaultdict(set)
+        for name in self.repo.list_extraction_field_names(project_id):
+            pending[display_field_name(name)].add(name)
+
+        groups: Dict[str, Any] = {}
+        field_name = None
+
+        def finish(name: str) -> Optional[tuple]:
+            display = display_field_name(name)
+            pending[display].discard(name)
+            if pending[display]:
+                return None
+            field_type, cells = groups.pop(display)
+            return display, field_type, cells
+
+        for batch in self.repo.iter_extraction_rows(project_id, order_by='field', batch_size=self.batch_size):
+            rows = []
+            for row in batch:
+                if row.field_name != field_name:
+                    if field_name is not None:
+                        done = finish(field_name)
+                        if done is not None:
+                            rows.append(done)
+                    field_name = row.field_name
+                display = display_field_name(field_name)
+                if display not in groups:
+                    groups[display] = (row.field_type, [None] * len(documents))
+                column = columns.get(row.document_id)
+                if column is not None:
+                    groups[display][1][column] = row
+            yield rows
+        # The last field, and any whose names changed since they were listed
+        yield [(display, field_type, cells) for display, (field_type, cells) in groups.items()]
+
+    def iter_extractions_jsonl(self, project_id: str) -> Iterator[str]:
+        """
+        Stream every extraction as a JSON line with its review state and citations.
+
+        Rows come in document order; citations are read once per batch.
+        """
+        for batch, citations in self.repo.iter_extraction_rows(
+            project_id, order_by='document', batch_size=self.batch_size, with_citations=True
+        ):
+            lines = []
+            for row in batch:
+                review = None
+                if row.review_status is not None:
+                    review = {
+                        'status': row.review_status.value,
+                        'manual_value': row.manual_value,
+                        'reviewer_notes': row.reviewer_notes,
+                        'reviewed_by': row.reviewed_by,
+                        'reviewed_at': row.reviewed_at.isoformat() if row.reviewed_at else None,
                     }
-                    for d in documents
-                ],
-                'rows': rows,
-                'generation_timestamp': datetime.now(timezone.utc).isoformat(),
-            }
+                lines.append(json.dumps({
+                    'id': row.id,
+                    'document_id': row.document_id,
+                    'filename': row.filename,
+                    'field_name': row.field_name,
+                    'field_type': row.field_type.value,
+                    'extracted_value': row.extracted_value,
+                    'normalized_value': row.normalized_value,
+                    'confidence_score': row.confidence_score,
+                    'status': row.status.value,
+                    'review': review,
+                    'citations': [
+                        {
+                            'citation_text': c.citation_text,
+                            'start_offset': c.start_offset,
+                            'end_offset': c.end_offset,
+                            'page_number': c.page_number,
+                            'section_title': c.section_title,
+                            'relevance_score': c.relevance_score,
+                        }
+                        for c in citations.get(row.id, [])
+                    ],
+                }))
+            yield '\n'.join(lines) + '\n'
 
-        except Exception as e:
-            logger.error(f"Error generating comparison table: {str(e)}")
-            raise
+    @staticmethod
+    def _drain(buffer: io.StringIO) -> str:
+        text = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return text
 
 
 class EvaluationService:
@@ -598,34 +1226,34 @@ class EvaluationService:
             # Map extractions by ID
             extraction_map = {e.id: e for e in extractions}
             
-            count = 0
-            for review in reviews:
-                if review.status == ExtractionStatus.PENDING:
-                    continue
-                
-                extraction = extraction_map.get(review.extraction_id)
-                if not extraction:
-                    continue
-                
-                human_value = None
-                if review.status == ExtractionStatus.CONFIRMED:
-                    # If confirmed, the human agrees with the AI (or the current value)
-                    # Use extraction.normalized_value or extraction.extracted_value
-                    human_value = extraction.normalized_value or extraction.extracted_value
-                elif review.status == ExtractionStatus.MANUAL_UPDATED:
-                    human_value = review.manual_value
-                else:
-                    # Skip REJECTED or others for now unless we have a clear human value
-                    continue
-                
-                self.evaluate_extraction(
-                    project_id=project_id,
-                    document_id=extraction.document_id,
-                    field_name=extraction.field_name,
-                    human_value=human_value
-                )
-                count += 1
-                
+            # One transaction for the whole batch of evaluations
+            with self.repo.unit_of_work():
+                for review in reviews:
+                    if review.status == ExtractionStatus.PENDING:
+                        continue
+
+                    extraction = extraction_map.get(review.extraction_id)
+                    if not extraction:
+                        continue
+
+                    human_value = None
+                    if review.status == ExtractionStatus.CONFIRMED:
+                        # If confirmed, the human agrees with the AI (or the current value)
+                        # Use extraction.normalized_value or extraction.extracted_value
+                        human_value = extraction.normalized_value or extraction.extracted_value
+                    elif review.status == ExtractionStatus.MANUAL_UPDATED:
+                        human_value = review.manual_value
+                    else:
+                        # Skip REJECTED or others for now unless we have a clear human value
+                        continue
+
+                    self.evaluate_extraction(
+                        project_id=project_id,
+                        document_id=extraction.document_id,
+                        field_name=extraction.field_name,
+                        human_value=human_value
+                    )
+
             return self.generate_evaluation_report(project_id)
             
         except Exception as e:
@@ -748,83 +1376,124 @@ class TaskService:
 class DiffService:
     """Service for computing cross-document diff highlighting."""
 
-    def __init__(self, repo: DatabaseRepository):
+    # Documents up to which the full pairwise similarity matrix is computed
+    MAX_MATRIX_DOCUMENTS = 200
+    # Similarity at which two distinct values count as near-duplicates
+    NEAR_DUPLICATE_THRESHOLD = 0.8
+
+    def __init__(self, repo: DatabaseRepository, snapshots: Optional[TableSnapshotStore] = None):
+        """
+        Args:
+            repo: Database repository
+            snapshots: Comparison table snapshots to read field values from;
+                a private store is used if not given
+        """
         self.repo = repo
+        self.snapshots = snapshots or TableSnapshotStore(repo)
 
-    def compute_diff(self, project_id: str) -> Dict[str, Any]:
+    def compute_diff(self, project_id: str, full_matrix: bool = False, top_k: int = 5) -> Dict[str, Any]:
         """
         Compute differences across documents for each field.
 
-        For each field, groups documents by their extracted value and
-        identifies outlier values (values that differ from the majority).
+        For each field, groups documents by the canonical form of their
+        value and identifies outlier values (values that differ from the
+        majority). Distinct values are compared only with their top_k
+        nearest candidates from MinHash blocking; the resulting value_pairs
+        name one document of each value. Near-duplicate values, such as
+        typos of the majority value, are clustered. similarity_pairs, the
+        similarity of each pair of documents, is filled only for
+        full_matrix.
+
+        Args:
+            full_matrix: Also report the similarity of every pair of documents,
+                for projects of up to MAX_MATRIX_DOCUMENTS documents
+            top_k: Nearest distinct values compared per value
+
+        Raises:
+            ValueError: If full_matrix is asked for a project with more than
+                MAX_MATRIX_DOCUMENTS documents
         """
-        documents = self.repo.list_project_documents(project_id)
-        extractions = self.repo.list_extractions_by_project(project_id)
+        # Extractions already grouped by field in the table snapshot
+        table = self.snapshots.table(project_id)
 
-        if not documents or not extractions:
+        if not table['rows']:
             return {
                 'project_id': project_id,
                 'field_diffs': [],
                 'summary': {'total_fields': 0, 'fields_with_differences': 0},
             }
+        if full_matrix and len(table['documents']) > self.MAX_MATRIX_DOCUMENTS:
+            raise ValueError(
+                f"The full similarity matrix is limited to {self.MAX_MATRIX_DOCUMENTS} documents; "
+                f"this project has {len(table['documents'])}"
+            )
 
-        # Group extractions by field
-        field_map: Dict[str, List] = defaultdict(list)
-        for ext in extractions:
-            field_key = ext.field_name.replace('_', ' ').title()
-            field_map[field_key].append(ext)
-
-        doc_name_map = {d.id: d.filename for d in documents}
+        doc_name_map = {d['id']: d['filename'] for d in table['documents']}
         field_diffs = []
         fields_with_diff = 0
 
-        for field_name, field_exts in field_map.items():
-            # Group by normalized or extracted value
-            value_groups: Dict[str, List[str]] = defaultdict(list)
+        for row in table['rows']:
+            field_name = row['field_name']
+            # Group by the canonical form of the normalized or extracted
+            # value, labelled with the first form seen
+            groups: Dict[str, Dict[str, Any]] = {}
             doc_values = {}
-            for ext in field_exts:
-                val = (ext.normalized_value or ext.extracted_value or "N/A").strip()
-                doc_label = doc_name_map.get(ext.document_id, ext.document_id)
-                value_groups[val].append(doc_label)
+            for document_id, cell in row['document_results'].items():
+                if 'id' not in cell:
+                    continue  # No extraction for this document
+                val = (cell['normalized_value'] or cell['extracted_value'] or "N/A").strip()
+                doc_label = doc_name_map.get(document_id, document_id)
+                group = groups.setdefault(canonical_value(val), {'value': val, 'documents': []})
+                group['documents'].append(doc_label)
                 doc_values[doc_label] = {
                     'value': val,
-                    'confidence': ext.confidence_score,
-                    'document_id': ext.document_id,
+                    'confidence': cell['confidence_score'],
+                    'document_id': document_id,
                 }
+            if not groups:
+                continue
+
+            canonical = list(groups)
+            labels = [groups[c]['value'] for c in canonical]
+            value_groups = {groups[c]['value']: groups[c]['documents'] for c in canonical}
 
             # Determine majority value
-            majority_value = max(value_groups.keys(), key=lambda v: len(value_groups[v]))
+            majority = max(range(len(canonical)), key=lambda i: len(groups[canonical[i]]['documents']))
+            majority_value = labels[majority]
             majority_count = len(value_groups[majority_value])
             total_docs = sum(len(docs) for docs in value_groups.values())
             is_unanimous = len(value_groups) == 1
 
+            pairs = near_duplicate_pairs(canonical, top_k)
+            near_duplicates = value_clusters(len(canonical), pairs, self.NEAR_DUPLICATE_THRESHOLD)
+            majority_cluster = next((c for c in near_duplicates if majority in c), [majority])
+
             # Build outlier list
             outliers = []
             if not is_unanimous:
                 fields_with_diff += 1
-                for val, docs in value_groups.items():
-                    if val != majority_value:
-                        for doc_label in docs:
+                for i, c in enumerate(canonical):
+                    if i != majority:
+                        for doc_label in groups[c]['documents']:
                             outliers.append({
                                 'document': doc_label,
-                                'value': val,
+                                'value': labels[i],
                                 'document_id': doc_values[doc_label]['document_id'],
                                 'confidence': doc_values[doc_label]['confidence'],
+                                'near_majority': i in majority_cluster,
                             })
 
-            # Pairwise similarity matrix
-            all_values = list(doc_values.keys())
-            similarity_pairs = []
-            for i in range(len(all_values)):
-                for j in range(i + 1, len(all_values)):
-                    v1 = doc_values[all_values[i]]['value']
-                    v2 = doc_values[all_values[j]]['value']
-                    sim = SequenceMatcher(None, v1.lower(), v2.lower()).ratio()
-                    similarity_pairs.append({
-                        'doc_a': all_values[i],
-                        'doc_b': all_values[j],
-                        'similarity': round(sim, 3),
-                    })
+            value_pairs = [
+                {
+                    'value_a': labels[i],
+                    'value_b': labels[j],
+                    'doc_a': groups[canonical[i]]['documents'][0],
+                    'doc_b': groups[canonical[j]]['documents'][0],
+                    'similarity': round(score, 3),
+                }
+                for (i, j), score in sorted(pairs.items(), key=lambda p: -p[1])
+            ]
+            similarity_pairs = self._document_pairs(doc_values, canonical, pairs) if full_matrix else []
 
             field_diffs.append({
                 'field_name': field_name,
@@ -833,9 +1502,17 @@ class DiffService:
                 'majority_count': majority_count,
                 'total_documents': total_docs,
                 'unique_values': len(value_groups),
-                'value_groups': {v: docs for v, docs in value_groups.items()},
+                'value_groups': value_groups,
+                'near_duplicate_clusters': [
+                    {
+                        'values': [labels[i] for i in cluster],
+                        'document_count': sum(len(groups[canonical[i]]['documents']) for i in cluster),
+                    }
+                    for cluster in near_duplicates
+                ],
                 'outliers': outliers,
                 'document_values': doc_values,
+                'value_pairs': value_pairs,
                 'similarity_pairs': similarity_pairs,
             })
 
@@ -851,12 +1528,45 @@ class DiffService:
             },
         }
 
+    @staticmethod
+    def _document_pairs(
+        doc_values: Dict[str, Dict[str, Any]], canonical: List[str], pairs: Dict[tuple, float]
+    ) -> List[Dict[str, Any]]:
+        """Similarity of every pair of documents, each pair of distinct values compared once."""
+        position = {c: i for i, c in enumerate(canonical)}
+        scores = dict(pairs)
+        labels = list(doc_values)
+        index = [position[canonical_value(doc_values[label]['value'])] for label in labels]
+        similarity_pairs = []
+        for a in range(len(labels)):
+            for b in range(a + 1, len(labels)):
+                i, j = sorted((index[a], index[b]))
+                if i == j:
+                    score = 1.0
+                else:
+                    score = scores.get((i, j))
+                    if score is None:
+                        score = scores[(i, j)] = value_similarity(canonical[i], canonical[j])
+                similarity_pairs.append({
+                    'doc_a': labels[a],
+                    'doc_b': labels[b],
+                    'similarity': round(score, 3),
+                })
+        return similarity_pairs
+
 
 class AnnotationService:
     """Service for managing annotations on extracted fields."""
 
-    def __init__(self, repo: DatabaseRepository):
+    def __init__(self, repo: DatabaseRepository, snapshots: Optional[TableSnapshotStore] = None):
+        """
+        Args:
+            repo: Database repository
+            snapshots: Comparison table snapshots to keep current across
+                annotation writes, which bump the project revision
+        """
         self.repo = repo
+        self.snapshots = snapshots
 
     def create_annotation(
         self,
@@ -865,7 +1575,10 @@ class AnnotationService:
         annotated_by: str,
     ) -> Dict[str, Any]:
         """Create a new annotation."""
-        annotation = self.repo.create_annotation(extraction_id, comment_text, annotated_by)
+        with self.repo.unit_of_work():
+            annotation = self.repo.create_annotation(extraction_id, comment_text, annotated_by)
+            written = self._written_revision(extraction_id)
+        self._advance_snapshot(written)
         return self._to_dict(annotation)
 
     def list_annotations_for_extraction(self, extraction_id: str) -> List[Dict[str, Any]]:
@@ -880,14 +1593,38 @@ class AnnotationService:
 
     def update_annotation(self, annotation_id: str, comment_text: str) -> Dict[str, Any]:
         """Update an annotation."""
-        annotation = self.repo.update_annotation(annotation_id, comment_text)
-        if not annotation:
-            raise ValueError(f"Annotation not found: {annotation_id}")
+        with self.repo.unit_of_work():
+            annotation = self.repo.update_annotation(annotation_id, comment_text)
+            if not annotation:
+                raise ValueError(f"Annotation not found: {annotation_id}")
+            written = self._written_revision(annotation.extraction_id)
+        self._advance_snapshot(written)
         return self._to_dict(annotation)
 
     def delete_annotation(self, annotation_id: str) -> bool:
         """Delete an annotation."""
-        return self.repo.delete_annotation(annotation_id)
+        with self.repo.unit_of_work():
+            annotation = self.repo.get_annotation(annotation_id)
+            if annotation is None:
+                return False
+            self.repo.delete_annotation(annotation_id)
+            written = self._written_revision(annotation.extraction_id)
+        self._advance_snapshot(written)
+        return True
+
+    def _written_revision(self, extraction_id: str):
+        """(project id, revision) of the annotation write in the current unit of work."""
+        project_id = self.repo.get_extraction_project_id(extraction_id)
+        if project_id is None:
+            return None
+        return project_id, self.repo.get_project_revision(project_id)
+
+    def _advance_snapshot(self, written) -> None:
+        # Annotations are not shown in the comparison table, so a snapshot at
+        # the previous revision is still current
+        if self.snapshots is not None and written is not None and not self.repo.in_unit_of_work:
+            project_id, revision = written
+            self.snapshots.apply_extractions(project_id, revision, [])
 
     @staticmethod
     def _to_dict(annotation) -> Dict[str, Any]:
@@ -901,12 +1638,88 @@ class AnnotationService:
         }
 
 
+class ChangeFeedService:
+    """Service for the per-project change feed."""
+
+    def __init__(self, repo: DatabaseRepository):
+        self.repo = repo
+
+    def get_changes(self, project_id: str, since: int) -> Dict[str, Any]:
+        """
+        Documents, extractions, reviews and annotations changed after a revision.
+
+        Clients pass the revision of their last response as since. When
+        full_refresh is True the change log no longer reaches back that far
+        and the client must reload the project's views.
+        """
+        changes = self.repo.get_changes(project_id, since)
+        if changes is None:
+            raise ValueError(f"Project not found: {project_id}")
+
+        result = {
+            'project_id': project_id,
+            'since': since,
+            'revision': changes['revision'],
+            'full_refresh': changes['full_refresh'],
+        }
+        if changes['full_refresh']:
+            return result
+
+        formatters = {
+            'documents': ('document', self._document_to_dict),
+            'extractions': ('extraction', self._extraction_to_dict),
+            'reviews': ('review', self._review_to_dict),
+            'annotations': ('annotation', AnnotationService._to_dict),
+        }
+        for key, (entity, to_dict) in formatters.items():
+            result[key] = {
+                'upserted': [to_dict(row) for row in changes[entity]['upserted']],
+                'deleted': changes[entity]['deleted'],
+            }
+        return result
+
+    @staticmethod
+    def _document_to_dict(document) -> Dict[str, Any]:
+        return {
+            'id': document.id,
+            'filename': document.filename,
+            'file_type': document.file_type,
+            'status': document.status.value,
+        }
+
+    @staticmethod
+    def _extraction_to_dict(extraction) -> Dict[str, Any]:
+        return {
+            'id': extraction.id,
+            'document_id': extraction.document_id,
+            'field_name': extraction.field_name,
+            'field_type': extraction.field_type.value,
+            'extracted_value': extraction.extracted_value,
+            'normalized_value': extraction.normalized_value,
+            'confidence_score': extraction.confidence_score,
+            'status': extraction.status.value,
+        }
+
+    @staticmethod
+    def _review_to_dict(review) -> Dict[str, Any]:
+        return {
+            'id': review.id,
+            'extraction_id': review.extraction_id,
+            'status': review.status.value,
+            'ai_value': review.ai_value,
+            'manual_value': review.manual_value,
+            'reviewer_notes': review.reviewer_notes,
+            'reviewed_by': review.reviewed_by,
+            'reviewed_at': review.reviewed_at.isoformat() if review.reviewed_at else None,
+        }
+
+
 class ReExtractionService:
     """Service for triggering re-extraction when templates change."""
 
-    def __init__(self, repo: DatabaseRepository):
+    def __init__(self, repo: DatabaseRepository, snapshots: Optional[TableSnapshotStore] = None):
         self.repo = repo
-        self.extraction_service = ExtractionService(repo)
+        self.extraction_service = ExtractionService(repo, snapshots)
 
     def re_extract_project(
         self,
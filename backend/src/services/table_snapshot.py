@@ -0,0 +1,172 @@
+"""
+Materialized comparison tables.
+
+Building a project's comparison table loads every document and extraction
+and regroups them by field. TableSnapshotStore keeps the grouped table of
+recently viewed projects in memory, tagged with the project revision it
+reflects. A read costs one primary-key lookup of the revision; the table is
+rebuilt only when the project changed without the store being told.
+Extraction and review writes made through the services apply their rows to
+the snapshot directly, so a review does not invalidate the whole table.
+"""
+
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+from src.storage.repository import DatabaseRepository
+
+
+def display_field_name(field_name: Optional[str]) -> str:
+    """Column label of a field, e.g. "audit_policy" -> "Audit Policy"."""
+    if not field_name:
+        return "Unknown Field"
+    return field_name.replace('_', ' ').title()
+
+
+class ProjectTable:
+    """The comparison table of one project at one revision."""
+
+    def __init__(self, project_id: str, revision: int, documents: Iterable):
+        self.project_id = project_id
+        self.revision = revision
+        self.documents = {
+            d.id: {'id': d.id, 'filename': d.filename, 'file_type': d.file_type}
+            for d in documents
+        }
+        # Display field name -> field type and the cell of each document
+        self.fields: Dict[str, Dict[str, Any]] = {}
+        self._rendered: Optional[Dict[str, Any]] = None
+
+    def apply(self, extraction) -> bool:
+        """
+        Put an extraction's cell into the table.
+
+        Returns False if its document is not in the table, in which case the
+        snapshot is out of date and must be rebuilt.
+        """
+        if extraction.document_id not in self.documents:
+            return False
+        field_name = display_field_name(extraction.field_name)
+        group = self.fields.get(field_name)
+        if group is None:
+            group = self.fields[field_name] = {'field_type': extraction.field_type, 'results': {}}
+        # Cells are replaced, never modified, so rendered tables stay intact
+        group['results'][extraction.document_id] = {
+            'id': extraction.id,
+            'extracted_value': extraction.extracted_value,
+            'normalized_value': extraction.normalized_value,
+            'confidence_score': extraction.confidence_score,
+            'status': extraction.status.value,
+        }
+        self._rendered = None
+        return True
+
+    def render(self) -> Dict[str, Any]:
+        """The table in the /table response shape, cached until the next change."""
+        if self._rendered is not None:
+            return self._rendered
+
+        if not self.documents or not self.fields:
+            self._rendered = {
+                'project_id': self.project_id,
+                'document_count': len(self.documents),
+                'row_count': 0,
+                'rows': [],
+                'generation_timestamp': datetime.now(timezone.utc).isoformat(),
+            }
+            return self._rendered
+
+        rows = [
+            {
+                'field_name': field_name,
+                'field_type': group['field_type'],
+                'document_results': {
+                    doc_id: group['results'].get(doc_id, {
+                        'extracted_value': 'N/A',
+                        'confidence_score': 0.0,
+                    })
+                    for doc_id in self.documents
+                },
+            }
+            for field_name, group in self.fields.items()
+        ]
+        self._rendered = {
+            'project_id': self.project_id,
+            'document_count': len(self.documents),
+            'row_count': len(rows),
+            'documents': list(self.documents.values()),
+            'rows': rows,
+            'generation_timestamp': datetime.now(timezone.utc).isoformat(),
+        }
+        return self._rendered
+
+
+class TableSnapshotStore:
+    """Comparison tables of recently viewed projects, kept current by revision."""
+
+    def __init__(self, repo: DatabaseRepository, max_projects: int = 64):
+        """
+        Args:
+            repo: Repository the tables are built from
+            max_projects: Project tables kept in memory
+        """
+        self.repo = repo
+        self.max_projects = max_projects
+        self._lock = threading.Lock()
+        self._tables: "OrderedDict[str, ProjectTable]" = OrderedDict()
+
+    def table(self, project_id: str) -> Dict[str, Any]:
+        """
+        The project's comparison table as of its current revision.
+
+        The returned dict is shared with other readers and must not be
+        modified.
+        """
+        revision = self.repo.get_project_revision(project_id)
+        with self._lock:
+            table = self._tables.get(project_id)
+            if table is not None and table.revision == revision:
+                self._tables.move_to_end(project_id)
+                return table.render()
+
+        # Built from whatever is committed by now, which may be newer than
+        # revision; a later read then rebuilds it once more, and writes
+        # applied to it on top are idempotent
+        table = self._build(project_id, revision or 0)
+        with self._lock:
+            if revision is None:
+                self._tables.pop(project_id, None)
+                return table.render()
+            current = self._tables.get(project_id)
+            if current is None or current.revision <= table.revision:
+                self._tables[project_id] = table
+                self._tables.move_to_end(project_id)
+                while len(self._tables) > self.max_projects:
+                    self._tables.popitem(last=False)
+            return table.render()
+
+    def apply_extractions(self, project_id: str, revision: int, extractions: List) -> None:
+        """
+        Apply the extractions written by the transaction that produced revision.
+
+        The snapshot is updated in place if it is at the previous revision;
+        otherwise some other write came between and it is dropped, to be
+        rebuilt on the next read. An empty list records a write that does
+        not change the table, such as an annotation.
+        """
+        with self._lock:
+            table = self._tables.get(project_id)
+            if table is None:
+                return
+            if table.revision == revision - 1 and all(table.apply(e) for e in extractions):
+                table.revision = revision
+            elif table.revision < revision:
+                del self._tables[project_id]
+
+    def _build(self, project_id: str, revision: int) -> ProjectTable:
+        table = ProjectTable(project_id, revision, self.repo.list_project_documents(project_id))
+        for extraction in self.repo.list_extractions_by_project(project_id):
+            table.apply(extraction)
+        return table
@@ -0,0 +1,179 @@
+"""
+Offline token estimation and per-provider prompt packing.
+
+LLM providers limit and bill requests in tokens, not characters. The
+estimator below approximates modern BPE tokenizers (Llama 3, Gemini,
+cl100k-style) without loading a vocabulary or touching the network: common
+words are one token, long words split roughly every five letters, digits
+are grouped in threes and each run of punctuation is a token. On the sample
+contracts this gives 4.3 to 4.5 characters per token.
+"""
+
+import os
+import re
+import logging
+from typing import Dict, Any, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_WORDS = re.compile(r'[^\W\d_]+')
+_LONG_WORDS = re.compile(r'[^\W\d_]{9,}')
+_NUMBERS = re.compile(r'\d+')
+_PUNCTUATION = re.compile(r'[^\w\s]+')
+_NEWLINES = re.compile(r'\n+')
+
+# Words up to this many letters are usually a single token
+_SINGLE_TOKEN_LETTERS = 8
+_LETTERS_PER_EXTRA_TOKEN = 5
+_DIGITS_PER_TOKEN = 3
+
+# Context budgets in tokens for the whole request, and the part of it
+# reserved for instructions and the model's answer. Override with
+# <PROVIDER>_CONTEXT_TOKENS, e.g. GROQ_CONTEXT_TOKENS=12000.
+PROVIDER_BUDGETS: Dict[str, Dict[str, int]] = {
+    # Groq's on-demand tier limits llama-3.3-70b to a few thousand tokens per
+    # minute; a request must fit well inside that to avoid 413/429 errors.
+    'groq': {'context_tokens': 8000, 'reserved_tokens': 1800},
+    # gemini-1.5-flash accepts 1M tokens; 128k keeps latency and cost sane.
+    'gemini': {'context_tokens': 128000, 'reserved_tokens': 1800},
+    # Unknown generic client: assume a small 4k-token model.
+    'llm': {'context_tokens': 4096, 'reserved_tokens': 800},
+}
+
+CONTEXT_GAP = "\n[...]\n"  # Marks text left out between packed passages
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    """Estimate how many tokens a BPE tokenizer produces for text."""
+    if not text:
+        return 0
+    words = len(_WORDS.findall(text))
+    long_words = _LONG_WORDS.findall(text)
+    long_letters = sum(map(len, long_words)) - _SINGLE_TOKEN_LETTERS * len(long_words)
+    numbers = _NUMBERS.findall(text)
+    digit_tokens = (sum(map(len, numbers)) + (_DIGITS_PER_TOKEN - 1) * len(numbers)) // _DIGITS_PER_TOKEN
+    return (
+        words
+        + (long_letters + len(long_words) * (_LETTERS_PER_EXTRA_TOKEN - 1)) // _LETTERS_PER_EXTRA_TOKEN
+        + digit_tokens
+        + len(_PUNCTUATION.findall(text))
+        + len(_NEWLINES.findall(text))
+    )
+
+
+def context_budget(provider: str) -> int:
+    """Tokens of document context that fit in one request to a provider."""
+    budget = PROVIDER_BUDGETS[provider]
+    context_tokens = budget['context_tokens']
+    override = os.getenv(f"{provider.upper()}_CONTEXT_TOKENS")
+    if override:
+        try:
+            context_tokens = int(override)
+        except ValueError:
+            logger.warning(f"Ignoring invalid {provider.upper()}_CONTEXT_TOKENS={override}")
+    return max(0, context_tokens - budget['reserved_tokens'])
+
+
+def pack_context(
+    document_text: str,
+    chunks: List[Dict[str, Any]],
+    budget_tokens: int,
+    priority_chunks: Optional[List[Dict[str, Any]]] = None,
+    whole_document: bool = True,
+    document_tokens: Optional[int] = None,
+) -> str:
+    """
+    Fill a token budget with document text.
+
+    The whole document is used when it fits, unless whole_document is
+    False and only the given chunks may be sent. Otherwise chunks are taken
+    priority-first, then in document order, skipping any chunk that would
+    overflow the budget, so the budget is filled as fully as possible. The
+    selected passages are emitted in document order, with overlapping
+    chunks merged and gaps marked.
+
+    Args:
+        document_text: Full document text
+        chunks: Chunk dicts with 'text' and optionally 'start_offset',
+            'end_offset' and 'token_count'
+        budget_tokens: Tokens available for the context
+        priority_chunks: Chunks to place before all others
+        whole_document: Send document_text as is when it fits the budget
+        document_tokens: estimate_tokens(document_text), if already known
+
+    Returns:
+        Context text of at most roughly budget_tokens tokens
+    """
+    if budget_tokens <= 0:
+        return ''
+    if not chunks or whole_document:
+        if document_tokens is None:
+            document_tokens = estimate_tokens(document_text)
+        if not chunks or document_tokens <= budget_tokens:
+            return _truncate_to_budget(document_text, budget_tokens, document_tokens)
+
+    selected: List[Tuple[int, int, Dict[str, Any]]] = []
+    seen = set()
+    remaining = budget_tokens
+    ordered = list(priority_chunks or []) + list(chunks)
+    for position, chunk in enumerate(ordered):
+        key = _chunk_key(chunk)
+        if key in seen:
+            continue
+        seen.add(key)
+        tokens = chunk.get('token_count')
+        if tokens is None:
+            tokens = estimate_tokens(chunk.get('text', ''))
+        if tokens > remaining:
+            continue
+        remaining -= tokens
+        selected.append((*_chunk_span(chunk, position), chunk))
+        if remaining <= 0:
+            break
+
+    if not selected:
+        # Even the best chunk is larger than the budget
+        return _truncate_to_budget(ordered[0].get('text', ''), budget_tokens)
+
+    return _join_passages(document_text, selected)
+
+
+def _chunk_key(chunk: Dict[str, Any]):
+    if chunk.get('start_offset') is not None:
+        return ('span', chunk['start_offset'], chunk.get('end_offset'))
+    return ('text', id(chunk))
+
+
+def _chunk_span(chunk: Dict[str, Any], position: int) -> Tuple[int, int]:
+    start = chunk.get('start_offset')
+    end = chunk.get('end_offset')
+    if start is None or end is None:
+        return (-1, position)
+    return (start, end)
+
+
+def _join_passages(document_text: str, selected: List[Tuple[int, int, Dict[str, Any]]]) -> str:
+    """Join selected chunks in document order, merging overlapping spans."""
+    with_offsets = sorted((start, end) for start, end, _ in selected if start >= 0)
+    without_offsets = [chunk.get('text', '') for start, _, chunk in selected if start < 0]
+
+    merged: List[List[int]] = []
+    for start, end in with_offsets:
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+
+    passages = [document_text[start:end] for start, end in merged] + without_offsets
+    return CONTEXT_GAP.join(passages)
+
+
+def _truncate_to_budget(text: str, budget_tokens: int, tokens: Optional[int] = None) -> str:
+    """Cut text to about budget_tokens tokens, at a whitespace if possible."""
+    if tokens is None:
+        tokens = estimate_tokens(text)
+    if tokens <= budget_tokens:
+        return text
+    limit = int(len(text) * budget_tokens / tokens)
+    cut = text.rfind(' ', 0, limit)
+    return text[:cut if cut > limit // 2 else limit]
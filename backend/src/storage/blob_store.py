@@ -0,0 +1,232 @@
+"""
+Compressed, content-addressed blob store for document text.
+
+Each text is stored once, under the SHA-256 of its UTF-8 encoding, as a file
+of independently zlib-compressed frames of frame_chars characters. Reads
+memory-map the file and decompress only the frames a span touches, so a
+chunk is read without inflating the whole document. Recently read frames are
+kept decompressed in an LRU cache.
+
+File layout (little-endian):
+
+    b"LTB1" | frame_chars u32 | text length u64 | frame count u32
+    | end offset of each compressed frame u64 * count | compressed frames
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+MAGIC = b"LTB1"
+_HEADER = struct.Struct("<4sIQI")
+_OFFSET = struct.Struct("<Q")
+
+FRAME_CHARS = 64 * 1024
+
+
+class _Blob:
+    """An open, memory-mapped blob file."""
+
+    def __init__(self, path: str):
+        with open(path, 'rb') as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.frame_chars, self.length, count = _HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC:
+            self.map.close()
+            raise ValueError(f"Not a text blob: {path}")
+        offsets_start = _HEADER.size
+        self.data_start = offsets_start + count * _OFFSET.size
+        self.frame_ends = [
+            _OFFSET.unpack_from(self.map, offsets_start + i * _OFFSET.size)[0]
+            for i in range(count)
+        ]
+
+    def frame(self, index: int) -> str:
+        start = self.frame_ends[index - 1] if index else 0
+        end = self.frame_ends[index]
+        compressed = self.map[self.data_start + start:self.data_start + end]
+        return zlib.decompress(compressed).decode('utf-8')
+
+
+class BlobStore:
+    """Stores texts on local disk by content hash and reads spans of them."""
+
+    def __init__(
+        self,
+        root: str,
+        frame_chars: int = FRAME_CHARS,
+        cache_frames: int = 256,
+        max_open: int = 64,
+        level: int = 6,
+    ):
+        """
+        Args:
+            root: Directory holding the blobs; created on the first write
+            frame_chars: Characters per compressed frame
+            cache_frames: Decompressed frames kept in memory
+            max_open: Blob files kept memory-mapped
+            level: zlib compression level
+        """
+        self.root = root
+        self.frame_chars = frame_chars
+        self.cache_frames = cache_frames
+        self.max_open = max_open
+        self.level = level
+        self._lock = threading.Lock()
+        self._open: "OrderedDict[str, _Blob]" = OrderedDict()
+        self._frames: "OrderedDict[Tuple[str, int], str]" = OrderedDict()
+
+    @staticmethod
+    def key_for(text: str) -> str:
+        """Content address of a text."""
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key[2:])
+
+    def put(self, text: str) -> str:
+        """
+        Store a text unless it is already stored, and return its key.
+
+        An existing blob's modification time is refreshed, so cleanup of
+        unreferenced blobs, which spares recent files, does not delete a
+        blob an ingest is about to reference.
+        """
+        key = self.key_for(text)
+        path = self._path(key)
+        try:
+            os.utime(path)
+            return key
+        except FileNotFoundError:
+            pass
+
+        frames = [
+            zlib.compress(text[i:i + self.frame_chars].encode('utf-8'), self.level)
+            for i in range(0, len(text), self.frame_chars)
+        ]
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.part"
+        try:
+            with open(temp_path, 'wb') as f:
+                f.write(_HEADER.pack(MAGIC, self.frame_chars, len(text), len(frames)))
+                end = 0
+                for frame in frames:
+                    end += len(frame)
+                    f.write(_OFFSET.pack(end))
+                for frame in frames:
+                    f.write(frame)
+            os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+        return key
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    def get(self, key: str) -> str:
+        """Read a whole text."""
+        blob = self._blob(key)
+        return self._read(key, blob, 0, blob.length)
+
+    def read_span(self, key: str, start: int, end: int) -> str:
+        """Read text[start:end], decompressing only the frames it covers."""
+        return self._read(key, self._blob(key), start, end)
+
+    def read_spans(self, key: str, spans: Sequence[Tuple[int, int]]) -> List[str]:
+        """Read several spans of one text."""
+        blob = self._blob(key)
+        return [self._read(key, blob, start, end) for start, end in spans]
+
+    def delete(self, key: str) -> bool:
+        """Delete a blob. Returns False if it did not exist."""
+        with self._lock:
+            blob = self._open.pop(key, None)
+            if blob is not None:
+                blob.map.close()
+            for cached in [k for k in self._frames if k[0] == key]:
+                del self._frames[cached]
+        try:
+            os.unlink(self._path(key))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def keys(self, older_than: Optional[float] = None) -> Iterator[str]:
+        """
+        Iterate stored keys.
+
+        Args:
+            older_than: Only keys whose file is at least this many seconds old
+        """
+        cutoff = time.time() - older_than if older_than is not None else None
+        if not os.path.isdir(self.root):
+            return
+        for prefix in os.listdir(self.root):
+            directory = os.path.join(self.root, prefix)
+            if len(prefix) != 2 or not os.path.isdir(directory):
+                continue
+            for name in os.listdir(directory):
+                if name.endswith('.part'):
+                    continue
+                if cutoff is not None and os.path.getmtime(os.path.join(directory, name)) > cutoff:
+                    continue
+                yield prefix + name
+
+    def close(self) -> None:
+        """Unmap open blobs and drop cached frames."""
+        with self._lock:
+            for blob in self._open.values():
+                blob.map.close()
+            self._open.clear()
+            self._frames.clear()
+
+    def _blob(self, key: str) -> _Blob:
+        with self._lock:
+            return self._blob_locked(key)
+
+    def _blob_locked(self, key: str) -> _Blob:
+        blob = self._open.get(key)
+        if blob is not None:
+            self._open.move_to_end(key)
+            return blob
+        blob = _Blob(self._path(key))
+        self._open[key] = blob
+        if len(self._open) > self.max_open:
+            _, evicted = self._open.popitem(last=False)
+            evicted.map.close()
+        return blob
+
+    def _frame(self, key: str, index: int) -> str:
+        # The blob is looked up under the lock so it cannot be unmapped by
+        # another thread's eviction while its frame is read
+        with self._lock:
+            text = self._frames.get((key, index))
+            if text is not None:
+                self._frames.move_to_end((key, index))
+                return text
+            text = self._blob_locked(key).frame(index)
+            self._frames[(key, index)] = text
+            if len(self._frames) > self.cache_frames:
+                self._frames.popitem(last=False)
+            return text
+
+    def _read(self, key: str, blob: _Blob, start: int, end: int) -> str:
+        start = max(0, start)
+        end = min(end, blob.length)
+        if start >= end:
+            return ""
+        first = start // blob.frame_chars
+        last = (end - 1) // blob.frame_chars
+        if first == last:
+            offset = first * blob.frame_chars
+            return self._frame(key, first)[start - offset:end - offset]
+        parts = [self._frame(key, index) for index in range(first, last + 1)]
+        offset = first * blob.frame_chars
+        return ''.join(parts)[start - offset:end - offset]
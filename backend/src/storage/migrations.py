@@ -0,0 +1,115 @@
+"""
+Schema migrations for existing databases.
+
+`Base.metadata.create_all` only creates missing tables, so databases created
+by an older version need upgrading. `upgrade` runs on every start:
+
+1. Nullable columns added to a model after its table was created are added.
+2. Indexes declared on a model but missing from its table are created.
+3. Numbered migrations in MIGRATIONS run once each, in order, for changes
+   that cannot be derived from the models (dropping indexes, rewriting
+   data). Applied versions are recorded in the schema_migrations table.
+
+On a large Postgres database, create new indexes by hand with
+CREATE INDEX CONCURRENTLY before deploying to avoid blocking writes; indexes
+that already exist are left alone.
+"""
+
+import logging
+from datetime import datetime, timezone
+from typing import Callable, List, Tuple
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, inspect, select, text
+from sqlalchemy.engine import Connection, Engine
+
+from src.models.schema import Base
+
+logger = logging.getLogger(__name__)
+
+_migration_metadata = MetaData()
+schema_migrations = Table(
+    "schema_migrations",
+    _migration_metadata,
+    Column("version", Integer, primary_key=True),
+    Column("description", String(256), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+def _start_change_logs(connection: Connection) -> None:
+    # Writes before the change log existed were not logged
+    connection.execute(text(
+        "UPDATE projects SET change_log_floor = COALESCE(revision, 0) WHERE change_log_floor IS NULL"
+    ))
+
+
+# (version, description, migration); append only, never renumber
+MIGRATIONS: List[Tuple[int, str, Callable[[Connection], None]]] = [
+    (
+        1,
+        "Start the change log of existing projects at their current revision",
+        _start_change_logs,
+    ),
+]
+
+
+def upgrade(engine: Engine) -> None:
+    """Create missing tables and bring existing ones up to the current models."""
+    Base.metadata.create_all(bind=engine)
+    _migration_metadata.create_all(bind=engine)
+    _add_missing_columns(engine)
+    _create_missing_indexes(engine)
+    _run_migrations(engine)
+
+
+def _add_missing_columns(engine: Engine) -> None:
+    """Add nullable columns introduced after an existing table was created."""
+    with engine.begin() as connection:
+        inspector = inspect(connection)
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {c['name'] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing or not column.nullable:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                logger.info(f"Adding column {table.name}.{column.name}")
+                connection.execute(text(
+                    f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"
+                ))
+
+
+def _create_missing_indexes(engine: Engine) -> None:
+    """Create declared indexes that tables created by older versions lack."""
+    with engine.begin() as connection:
+        inspector = inspect(connection)
+        for table in Base.metadata.sorted_tables:
+            existing = {ix['name'] for ix in inspector.get_indexes(table.name)}
+            for index in sorted(table.indexes, key=lambda ix: ix.name):
+                if index.name in existing:
+                    continue
+                logger.info(f"Creating index {index.name} on {table.name}")
+                index.create(bind=connection)
+
+
+def current_version(engine: Engine) -> int:
+    """Highest numbered migration applied to the database."""
+    with engine.connect() as connection:
+        versions = connection.execute(select(schema_migrations.c.version)).scalars().all()
+    return max(versions, default=0)
+
+
+def _run_migrations(engine: Engine) -> None:
+    applied = current_version(engine)
+    for version, description, migrate in MIGRATIONS:
+        if version <= applied:
+            continue
+        logger.info(f"Applying migration {version}: {description}")
+        with engine.begin() as connection:
+            migrate(connection)
+            connection.execute(schema_migrations.insert().values(
+                version=version,
+                description=description,
+                applied_at=datetime.now(timezone.utc),
+            ))
@@ -2,20 +2,28 @@
 Database repository layer for all database operations.
 """
 
-from sqlalchemy import create_engine, and_, text
-from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy.exc import OperationalError
-from typing import List, Optional, Dict, Any
+from sqlalchemy import create_engine, and_, or_, text, event, func, update, insert, select, literal, type_coerce, String
+from sqlalchemy.orm import sessionmaker, Session, undefer, load_only
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.exc import OperationalError, IntegrityError
+from typing import List, Optional, Dict, Any, Iterator, Tuple
+from concurrent.futures import Future
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
 import logging
+import os
 import time
 import functools
 
 from src.models.schema import (
-    Base, Project, Document, DocumentChunk, FieldTemplate, ExtractionResult,
-    Citation, ReviewState, Annotation, Task, EvaluationResult,
+    Base, Project, Document, DocumentChunk, DocumentSection, ChunkClause, ParsedContent, FieldTemplate, ExtractionResult,
+    Citation, ReviewState, Annotation, Task, EvaluationResult, ChangeLogEntry,
     ProjectStatus, DocumentStatus, ExtractionStatus, TaskStatus
 )
-from datetime import datetime, timezone
+from src.storage.migrations import upgrade
+from src.storage.sqlite_writer import SQLiteWriter
+from src.storage.blob_store import BlobStore
+from datetime import datetime, timezone, timedelta
 
 logger = logging.getLogger(__name__)
 
@@ -29,7 +37,10 @@ def retry_on_lock(max_retries=5, delay=1.0):
                 try:
                     return func(*args, **kwargs)
                 except OperationalError as e:
-                    if "database is locked" in str(e) and retries < max_retries:
+                    # Inside a unit of work the failed statement rolled back
+                    # the whole unit, so only the unit's owner can retry
+                    in_unit = bool(args) and getattr(args[0], 'in_unit_of_work', False)
+                    if "database is locked" in str(e) and retries < max_retries and not in_unit:
                         retries += 1
                         sleep_time = delay * retries
                         logger.warning(f"Database locked in {func.__name__}, retrying in {sleep_time}s ({retries}/{max_retries})")
@@ -40,11 +51,78 @@ def retry_on_lock(max_retries=5, delay=1.0):
     return decorator
 
 
+def writes(func):
+    """
+    Mark a repository method as a write.
+
+    With the SQLite single writer enabled the call is queued to the writer
+    thread and the caller waits for its result. Inside a unit of work, which
+    holds the writer's turn, or without the writer, it runs directly and
+    retries on lock errors.
+    """
+    retrying = retry_on_lock()(func)
+
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        if self._writer is not None and not self.in_unit_of_work:
+            return self._writer.submit(func, self, *args, **kwargs).result()
+        return retrying(self, *args, **kwargs)
+    return wrapper
+
+
+class UnitOfWorkSession:
+    """
+    The shared session handed to repository methods inside a unit of work.
+
+    Repository methods commit, roll back and close their session as if it
+    were their own. Here a commit only flushes, so ids and defaults are
+    assigned, and closing does nothing; the unit commits or rolls back once
+    at the end. A rollback discards the whole unit.
+    """
+
+    def __init__(self, session: Session):
+        self.session = session
+        self.failed = False
+        self.touched_projects: set = set()
+
+    def commit(self) -> None:
+        self.session.flush()
+
+    def close(self) -> None:
+        pass
+
+    def rollback(self) -> None:
+        self.failed = True
+        self.session.rollback()
+
+    def __getattr__(self, name):
+        return getattr(self.session, name)
+
+
 class DatabaseRepository:
     """Repository pattern for all database operations."""
 
-    def __init__(self, database_url: str):
-        """Initialize database connection."""
+    def __init__(
+        self,
+        database_url: str,
+        single_writer: Optional[bool] = None,
+        blob_dir: Optional[str] = None,
+    ):
+        """
+        Initialize database connection.
+
+        Args:
+            database_url: SQLAlchemy database URL
+            single_writer: Queue all writes to one writer thread (file-based
+                SQLite only). Defaults to the SQLITE_SINGLE_WRITER environment
+                variable, on unless set to 0.
+            blob_dir: Directory of the compressed blob store that holds
+                document text. Defaults to the BLOB_STORE_DIR environment
+                variable, else blobs/ next to a SQLite database file or in
+                the working directory. In-memory databases, or an empty
+                string, keep text inline in the database.
+        """
+        self._writer: Optional[SQLiteWriter] = None
         if "sqlite" in database_url:
             # Optimize SQLite for concurrency
             self.engine = create_engine(
@@ -52,27 +130,153 @@ class DatabaseRepository:
                 echo=False,
                 connect_args={'check_same_thread': False, 'timeout': 60}  # Increased timeout
             )
-            # Enable WAL mode
-            try:
-                with self.engine.connect() as connection:
-                    connection.execute(text("PRAGMA journal_mode=WAL;"))
-                    connection.execute(text("PRAGMA synchronous=NORMAL;"))
-            except Exception as e:
-                logger.warning(f"Could not set SQLite PRAGMA: {e}")
+            self._configure_sqlite(self.engine)
         else:
             self.engine = create_engine(database_url, echo=False)
 
         self.SessionLocal = sessionmaker(bind=self.engine)
+        self._unit: ContextVar[Optional[UnitOfWorkSession]] = ContextVar(
+            f"unit_of_work_{id(self)}", default=None
+        )
         
-        # Create tables
-        Base.metadata.create_all(bind=self.engine)
+        # Create tables and upgrade databases created by older versions
+        upgrade(self.engine)
+
+        if single_writer is None:
+            single_writer = os.getenv("SQLITE_SINGLE_WRITER", "1") != "0"
+        # An in-memory database exists once per connection, so it cannot be
+        # shared with a writer thread
+        in_memory = self.engine.url.database in (None, '', ':memory:')
+        if single_writer and self.engine.dialect.name == 'sqlite' and not in_memory:
+            self._writer = SQLiteWriter(self)
+
+        if blob_dir is None:
+            blob_dir = os.getenv("BLOB_STORE_DIR") or self._default_blob_dir(in_memory)
+        self.blobs: Optional[BlobStore] = BlobStore(blob_dir) if blob_dir else None
+
+    def _default_blob_dir(self, in_memory: bool) -> Optional[str]:
+        if self.engine.dialect.name != 'sqlite':
+            return os.path.abspath("blobs")
+        if in_memory:
+            return None
+        return os.path.join(os.path.dirname(os.path.abspath(self.engine.url.database)), "blobs")
+
+    @staticmethod
+    def _configure_sqlite(engine) -> None:
+        """
+        Set per-connection PRAGMAs and let SQLAlchemy emit BEGIN itself.
+
+        pysqlite defers BEGIN to the first write, so a transaction that reads
+        first can fail with "database is locked" when it later writes. With
+        BEGIN emitted explicitly, units of work start with BEGIN IMMEDIATE
+        and take the write lock before reading.
+        """
+        @event.listens_for(engine, "connect")
+        def on_connect(dbapi_connection, connection_record):
+            dbapi_connection.isolation_level = None
+            cursor = dbapi_connection.cursor()
+            try:
+                # Enable WAL mode
+                cursor.execute("PRAGMA journal_mode=WAL")
+                cursor.execute("PRAGMA synchronous=NORMAL")
+            except Exception as e:
+                logger.warning(f"Could not set SQLite PRAGMA: {e}")
+            finally:
+                cursor.close()
+
+        @event.listens_for(engine, "begin")
+        def on_begin(connection):
+            mode = connection.get_execution_options().get('sqlite_begin', 'DEFERRED')
+            connection.exec_driver_sql(f"BEGIN {mode}")
+
+    def close(self) -> None:
+        """Finish queued writes and release database connections."""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if self.blobs is not None:
+            self.blobs.close()
+        self.engine.dispose()
+
+    def submit_write(self, method, *args, **kwargs) -> Future:
+        """
+        Queue a write without waiting for it.
+
+        Args:
+            method: A write method of this repository, e.g. self.create_chunks_bulk
+
+        Returns:
+            Future for the method's result. Without the single writer, or
+            inside a unit of work, the write runs immediately and the Future
+            is already done.
+        """
+        if self._writer is None or self.in_unit_of_work:
+            future: Future = Future()
+            try:
+                future.set_result(method(*args, **kwargs))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+        func = getattr(method, '__func__', method)
+        return self._writer.submit(getattr(func, '__wrapped__', func), self, *args, **kwargs)
 
     def get_session(self) -> Session:
-        """Get new database session."""
+        """Get new database session, or the current unit of work's session."""
+        unit = self._unit.get()
+        if unit is not None:
+            return unit
         return self.SessionLocal()
 
+    @property
+    def in_unit_of_work(self) -> bool:
+        return self._unit.get() is not None
+
+    @contextmanager
+    def unit_of_work(self) -> Iterator[Session]:
+        """
+        Run several repository operations in one session and transaction.
+
+        Inside the block, repository methods called from the same thread or
+        task share one session. Their writes are flushed, not committed, and
+        are committed together when the block exits. If the block raises or
+        any operation fails, everything is rolled back. Lookups by id are
+        served from the session's identity map, and returned objects stay
+        usable after the block. A nested block joins the outer unit.
+
+            with repo.unit_of_work():
+                document = repo.create_document(...)
+                repo.create_chunks_bulk(...)
+                repo.update_document_status(document.id, DocumentStatus.INDEXED)
+        """
+        outer = self._unit.get()
+        if outer is not None:
+            yield outer.session
+            return
+
+        # With the single writer, the unit takes the writer's turn so it never
+        # waits on the lock held by queued writes, nor they on it
+        with ExitStack() as stack:
+            if self._writer is not None and not self._writer.on_writer_thread:
+                stack.enter_context(self._writer.turn())
+            unit = UnitOfWorkSession(self.SessionLocal(expire_on_commit=False))
+            token = self._unit.set(unit)
+            try:
+                if self.engine.dialect.name == 'sqlite':
+                    unit.session.connection(execution_options={'sqlite_begin': 'IMMEDIATE'})
+                yield unit.session
+                if unit.failed or not unit.session.is_active:
+                    raise RuntimeError("Unit of work rolled back after a failed operation")
+                unit.session.commit()
+            except Exception:
+                unit.session.rollback()
+                raise
+            finally:
+                self._unit.reset(token)
+                unit.session.close()
+
     # ==================== PROJECT OPERATIONS ====================
 
+    @writes
     def create_project(
         self,
         name: str,
@@ -99,7 +303,7 @@ class DatabaseRepository:
         """Get project by ID."""
         session = self.get_session()
         try:
-            return session.query(Project).filter(Project.id == project_id).first()
+            return session.get(Project, project_id)
         finally:
             session.close()
 
@@ -111,6 +315,64 @@ class DatabaseRepository:
         finally:
             session.close()
 
+    def get_project_revision(self, project_id: str) -> Optional[int]:
+        """Current revision of a project, or None if the project does not exist."""
+        session = self.get_session()
+        try:
+            row = session.query(Project.revision).filter(Project.id == project_id).first()
+            return None if row is None else (row.revision or 0)
+        finally:
+            session.close()
+
+    @staticmethod
+    def _touch_project(session: Session, project_id: str) -> None:
+        """
+        Bump a project's revision in the caller's transaction.
+
+        Writes to anything shown by the project's read views (documents,
+        extractions, reviews, annotations) call this through _record_change,
+        so the revision tags those views for caching.
+
+        Inside a unit of work the revision is bumped once per project, so it
+        counts committed transactions rather than rows written.
+        """
+        if isinstance(session, UnitOfWorkSession):
+            if project_id in session.touched_projects:
+                return
+            session.touched_projects.add(project_id)
+        session.execute(
+            update(Project)
+            .where(Project.id == project_id)
+            .values(revision=func.coalesce(Project.revision, 0) + 1)
+            .execution_options(synchronize_session=False)
+        )
+
+    def _record_change(
+        self,
+        session: Session,
+        project_id: str,
+        entity: str,
+        entity_id: str,
+        operation: str,
+    ) -> None:
+        """Bump the project's revision and log the change at the new revision."""
+        self._touch_project(session, project_id)
+        session.execute(insert(ChangeLogEntry).from_select(
+            ['project_id', 'revision', 'entity', 'entity_id', 'operation', 'created_at'],
+            select(
+                literal(project_id), func.coalesce(Project.revision, 0), literal(entity),
+                literal(entity_id), literal(operation), literal(datetime.now(timezone.utc)),
+            ).where(Project.id == project_id),
+        ))
+
+    def _record_annotation_change(self, session: Session, annotation: Annotation, operation: str) -> None:
+        project_id = session.query(ExtractionResult.project_id).filter(
+            ExtractionResult.id == annotation.extraction_id
+        ).scalar()
+        if project_id is not None:
+            self._record_change(session, project_id, 'annotation', annotation.id, operation)
+
+    @writes
     def update_project(
         self,
         project_id: str,
@@ -119,18 +381,19 @@ class DatabaseRepository:
         """Update project."""
         session = self.get_session()
         try:
-            project = session.query(Project).filter(Project.id == project_id).first()
+            project = session.get(Project, project_id)
             if project:
                 for key, value in kwargs.items():
                     if hasattr(project, key):
                         setattr(project, key, value)
+                self._touch_project(session, project_id)
                 session.commit()
                 session.refresh(project)
             return project
         finally:
             session.close()
 
-    @retry_on_lock()
+    @writes
     def delete_project(self, project_id: str) -> bool:
         """Delete project and related data."""
         session = self.get_session()
@@ -139,12 +402,25 @@ class DatabaseRepository:
             if "sqlite" in str(self.engine.url):
                 session.execute(text("PRAGMA foreign_keys=ON"))
 
-            project = session.query(Project).filter(Project.id == project_id).first()
+            project = session.get(Project, project_id)
             if project:
                 # Manually delete related tasks to avoid FK constraint issues if cascade fails
                 session.query(Task).filter(Task.project_id == project_id).delete(synchronize_session=False)
-                
+                session.query(ChangeLogEntry).filter(
+                    ChangeLogEntry.project_id == project_id
+                ).delete(synchronize_session=False)
+
+                # Shared parse cache entries held by this project's documents
+                content_hashes = [
+                    row.content_hash for row in session.query(Document.content_hash).filter(
+                        Document.project_id == project_id,
+                        Document.content_hash.isnot(None),
+                    ).all()
+                ]
+
                 session.delete(project)
+                session.flush()
+                self._release_parsed_contents(session, content_hashes)
                 session.commit()
                 return True
             return False
@@ -157,7 +433,7 @@ class DatabaseRepository:
 
     # ==================== DOCUMENT OPERATIONS ====================
 
-    @retry_on_lock()
+    @writes
     def create_document(
         self,
         project_id: str,
@@ -167,8 +443,10 @@ class DatabaseRepository:
         file_size: int,
         content_text: str,
         parsed_metadata: Dict[str, Any] = None,
+        content_hash: Optional[str] = None,
     ) -> Document:
-        """Create new document."""
+        """Create new document, taking a reference on its parse cache entry if given."""
+        content_text, blob_key = self._store_text(content_text)
         session = self.get_session()
         try:
             doc = Document(
@@ -178,10 +456,16 @@ class DatabaseRepository:
                 file_path=file_path,
                 file_size=file_size,
                 content_text=content_text,
+                blob_key=blob_key,
+                content_hash=content_hash,
                 parsed_metadata=parsed_metadata or {},
                 status=DocumentStatus.UPLOADED,
             )
             session.add(doc)
+            if content_hash:
+                self._acquire_parsed_content(session, content_hash)
+            session.flush()
+            self._record_change(session, project_id, 'document', doc.id, 'insert')
             session.commit()
             session.refresh(doc)
             return doc
@@ -189,10 +473,28 @@ class DatabaseRepository:
             session.close()
 
     def get_document(self, document_id: str) -> Optional[Document]:
-        """Get document by ID."""
+        """
+        Get document by ID, including its deferred text and metadata.
+
+        The text is resolved like get_document_text's, from the blob store
+        or the parse cache entry the document shares.
+        """
+        session = self.get_session()
+        try:
+            doc = session.get(Document, document_id, options=[undefer(Document.parsed_metadata)])
+            if doc is not None:
+                blob_key, text = self._text_source(session, document_id)
+                set_committed_value(doc, 'content_text', self._read_blob(blob_key) if blob_key else text)
+            return doc
+        finally:
+            session.close()
+
+    def get_document_metadata(self, document_id: str) -> Optional[Dict[str, Any]]:
+        """Get a document's parsed metadata without reading its text, or None if it does not exist."""
         session = self.get_session()
         try:
-            return session.query(Document).filter(Document.id == document_id).first()
+            row = session.query(Document.parsed_metadata).filter(Document.id == document_id).first()
+            return None if row is None else (row.parsed_metadata or {})
         finally:
             session.close()
 
@@ -204,21 +506,254 @@ class DatabaseRepository:
         finally:
             session.close()
 
+    def count_project_documents(self, project_id: str) -> int:
+        """Count documents in project without loading them."""
+        session = self.get_session()
+        try:
+            return session.query(func.count(Document.id)).filter(
+                Document.project_id == project_id
+            ).scalar()
+        finally:
+            session.close()
+
+    @writes
     def update_document_status(self, document_id: str, status: DocumentStatus) -> Optional[Document]:
         """Update document status."""
         session = self.get_session()
         try:
-            doc = session.query(Document).filter(Document.id == document_id).first()
+            doc = session.get(Document, document_id)
             if doc:
                 doc.status = status
+                self._record_change(session, doc.project_id, 'document', doc.id, 'update')
+                session.commit()
+                session.refresh(doc)
+            return doc
+        finally:
+            session.close()
+
+    @writes
+    def update_document(self, document_id: str, **kwargs) -> Optional[Document]:
+        """Update document fields."""
+        if 'content_text' in kwargs:
+            kwargs['content_text'], kwargs['blob_key'] = self._store_text(kwargs['content_text'])
+        session = self.get_session()
+        try:
+            doc = session.get(Document, document_id)
+            if doc:
+                for key, value in kwargs.items():
+                    if hasattr(doc, key):
+                        setattr(doc, key, value)
+                self._record_change(session, doc.project_id, 'document', doc.id, 'update')
+                session.commit()
+                session.refresh(doc)
+            return doc
+        finally:
+            session.close()
+
+    def get_document_text(self, document_id: str) -> str:
+        """Get document text, resolving it from the parse cache when shared."""
+        session = self.get_session()
+        try:
+            blob_key, text = self._text_source(session, document_id)
+        finally:
+            session.close()
+        return self._read_blob(blob_key) if blob_key else text
+
+    @staticmethod
+    def _text_source(session: Session, document_id: str) -> Tuple[Optional[str], str]:
+        """
+        Find where a document's text lives.
+
+        Returns:
+            (blob key, "") when the text is in the blob store, otherwise
+            (None, inline text). The document's own text wins over the parse
+            cache entry it shares.
+        """
+        row = session.query(
+            Document.blob_key, Document.content_text, ParsedContent.blob_key, ParsedContent.content_text,
+        ).outerjoin(
+            ParsedContent, Document.content_hash == ParsedContent.content_hash
+        ).filter(Document.id == document_id).first()
+        if not row:
+            return None, ""
+        own_key, own_text, shared_key, shared_text = row
+        if own_key:
+            return own_key, ""
+        if own_text:
+            return None, own_text
+        return shared_key, shared_text or ""
+
+    def _read_document_spans(self, session: Session, document_id: str, spans: List[Tuple[int, int]]) -> List[str]:
+        """Read several (start, end) spans of a document's text in one pass."""
+        blob_key, text = self._text_source(session, document_id)
+        if blob_key:
+            return self._blob_store_for(blob_key).read_spans(blob_key, spans)
+        return [text[start:end] for start, end in spans]
+
+    def _store_text(self, text: str) -> Tuple[str, Optional[str]]:
+        """Put a text in the blob store. Returns (value for the text column, blob key)."""
+        if self.blobs is None or not text:
+            return text, None
+        return "", self.blobs.put(text)
+
+    def _blob_store_for(self, blob_key: str) -> BlobStore:
+        if self.blobs is None:
+            raise RuntimeError(f"Text {blob_key[:12]} is in the blob store, but no blob store is configured")
+        return self.blobs
+
+    def _read_blob(self, blob_key: str) -> str:
+        return self._blob_store_for(blob_key).get(blob_key)
+
+    def delete_unreferenced_blobs(self, min_age_seconds: float = 3600) -> int:
+        """
+        Delete blobs that no document or parse cache entry references.
+
+        Blobs written in the last min_age_seconds are kept, because ingestion
+        stores a blob before it commits the row that references it.
+
+        Returns:
+            Number of blobs deleted
+        """
+        if self.blobs is None:
+            return 0
+        # A fresh session sees committed references only, never the pending
+        # deletes of a unit of work that may still roll back
+        session = self.SessionLocal()
+        try:
+            referenced = {
+                key for (key,) in session.query(Document.blob_key).filter(Document.blob_key.isnot(None))
+            }
+            referenced.update(
+                key for (key,) in session.query(ParsedContent.blob_key).filter(ParsedContent.blob_key.isnot(None))
+            )
+        finally:
+            session.close()
+        deleted = 0
+        for key in list(self.blobs.keys(older_than=min_age_seconds)):
+            if key not in referenced and self.blobs.delete(key):
+                deleted += 1
+        if deleted:
+            logger.info(f"Deleted {deleted} unreferenced blobs")
+        return deleted
+
+    # ==================== PARSE CACHE OPERATIONS ====================
+
+    def get_parsed_content(self, content_hash: str) -> Optional[ParsedContent]:
+        """Get parse cache entry by content hash."""
+        session = self.get_session()
+        try:
+            entry = session.query(ParsedContent).filter(
+                ParsedContent.content_hash == content_hash
+            ).first()
+            if entry is not None and entry.blob_key:
+                set_committed_value(entry, 'content_text', self._read_blob(entry.blob_key))
+            return entry
+        finally:
+            session.close()
+
+    @writes
+    def save_parsed_content(
+        self,
+        content_hash: str,
+        file_type: str,
+        file_path: str,
+        file_size: int,
+        content_text: str,
+        parsed_metadata: Dict[str, Any],
+        chunk_config: str,
+        chunk_spans: List[List[Any]],
+        sections: Optional[List[Dict[str, Any]]] = None,
+    ) -> ParsedContent:
+        """
+        Create or refresh a parse cache entry, keeping its reference count.
+
+        If a concurrent ingest of the same bytes stores the entry first, its
+        entry is returned. The insert runs in a savepoint, so losing that
+        race does not roll back an enclosing unit of work.
+        """
+        session = self.get_session()
+        try:
+            entry = session.query(ParsedContent).filter(
+                ParsedContent.content_hash == content_hash
+            ).first()
+
+            def fill(entry: ParsedContent) -> None:
+                entry.file_type = file_type
+                entry.file_path = file_path
+                entry.file_size = file_size
+                entry.content_text, entry.blob_key = self._store_text(content_text)
+                entry.parsed_metadata = parsed_metadata or {}
+                entry.chunk_config = chunk_config
+                entry.chunk_spans = chunk_spans
+                entry.sections = sections
+
+            if entry:
+                fill(entry)
+            else:
+                try:
+                    with session.begin_nested():
+                        entry = ParsedContent(content_hash=content_hash, ref_count=0)
+                        fill(entry)
+                        session.add(entry)
+                except IntegrityError:
+                    # A concurrent ingest of the same bytes stored it first
+                    return session.query(ParsedContent).filter(
+                        ParsedContent.content_hash == content_hash
+                    ).first()
+            session.commit()
+            session.refresh(entry)
+            return entry
+        finally:
+            session.close()
+
+    @writes
+    def link_parsed_content(self, document_id: str, content_hash: str) -> Optional[Document]:
+        """Point a document at a parse cache entry and drop its private text copy."""
+        session = self.get_session()
+        try:
+            doc = session.get(Document, document_id)
+            if doc and doc.content_hash != content_hash:
+                if doc.content_hash:
+                    self._release_parsed_contents(session, [doc.content_hash])
+                self._acquire_parsed_content(session, content_hash)
+                doc.content_hash = content_hash
+                doc.content_text = ""
+                doc.blob_key = None
                 session.commit()
                 session.refresh(doc)
             return doc
         finally:
             session.close()
 
+    @staticmethod
+    def _acquire_parsed_content(session: Session, content_hash: str) -> None:
+        """Increment the reference count of a parse cache entry."""
+        session.query(ParsedContent).filter(
+            ParsedContent.content_hash == content_hash
+        ).update(
+            {ParsedContent.ref_count: ParsedContent.ref_count + 1},
+            synchronize_session=False,
+        )
+
+    @staticmethod
+    def _release_parsed_contents(session: Session, content_hashes: List[str]) -> None:
+        """Decrement reference counts and drop entries no document uses."""
+        for content_hash in content_hashes:
+            session.query(ParsedContent).filter(
+                ParsedContent.content_hash == content_hash
+            ).update(
+                {ParsedContent.ref_count: ParsedContent.ref_count - 1},
+                synchronize_session=False,
+            )
+        if content_hashes:
+            session.query(ParsedContent).filter(
+                ParsedContent.content_hash.in_(set(content_hashes)),
+                ParsedContent.ref_count <= 0,
+            ).delete(synchronize_session=False)
+
     # ==================== DOCUMENT CHUNK OPERATIONS ====================
 
+    @writes
     def create_chunk(
         self,
         document_id: str,
@@ -247,27 +782,52 @@ class DatabaseRepository:
             session.close()
 
     def get_document_chunks(self, document_id: str) -> List[DocumentChunk]:
-        """Get all chunks for document."""
+        """Get all chunks for document, reading span-stored chunk text from the document's text."""
         session = self.get_session()
         try:
-            return session.query(DocumentChunk).filter(
+            chunks = session.query(DocumentChunk).filter(
                 DocumentChunk.document_id == document_id
             ).order_by(DocumentChunk.chunk_index).all()
+            spans = [
+                c for c in chunks
+                if not c.text and c.start_offset is not None and c.end_offset is not None
+            ]
+            if spans:
+                texts = self._read_document_spans(
+                    session, document_id, [(c.start_offset, c.end_offset) for c in spans]
+                )
+                for chunk, chunk_text in zip(spans, texts):
+                    set_committed_value(chunk, 'text', chunk_text)
+            return chunks
         finally:
             session.close()
 
-    @retry_on_lock()
+    @writes
     def create_chunks_bulk(self, chunks_data: List[Dict[str, Any]]) -> bool:
-        """Create multiple chunks in bulk."""
+        """
+        Create multiple chunks in bulk.
+
+        With a blob store, chunks that carry start and end offsets are stored
+        as spans of their document's text, without a copy of their text.
+        """
+        def stored_text(chunk: Dict[str, Any]) -> str:
+            if self.blobs is not None and chunk.get('start_offset') is not None \
+                    and chunk.get('end_offset') is not None:
+                return ""
+            return chunk['text']
+
         session = self.get_session()
         try:
             chunks = [
                 DocumentChunk(
                     document_id=chunk['document_id'],
                     chunk_index=chunk['chunk_index'],
-                    text=chunk['text'],
+                    text=stored_text(chunk),
                     page_number=chunk.get('page_number'),
                     section_title=chunk.get('section_title'),
+                    start_offset=chunk.get('start_offset'),
+                    end_offset=chunk.get('end_offset'),
+                    token_count=chunk.get('token_count'),
                 )
                 for chunk in chunks_data
             ]
@@ -281,8 +841,112 @@ class DatabaseRepository:
         finally:
             session.close()
 
+    @writes
+    def create_sections_bulk(self, document_id: str, sections: List[Dict[str, Any]]) -> bool:
+        """Store a document's section tree as produced by DocumentChunker.detect_sections."""
+        session = self.get_session()
+        try:
+            session.bulk_save_objects([
+                DocumentSection(
+                    document_id=document_id,
+                    section_index=section['index'],
+                    parent_index=section['parent'],
+                    level=section['level'],
+                    number=section['number'],
+                    title=section['title'],
+                    start_offset=section['start_offset'],
+                    end_offset=section['end_offset'],
+                )
+                for section in sections
+            ])
+            session.commit()
+            return True
+        except Exception as e:
+            logger.error(f"Error bulk creating sections: {str(e)}")
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    def get_document_sections(self, document_id: str) -> List[Dict[str, Any]]:
+        """Get a document's section tree in the DocumentChunker.detect_sections format."""
+        session = self.get_session()
+        try:
+            rows = session.query(DocumentSection).filter(
+                DocumentSection.document_id == document_id
+            ).order_by(DocumentSection.section_index).all()
+            return [
+                {
+                    'index': row.section_index,
+                    'parent': row.parent_index,
+                    'level': row.level,
+                    'number': row.number,
+                    'title': row.title,
+                    'start_offset': row.start_offset,
+                    'end_offset': row.end_offset,
+                }
+                for row in rows
+            ]
+        finally:
+            session.close()
+
+    @writes
+    def create_chunk_clauses_bulk(self, document_id: str, tags: List[Dict[str, Any]]) -> bool:
+        """Store chunk clause tags as produced by clause_classifier.classify_chunks."""
+        session = self.get_session()
+        try:
+            session.bulk_save_objects([
+                ChunkClause(
+                    document_id=document_id,
+                    chunk_index=tag['chunk_index'],
+                    family=tag['family'],
+                    score=tag['score'],
+                )
+                for tag in tags
+            ])
+            session.commit()
+            return True
+        except Exception as e:
+            logger.error(f"Error bulk creating chunk clauses: {str(e)}")
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    def get_chunk_clauses(self, document_id: str) -> Dict[str, List[int]]:
+        """Get a document's clause index as family -> chunk indexes in document order."""
+        session = self.get_session()
+        try:
+            rows = session.query(ChunkClause.family, ChunkClause.chunk_index).filter(
+                ChunkClause.document_id == document_id
+            ).order_by(ChunkClause.family, ChunkClause.chunk_index).all()
+            index: Dict[str, List[int]] = {}
+            for family, chunk_index in rows:
+                index.setdefault(family, []).append(chunk_index)
+            return index
+        finally:
+            session.close()
+
+    @writes
+    def delete_document_chunks(self, document_id: str) -> int:
+        """Delete all chunks for document."""
+        session = self.get_session()
+        try:
+            count = session.query(DocumentChunk).filter(
+                DocumentChunk.document_id == document_id
+            ).delete(synchronize_session=False)
+            session.commit()
+            return count
+        except Exception as e:
+            logger.error(f"Error deleting chunks for document {document_id}: {str(e)}")
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
     # ==================== FIELD TEMPLATE OPERATIONS ====================
 
+    @writes
     def create_field_template(
         self,
         name: str,
@@ -308,7 +972,7 @@ class DatabaseRepository:
         """Get field template by ID."""
         session = self.get_session()
         try:
-            return session.query(FieldTemplate).filter(FieldTemplate.id == template_id).first()
+            return session.get(FieldTemplate, template_id)
         finally:
             session.close()
 
@@ -320,6 +984,7 @@ class DatabaseRepository:
         finally:
             session.close()
 
+    @writes
     def update_field_template(
         self,
         template_id: str,
@@ -330,7 +995,7 @@ class DatabaseRepository:
         """Update and version field template."""
         session = self.get_session()
         try:
-            template = session.query(FieldTemplate).filter(FieldTemplate.id == template_id).first()
+            template = session.get(FieldTemplate, template_id)
             if template:
                 # Create new version
                 old_version = template.version
@@ -349,6 +1014,7 @@ class DatabaseRepository:
 
     # ==================== EXTRACTION RESULT OPERATIONS ====================
 
+    @writes
     def create_extraction(
         self,
         project_id: str,
@@ -377,6 +1043,8 @@ class DatabaseRepository:
                 extra_metadata=extra_metadata or {},
             )
             session.add(extraction)
+            session.flush()
+            self._record_change(session, project_id, 'extraction', extraction.id, 'insert')
             session.commit()
             session.refresh(extraction)
             return extraction
@@ -384,12 +1052,10 @@ class DatabaseRepository:
             session.close()
 
     def get_extraction(self, extraction_id: str) -> Optional[ExtractionResult]:
-        """Get extraction by ID."""
+        """Get extraction by ID, including its deferred raw text."""
         session = self.get_session()
         try:
-            return session.query(ExtractionResult).filter(
-                ExtractionResult.id == extraction_id
-            ).first()
+            return session.get(ExtractionResult, extraction_id, options=[undefer(ExtractionResult.raw_text)])
         finally:
             session.close()
 
@@ -413,6 +1079,329 @@ class DatabaseRepository:
         finally:
             session.close()
 
+    def get_extraction_project_id(self, extraction_id: str) -> Optional[str]:
+        """Project an extraction belongs to, without loading the extraction."""
+        session = self.get_session()
+        try:
+            return session.query(ExtractionResult.project_id).filter(
+                ExtractionResult.id == extraction_id
+            ).scalar()
+        finally:
+            session.close()
+
+    def count_extractions_by_project(self, project_id: str) -> int:
+        """Count extractions for project without loading them."""
+        session = self.get_session()
+        try:
+            return session.query(func.count(ExtractionResult.id)).filter(
+                ExtractionResult.project_id == project_id
+            ).scalar()
+        finally:
+            session.close()
+
+    def get_table_window(
+        self,
+        project_id: str,
+        field_names: Optional[List[str]] = None,
+        document_ids: Optional[List[str]] = None,
+        statuses: Optional[List[ExtractionStatus]] = None,
+        max_confidence: Optional[float] = None,
+        row_cursor: Optional[str] = None,
+        column_cursor: Optional[str] = None,
+        row_offset: int = 0,
+        column_offset: int = 0,
+        row_limit: int = 50,
+        column_limit: int = 20,
+    ) -> Dict[str, Any]:
+        """
+        Load one window of the comparison table.
+
+        Rows are field names in name order and columns are documents in upload
+        order. The filters select cells; with a cell filter (field names,
+        statuses or confidence), only rows and columns holding a matching cell
+        are returned. Every filter is a SQL predicate, so only the window's
+        cells are read.
+
+        Args:
+            row_cursor: Last field name of the previous window; overrides row_offset
+            column_cursor: Last document id of the previous window; overrides column_offset
+            max_confidence: Only cells with a confidence below this
+
+        Returns:
+            Dict with 'documents' (Document rows of the window), 'rows' (field
+            name and type pairs), 'extractions' (the window's cells),
+            'total_rows', 'total_columns', 'more_rows' and 'more_columns'.
+        """
+        session = self.get_session()
+        try:
+            cell_filters = [ExtractionResult.project_id == project_id]
+            if field_names:
+                cell_filters.append(ExtractionResult.field_name.in_(field_names))
+            if document_ids:
+                cell_filters.append(ExtractionResult.document_id.in_(document_ids))
+            if statuses:
+                cell_filters.append(ExtractionResult.status.in_(statuses))
+            if max_confidence is not None:
+                cell_filters.append(ExtractionResult.confidence_score < max_confidence)
+
+            document_filters = [Document.project_id == project_id]
+            if document_ids:
+                document_filters.append(Document.id.in_(document_ids))
+            if field_names or statuses or max_confidence is not None:
+                document_filters.append(Document.id.in_(
+                    session.query(ExtractionResult.document_id).filter(*cell_filters)
+                ))
+
+            total_rows = session.query(
+                func.count(func.distinct(ExtractionResult.field_name))
+            ).filter(*cell_filters).scalar()
+            total_columns = session.query(func.count(Document.id)).filter(*document_filters).scalar()
+
+            # Distinct field names come from an index alone; field types are
+            # taken from the window's cells below
+            row_query = session.query(ExtractionResult.field_name).filter(*cell_filters)
+            if row_cursor is not None:
+                row_query = row_query.filter(ExtractionResult.field_name > row_cursor)
+            row_query = row_query.group_by(ExtractionResult.field_name).order_by(ExtractionResult.field_name)
+            if row_cursor is None and row_offset:
+                row_query = row_query.offset(row_offset)
+            field_names_page = [row.field_name for row in row_query.limit(row_limit + 1).all()]
+
+            document_query = session.query(Document).filter(*document_filters)
+            if column_cursor is not None:
+                cursor = session.query(Document.created_at).filter(Document.id == column_cursor).first()
+                if cursor is not None:
+                    document_query = document_query.filter(or_(
+                        Document.created_at > cursor.created_at,
+                        and_(Document.created_at == cursor.created_at, Document.id > column_cursor),
+                    ))
+            document_query = document_query.order_by(Document.created_at, Document.id)
+            if column_cursor is None and column_offset:
+                document_query = document_query.offset(column_offset)
+            documents = document_query.limit(column_limit + 1).all()
+
+            more_rows, field_names_page = len(field_names_page) > row_limit, field_names_page[:row_limit]
+            more_columns, documents = len(documents) > column_limit, documents[:column_limit]
+
+            extractions = []
+            if field_names_page and documents:
+                extractions = session.query(ExtractionResult).options(load_only(
+                    ExtractionResult.id, ExtractionResult.document_id, ExtractionResult.field_name,
+                    ExtractionResult.field_type, ExtractionResult.extracted_value,
+                    ExtractionResult.normalized_value, ExtractionResult.confidence_score,
+                    ExtractionResult.status,
+                )).filter(
+                    *cell_filters,
+                    ExtractionResult.field_name.in_(field_names_page),
+                    ExtractionResult.document_id.in_([d.id for d in documents]),
+                ).all()
+
+            # Rows with no cell in the column window take their type from
+            # any extraction of the field, all in one query
+            field_types = {e.field_name: e.field_type for e in extractions}
+            missing = [field_name for field_name in field_names_page if field_name not in field_types]
+            if missing:
+                field_types.update(session.query(
+                    ExtractionResult.field_name, func.min(ExtractionResult.field_type),
+                ).filter(
+                    ExtractionResult.project_id == project_id,
+                    ExtractionResult.field_name.in_(missing),
+                ).group_by(ExtractionResult.field_name).all())
+            rows = [(field_name, field_types[field_name]) for field_name in field_names_page]
+
+            return {
+                'documents': documents,
+                'rows': rows,
+                'extractions': extractions,
+                'total_rows': total_rows,
+                'total_columns': total_columns,
+                'more_rows': more_rows,
+                'more_columns': more_columns,
+            }
+        finally:
+            session.close()
+
+    def iter_extraction_rows(
+        self,
+        project_id: str,
+        order_by: str = 'field',
+        batch_size: int = 1000,
+        with_citations: bool = False,
+    ) -> Iterator[Any]:
+        """
+        Stream a project's extractions with their document's filename and review state.
+
+        Rows are read from one cursor, batch_size at a time (a server-side
+        cursor where the driver has one), so memory does not grow with the
+        project. The session stays open until the iterator is exhausted or
+        closed.
+
+        Args:
+            order_by: 'field' for field name order, or 'document' for
+                document, then field name order
+            with_citations: Also read each batch's citations, on the same
+                connection as the cursor
+
+        Yields:
+            Lists of rows with the extraction's columns, filename and the
+            review's review_status, manual_value, reviewer_notes,
+            reviewed_by and reviewed_at; with_citations yields pairs of
+            such a list and its citations grouped by extraction id
+        """
+        ordering = {
+            'field': (ExtractionResult.field_name,),
+            'document': (ExtractionResult.document_id, ExtractionResult.field_name),
+        }[order_by]
+        statement = select(
+            ExtractionResult.id, ExtractionResult.document_id, Document.filename,
+            ExtractionResult.field_name, ExtractionResult.field_type,
+            ExtractionResult.extracted_value, ExtractionResult.normalized_value,
+            ExtractionResult.confidence_score, ExtractionResult.status,
+            ReviewState.status.label('review_status'), ReviewState.manual_value,
+            ReviewState.reviewer_notes, ReviewState.reviewed_by, ReviewState.reviewed_at,
+        ).join(
+            Document, Document.id == ExtractionResult.document_id
+        ).outerjoin(
+            ReviewState, ReviewState.extraction_id == ExtractionResult.id
+        ).where(
+            ExtractionResult.project_id == project_id
+        ).order_by(*ordering).execution_options(stream_results=True, yield_per=batch_size)
+
+        session = self.get_session()
+        try:
+            for partition in session.execute(statement).partitions():
+                if with_citations:
+                    yield partition, self._citations_for_extractions(session, [row.id for row in partition])
+                else:
+                    yield partition
+        finally:
+            session.close()
+
+    def iter_extraction_columns(
+        self, project_ids: List[str], batch_size: int = 10000
+    ) -> Iterator[Dict[str, tuple]]:
+        """
+        Stream the extractions of several projects with their review outcome, column by column.
+
+        Enum columns are read as their stored strings and each batch is
+        transposed into one tuple per column, so no object or dict is built
+        per row.
+
+        Yields:
+            Dicts mapping each column name to a tuple of that column's values
+        """
+        statement = select(
+            ExtractionResult.project_id, ExtractionResult.document_id, Document.filename,
+            ExtractionResult.id.label('extraction_id'), ExtractionResult.field_name,
+            type_coerce(ExtractionResult.field_type, String).label('field_type'),
+            ExtractionResult.extracted_value, ExtractionResult.normalized_value,
+            ExtractionResult.confidence_score,
+            type_coerce(ExtractionResult.status, String).label('status'),
+            ExtractionResult.created_at,
+            type_coerce(ReviewState.status, String).label('review_status'),
+            ReviewState.manual_value, ReviewState.reviewer_notes,
+            ReviewState.reviewed_by, ReviewState.reviewed_at,
+        ).join(
+            Document, Document.id == ExtractionResult.document_id
+        ).outerjoin(
+            ReviewState, ReviewState.extraction_id == ExtractionResult.id
+        ).where(
+            ExtractionResult.project_id.in_(project_ids)
+        ).order_by(
+            ExtractionResult.project_id, ExtractionResult.document_id, ExtractionResult.field_name
+        ).execution_options(stream_results=True, yield_per=batch_size)
+        yield from self._iter_columns(statement)
+
+    def iter_citation_columns(
+        self, project_ids: List[str], batch_size: int = 10000
+    ) -> Iterator[Dict[str, tuple]]:
+        """
+        Stream the citations of several projects' extractions, column by column.
+
+        Span-stored citation text is read in one pass per document and batch.
+
+        Yields:
+            Dicts mapping each column name to a tuple of that column's values
+        """
+        statement = select(
+            ExtractionResult.project_id, Citation.document_id, Citation.extraction_id,
+            ExtractionResult.field_name, Citation.citation_text,
+            Citation.start_offset, Citation.end_offset, Citation.page_number,
+            Citation.section_title, Citation.relevance_score,
+        ).join(
+            ExtractionResult, ExtractionResult.id == Citation.extraction_id
+        ).where(
+            ExtractionResult.project_id.in_(project_ids)
+        ).order_by(
+            Citation.document_id, Citation.extraction_id
+        ).execution_options(stream_results=True, yield_per=batch_size)
+
+        def resolve(session: Session, columns: Dict[str, tuple]) -> None:
+            texts = list(columns['citation_text'])
+            by_document: Dict[str, List[int]] = {}
+            for i, (document_id, text_, start, end) in enumerate(zip(
+                columns['document_id'], texts, columns['start_offset'], columns['end_offset']
+            )):
+                if not text_ and start is not None and end is not None:
+                    by_document.setdefault(document_id, []).append(i)
+            for document_id, positions in by_document.items():
+                spans = [(columns['start_offset'][i], columns['end_offset'][i]) for i in positions]
+                for i, span_text in zip(positions, self._read_document_spans(session, document_id, spans)):
+                    texts[i] = span_text
+            columns['citation_text'] = tuple(texts)
+
+        yield from self._iter_columns(statement, resolve)
+
+    def _iter_columns(self, statement, resolve=None) -> Iterator[Dict[str, tuple]]:
+        session = self.get_session()
+        try:
+            result = session.execute(statement)
+            names = list(result.keys())
+            for partition in result.partitions():
+                columns = dict(zip(names, zip(*partition)))
+                if resolve is not None:
+                    resolve(session, columns)
+                yield columns
+        finally:
+            session.close()
+
+    def list_extraction_field_names(self, project_id: str) -> List[str]:
+        """Distinct field names of a project's extractions."""
+        session = self.get_session()
+        try:
+            return [
+                name for (name,) in session.query(ExtractionResult.field_name).filter(
+                    ExtractionResult.project_id == project_id
+                ).distinct()
+            ]
+        finally:
+            session.close()
+
+    def get_value_lengths(self, project_id: str) -> Dict[str, Any]:
+        """
+        Longest field name and longest extracted value per document of a project.
+
+        Returns:
+            Dict with 'field_name', the longest field name's length, and
+            'values', the longest extracted value's length by document id
+        """
+        session = self.get_session()
+        try:
+            lengths = session.query(
+                ExtractionResult.document_id,
+                func.max(func.length(ExtractionResult.extracted_value)),
+                func.max(func.length(ExtractionResult.field_name)),
+            ).filter(
+                ExtractionResult.project_id == project_id
+            ).group_by(ExtractionResult.document_id).all()
+            return {
+                'field_name': max((name or 0 for _, _, name in lengths), default=0),
+                'values': {document_id: value or 0 for document_id, value, _ in lengths},
+            }
+        finally:
+            session.close()
+
+    @writes
     def update_extraction(
         self,
         extraction_id: str,
@@ -421,13 +1410,12 @@ class DatabaseRepository:
         """Update extraction."""
         session = self.get_session()
         try:
-            extraction = session.query(ExtractionResult).filter(
-                ExtractionResult.id == extraction_id
-            ).first()
+            extraction = session.get(ExtractionResult, extraction_id)
             if extraction:
                 for key, value in kwargs.items():
                     if hasattr(extraction, key):
                         setattr(extraction, key, value)
+                self._record_change(session, extraction.project_id, 'extraction', extraction.id, 'update')
                 session.commit()
                 session.refresh(extraction)
             return extraction
@@ -436,6 +1424,7 @@ class DatabaseRepository:
 
     # ==================== CITATION OPERATIONS ====================
 
+    @writes
     def create_citation(
         self,
         extraction_id: str,
@@ -445,11 +1434,18 @@ class DatabaseRepository:
         section_title: Optional[str] = None,
         relevance_score: float = 0.0,
         chunk_id: Optional[str] = None,
+        start_offset: Optional[int] = None,
+        end_offset: Optional[int] = None,
     ) -> Citation:
-        """Create citation."""
+        """
+        Create citation.
+
+        A citation with a chunk id and offsets is stored as a span of the
+        document text, without a copy of its text; reads resolve it.
+        """
         session = self.get_session()
         try:
-            citation = Citation(
+            citation = Citation(**self._citation_row(dict(
                 extraction_id=extraction_id,
                 document_id=document_id,
                 citation_text=citation_text,
@@ -457,26 +1453,92 @@ class DatabaseRepository:
                 section_title=section_title,
                 relevance_score=relevance_score,
                 chunk_id=chunk_id,
-            )
+                start_offset=start_offset,
+                end_offset=end_offset,
+            )))
             session.add(citation)
             session.commit()
             session.refresh(citation)
+            set_committed_value(citation, 'citation_text', citation_text)
             return citation
         finally:
             session.close()
 
+    @writes
+    def create_citations_bulk(self, citations_data: List[Dict[str, Any]]) -> int:
+        """Create multiple citations in one insert, stored as spans like create_citation."""
+        session = self.get_session()
+        try:
+            session.bulk_insert_mappings(Citation, [self._citation_row(c) for c in citations_data])
+            session.commit()
+            return len(citations_data)
+        except Exception as e:
+            logger.error(f"Error bulk creating citations: {str(e)}")
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    @staticmethod
+    def _citation_row(citation: Dict[str, Any]) -> Dict[str, Any]:
+        row = {
+            'extraction_id': citation['extraction_id'],
+            'document_id': citation['document_id'],
+            'chunk_id': citation.get('chunk_id'),
+            'citation_text': citation['citation_text'],
+            'start_offset': citation.get('start_offset'),
+            'end_offset': citation.get('end_offset'),
+            'page_number': citation.get('page_number'),
+            'section_title': citation.get('section_title'),
+            'relevance_score': citation.get('relevance_score', 0.0),
+        }
+        if row['chunk_id'] and row['start_offset'] is not None and row['end_offset'] is not None:
+            row['citation_text'] = ""
+        return row
+
     def get_citations_for_extraction(self, extraction_id: str) -> List[Citation]:
-        """Get all citations for extraction."""
+        """Get all citations for extraction, most relevant first."""
+        return self.get_citations_for_extractions([extraction_id]).get(extraction_id, [])
+
+    def get_citations_for_extractions(self, extraction_ids: List[str]) -> Dict[str, List[Citation]]:
+        """
+        Get citations for several extractions, most relevant first.
+
+        The text of span-stored citations is read in one batch per document.
+        """
         session = self.get_session()
         try:
-            return session.query(Citation).filter(
-                Citation.extraction_id == extraction_id
-            ).order_by(Citation.relevance_score.desc()).all()
+            return self._citations_for_extractions(session, extraction_ids)
         finally:
             session.close()
 
+    def _citations_for_extractions(
+        self, session: Session, extraction_ids: List[str]
+    ) -> Dict[str, List[Citation]]:
+        citations = session.query(Citation).filter(
+            Citation.extraction_id.in_(set(extraction_ids))
+        ).order_by(Citation.extraction_id, Citation.relevance_score.desc()).all()
+
+        by_document: Dict[str, List[Citation]] = {}
+        for citation in citations:
+            if not citation.citation_text and citation.start_offset is not None \
+                    and citation.end_offset is not None:
+                by_document.setdefault(citation.document_id, []).append(citation)
+        for document_id, spans in by_document.items():
+            texts = self._read_document_spans(
+                session, document_id, [(c.start_offset, c.end_offset) for c in spans]
+            )
+            for citation, citation_text in zip(spans, texts):
+                set_committed_value(citation, 'citation_text', citation_text)
+
+        grouped: Dict[str, List[Citation]] = {}
+        for citation in citations:
+            grouped.setdefault(citation.extraction_id, []).append(citation)
+        return grouped
+
     # ==================== REVIEW STATE OPERATIONS ====================
 
+    @writes
     def create_review_state(
         self,
         project_id: str,
@@ -493,6 +1555,8 @@ class DatabaseRepository:
                 status=ExtractionStatus.PENDING,
             )
             session.add(review)
+            session.flush()
+            self._record_change(session, project_id, 'review', review.id, 'insert')
             session.commit()
             session.refresh(review)
             return review
@@ -503,10 +1567,11 @@ class DatabaseRepository:
         """Get review state."""
         session = self.get_session()
         try:
-            return session.query(ReviewState).filter(ReviewState.id == review_id).first()
+            return session.get(ReviewState, review_id)
         finally:
             session.close()
 
+    @writes
     def update_review_state(
         self,
         review_id: str,
@@ -515,11 +1580,12 @@ class DatabaseRepository:
         """Update review state."""
         session = self.get_session()
         try:
-            review = session.query(ReviewState).filter(ReviewState.id == review_id).first()
+            review = session.get(ReviewState, review_id)
             if review:
                 for key, value in kwargs.items():
                     if hasattr(review, key):
                         setattr(review, key, value)
+                self._record_change(session, review.project_id, 'review', review.id, 'update')
                 session.commit()
                 session.refresh(review)
             return review
@@ -551,6 +1617,7 @@ class DatabaseRepository:
 
     # ==================== TASK OPERATIONS ====================
 
+    @writes
     def create_task(
         self,
         task_type: str,
@@ -575,10 +1642,11 @@ class DatabaseRepository:
         """Get task by ID."""
         session = self.get_session()
         try:
-            return session.query(Task).filter(Task.id == task_id).first()
+            return session.get(Task, task_id)
         finally:
             session.close()
 
+    @writes
     def update_task(
         self,
         task_id: str,
@@ -587,7 +1655,7 @@ class DatabaseRepository:
         """Update task."""
         session = self.get_session()
         try:
-            task = session.query(Task).filter(Task.id == task_id).first()
+            task = session.get(Task, task_id)
             if task:
                 for key, value in kwargs.items():
                     if hasattr(task, key):
@@ -600,6 +1668,7 @@ class DatabaseRepository:
 
     # ==================== EVALUATION OPERATIONS ====================
 
+    @writes
     def create_evaluation(
         self,
         project_id: str,
@@ -682,6 +1751,7 @@ class DatabaseRepository:
 
     # ==================== ANNOTATION OPERATIONS ====================
 
+    @writes
     def create_annotation(
         self,
         extraction_id: str,
@@ -697,12 +1767,22 @@ class DatabaseRepository:
                 annotated_by=annotated_by,
             )
             session.add(annotation)
+            session.flush()
+            self._record_annotation_change(session, annotation, 'insert')
             session.commit()
             session.refresh(annotation)
             return annotation
         finally:
             session.close()
 
+    def get_annotation(self, annotation_id: str) -> Optional[Annotation]:
+        """Get annotation by ID."""
+        session = self.get_session()
+        try:
+            return session.get(Annotation, annotation_id)
+        finally:
+            session.close()
+
     def list_annotations_for_extraction(self, extraction_id: str) -> List[Annotation]:
         """List annotations for a specific extraction."""
         session = self.get_session()
@@ -725,35 +1805,154 @@ class DatabaseRepository:
         finally:
             session.close()
 
+    @writes
     def update_annotation(self, annotation_id: str, comment_text: str) -> Optional[Annotation]:
         """Update an annotation comment."""
         session = self.get_session()
         try:
-            annotation = session.query(Annotation).filter(Annotation.id == annotation_id).first()
+            annotation = session.get(Annotation, annotation_id)
             if annotation:
                 annotation.comment_text = comment_text
                 annotation.updated_at = datetime.now(timezone.utc)
+                self._record_annotation_change(session, annotation, 'update')
                 session.commit()
                 session.refresh(annotation)
             return annotation
         finally:
             session.close()
 
+    @writes
     def delete_annotation(self, annotation_id: str) -> bool:
         """Delete an annotation."""
         session = self.get_session()
         try:
-            annotation = session.query(Annotation).filter(Annotation.id == annotation_id).first()
+            annotation = session.get(Annotation, annotation_id)
             if annotation:
                 session.delete(annotation)
+                self._record_annotation_change(session, annotation, 'delete')
                 session.commit()
                 return True
             return False
         finally:
             session.close()
 
+    # ==================== CHANGE LOG OPERATIONS ====================
+
+    # Change-log entity name -> model
+    CHANGE_ENTITIES = {
+        'document': Document,
+        'extraction': ExtractionResult,
+        'review': ReviewState,
+        'annotation': Annotation,
+    }
+
+    def get_changes(self, project_id: str, since: int) -> Optional[Dict[str, Any]]:
+        """
+        Rows of a project changed after a revision.
+
+        Reads the change log after since, and then the current state of each
+        changed row, so the cost follows the number of changes, not the size
+        of the project.
+
+        Returns:
+            None if the project does not exist. Otherwise a dict with the
+            current 'revision' and 'full_refresh', True when since is older
+            than the log reaches back and the caller must reload everything.
+            Unless full_refresh, it has one entry per entity name in
+            CHANGE_ENTITIES. Each entry maps 'upserted' to the current rows
+            inserted or updated since, and 'deleted' to the ids of rows
+            deleted since.
+        """
+        session = self.get_session()
+        try:
+            project = session.query(Project.revision, Project.change_log_floor).filter(
+                Project.id == project_id
+            ).first()
+            if project is None:
+                return None
+            revision = project.revision or 0
+            if since < (project.change_log_floor or 0) or since > revision:
+                return {'revision': revision, 'full_refresh': True}
+
+            # Latest operation per row; entries are appended in order
+            latest: Dict[str, Dict[str, str]] = {entity: {} for entity in self.CHANGE_ENTITIES}
+            entries = session.query(
+                ChangeLogEntry.entity, ChangeLogEntry.entity_id, ChangeLogEntry.operation
+            ).filter(
+                ChangeLogEntry.project_id == project_id,
+                ChangeLogEntry.revision > since,
+            ).order_by(ChangeLogEntry.id)
+            for entity, entity_id, operation in entries:
+                if entity in latest:
+                    latest[entity][entity_id] = operation
+
+            changes: Dict[str, Any] = {'revision': revision, 'full_refresh': False}
+            for entity, model in self.CHANGE_ENTITIES.items():
+                live = [i for i, operation in latest[entity].items() if operation != 'delete']
+                rows = session.query(model).filter(model.id.in_(live)).all() if live else []
+                found = {row.id for row in rows}
+                changes[entity] = {
+                    'upserted': rows,
+                    'deleted': [i for i in latest[entity] if i not in found],
+                }
+            return changes
+        finally:
+            session.close()
+
+    @writes
+    def compact_change_log(
+        self,
+        project_id: Optional[str] = None,
+        max_age_seconds: float = 7 * 24 * 3600,
+    ) -> int:
+        """
+        Compact the change log.
+
+        Only the latest entry of each row is kept, since the feed reports a
+        changed row's current state however often it changed. Entries older
+        than max_age_seconds are dropped and the project's change_log_floor
+        moves past them, so clients that far behind reload in full.
+
+        Args:
+            project_id: Compact one project's log; all projects if None
+
+        Returns:
+            Number of entries deleted
+        """
+        session = self.get_session()
+        try:
+            scope = [ChangeLogEntry.project_id == project_id] if project_id else []
+            latest = session.query(func.max(ChangeLogEntry.id)).filter(*scope).group_by(
+                ChangeLogEntry.project_id, ChangeLogEntry.entity, ChangeLogEntry.entity_id
+            )
+            deleted = session.query(ChangeLogEntry).filter(
+                *scope, ChangeLogEntry.id.notin_(latest.scalar_subquery())
+            ).delete(synchronize_session=False)
+
+            cutoff = datetime.now(timezone.utc) - timedelta(seconds=max_age_seconds)
+            expired = session.query(
+                ChangeLogEntry.project_id, func.max(ChangeLogEntry.revision)
+            ).filter(*scope, ChangeLogEntry.created_at < cutoff).group_by(ChangeLogEntry.project_id).all()
+            for expired_project_id, floor in expired:
+                deleted += session.query(ChangeLogEntry).filter(
+                    ChangeLogEntry.project_id == expired_project_id,
+                    ChangeLogEntry.revision <= floor,
+                ).delete(synchronize_session=False)
+                session.execute(
+                    update(Project)
+                    .where(Project.id == expired_project_id)
+                    .where(func.coalesce(Project.change_log_floor, 0) < floor)
+                    .values(change_log_floor=floor)
+                    .execution_options(synchronize_session=False)
+                )
+            session.commit()
+            return deleted
+        finally:
+            session.close()
+
     # ==================== BULK / RE-EXTRACTION OPERATIONS ====================
 
+    @writes
     def delete_extractions_for_project(self, project_id: str) -> int:
         """Delete all extractions, citations, review states for a project (for re-extraction)."""
         session = self.get_session()
@@ -783,6 +1982,18 @@ class DatabaseRepository:
                 ExtractionResult.project_id == project_id
             ).delete(synchronize_session=False)
 
+            # Every row was replaced, so the log restarts here instead of
+            # listing each deletion
+            self._touch_project(session, project_id)
+            session.query(ChangeLogEntry).filter(
+                ChangeLogEntry.project_id == project_id
+            ).delete(synchronize_session=False)
+            session.execute(
+                update(Project)
+                .where(Project.id == project_id)
+                .values(change_log_floor=Project.revision)
+                .execution_options(synchronize_session=False)
+            )
             session.commit()
             return count
         except Exception as e:
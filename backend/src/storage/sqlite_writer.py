@@ -0,0 +1,147 @@
+"""
+Single-writer queue for SQLite.
+
+SQLite allows one writer at a time. Instead of letting request and worker
+threads race for the write lock and retry with sleeps, every write is queued
+to one writer thread. The thread takes whatever writes are queued, runs them
+in a single transaction and commits once (a group commit), so a burst of
+small writes costs one fsync instead of one each. Callers get a Future per
+write.
+
+A unit of work opened on another thread takes the writer's turn instead: it
+waits until the writes queued before it are committed, then runs while the
+writer thread waits for it. Writes from this process therefore never
+compete for the lock; only other processes sharing the database can.
+"""
+
+import logging
+import queue
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_Write = Tuple[Future, Callable[..., Any], tuple, dict]
+
+
+class SQLiteWriter:
+    """Runs queued repository writes on one thread with group commits."""
+
+    def __init__(self, repo, max_batch: int = 64):
+        """
+        Args:
+            repo: DatabaseRepository whose unit_of_work wraps each group
+            max_batch: Most writes merged into one commit
+        """
+        self.repo = repo
+        self.max_batch = max_batch
+        self._queue: "queue.Queue[Optional[_Write]]" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="sqlite-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, func: Callable[..., Any], *args, **kwargs) -> Future:
+        """Queue func(*args, **kwargs) and return a Future for its result."""
+        if not self._thread.is_alive():
+            raise RuntimeError("SQLite writer is closed")
+        future: Future = Future()
+        self._queue.put((future, func, args, kwargs))
+        return future
+
+    @property
+    def on_writer_thread(self) -> bool:
+        return threading.current_thread() is self._thread
+
+    @contextmanager
+    def turn(self) -> Iterator[None]:
+        """
+        Hold the writer's turn for the duration of the block.
+
+        Returns once the writes queued before are committed; the writer
+        thread then waits, outside any transaction, until the block exits.
+        """
+        started = threading.Event()
+        finished = threading.Event()
+        future = self.submit(_hold_turn, started, finished)
+        started.wait()
+        try:
+            yield
+        finally:
+            finished.set()
+            future.result()
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Finish queued writes and stop the writer thread."""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        pending: Optional[_Write] = None
+        while True:
+            item = pending if pending is not None else self._queue.get()
+            pending = None
+            if item is None:
+                return
+            if item[1] is _hold_turn:
+                self._hold(item)
+                continue
+            batch = [item]
+            stop = False
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                if item[1] is _hold_turn:
+                    # Writes queued before a turn are committed before it
+                    pending = item
+                    break
+                batch.append(item)
+            self._commit(batch)
+            if stop:
+                return
+
+    def _hold(self, item: _Write) -> None:
+        future, func, args, kwargs = item
+        if future.set_running_or_notify_cancel():
+            future.set_result(func(*args, **kwargs))
+
+    def _commit(self, batch: List[_Write]) -> None:
+        batch = [write for write in batch if write[0].set_running_or_notify_cancel()]
+        if not batch:
+            return
+        try:
+            results = self._run_in_transaction(batch)
+        except Exception as e:
+            if len(batch) == 1:
+                batch[0][0].set_exception(e)
+                return
+            # One write failed and took the group down with it; nothing was
+            # committed, so run each write in its own transaction to isolate it
+            logger.warning(f"Group commit of {len(batch)} writes failed, retrying them one by one")
+            for write in batch:
+                self._run_alone(write)
+            return
+        for (future, _, _, _), result in zip(batch, results):
+            future.set_result(result)
+
+    def _run_alone(self, write: _Write) -> None:
+        future = write[0]
+        try:
+            future.set_result(self._run_in_transaction([write])[0])
+        except Exception as e:
+            future.set_exception(e)
+
+    def _run_in_transaction(self, batch: List[_Write]) -> List[Any]:
+        with self.repo.unit_of_work():
+            return [func(*args, **kwargs) for _, func, args, kwargs in batch]
+
+
+def _hold_turn(started: threading.Event, finished: threading.Event) -> None:
+    started.set()
+    finished.wait()
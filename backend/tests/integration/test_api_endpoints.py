@@ -10,6 +10,7 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
 
 # Override DATABASE_URL before importing app
 os.environ["DATABASE_URL"] = "sqlite:///./test_legal_review.db"
+os.environ["BLOB_STORE_DIR"] = tempfile.mkdtemp(prefix="test_blobs_")
 
 from fastapi.testclient import TestClient
 from app import app
@@ -161,6 +162,43 @@ class TestComparisonTableEndpoints:
         assert resp.status_code == 200
         assert resp.json()["row_count"] == 0
 
+    def test_table_window(self, client):
+        import app as app_module
+        repo = app_module.repo
+        project_id = client.post("/projects", json={"name": "Window Test"}).json()["id"]
+        docs = [repo.create_document(project_id, f"d{i}.pdf", "pdf", "/tmp/d.pdf", 1, "C") for i in range(3)]
+        for i, doc in enumerate(docs):
+            for field in ("term", "parties"):
+                repo.create_extraction(project_id, doc.id, field, "TEXT", f"{field} {i}",
+                                       confidence_score=0.3 * i)
+
+        resp = client.get(f"/projects/{project_id}/table/window", params={"rows": 1, "columns": 2})
+        assert resp.status_code == 200
+        window = resp.json()
+        assert (window["total_rows"], window["total_columns"]) == (2, 3)
+        assert [r["field_name"] for r in window["rows"]] == ["Parties"]
+        assert [d["filename"] for d in window["documents"]] == ["d0.pdf", "d1.pdf"]
+        assert window["rows"][0]["document_results"][docs[1].id]["extracted_value"] == "parties 1"
+
+        resp = client.get(f"/projects/{project_id}/table/window", params={
+            "row_cursor": window["next_row_cursor"],
+            "column_cursor": window["next_column_cursor"],
+        })
+        window = resp.json()
+        assert [r["field_key"] for r in window["rows"]] == ["term"]
+        assert [d["filename"] for d in window["documents"]] == ["d2.pdf"]
+        assert window["next_row_cursor"] is None and window["next_column_cursor"] is None
+
+        resp = client.get(f"/projects/{project_id}/table/window", params={
+            "max_confidence": 0.5, "status": "EXTRACTED", "field": "term",
+        })
+        window = resp.json()
+        assert [d["filename"] for d in window["documents"]] == ["d0.pdf", "d1.pdf"]
+        assert len(window["rows"][0]["document_results"]) == 2
+
+        resp = client.get(f"/projects/{project_id}/table/window", params={"status": "UNKNOWN"})
+        assert resp.status_code == 400
+
     def test_export_csv(self, client):
         project_resp = client.post("/projects", json={"name": "CSV Test"})
         project_id = project_resp.json()["id"]
@@ -168,6 +206,44 @@ class TestComparisonTableEndpoints:
         assert resp.status_code == 200
         assert resp.json()["format"] == "csv"
 
+    def test_stream_csv(self, client):
+        import csv
+        import app as app_module
+        project_id = client.post("/projects", json={"name": "Stream Test"}).json()["id"]
+        docs = [app_module.repo.create_document(project_id, f"d{i}.pdf", "pdf", "/tmp/d.pdf", 1, "C") for i in range(2)]
+        app_module.repo.create_extraction(project_id, docs[0].id, "term", "TEXT", "5 years")
+        app_module.repo.create_extraction(project_id, docs[1].id, "parties", "TEXT", "A and B")
+
+        resp = client.get(f"/projects/{project_id}/export/csv")
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("text/csv")
+        assert "attachment" in resp.headers["content-disposition"]
+        assert list(csv.reader(resp.text.splitlines())) == [
+            ["Field Name", "Field Type", "d0.pdf", "d1.pdf"],
+            ["Parties", "TEXT", "N/A", "A and B"],
+            ["Term", "TEXT", "5 years", "N/A"],
+        ]
+
+    def test_stream_jsonl(self, client):
+        import json
+        import app as app_module
+        project_id = client.post("/projects", json={"name": "Stream Test"}).json()["id"]
+        doc = app_module.repo.create_document(project_id, "d.pdf", "pdf", "/tmp/d.pdf", 1, "C")
+        extraction = app_module.repo.create_extraction(project_id, doc.id, "term", "TEXT", "5 years")
+        app_module.repo.create_review_state(project_id, extraction.id, "5 years")
+        app_module.repo.create_citation(extraction.id, doc.id, "for five years", page_number=2)
+
+        resp = client.get(f"/projects/{project_id}/export/jsonl")
+        assert resp.status_code == 200
+        lines = [json.loads(line) for line in resp.text.splitlines()]
+        assert len(lines) == 1
+        assert lines[0]["filename"] == "d.pdf" and lines[0]["extracted_value"] == "5 years"
+        assert lines[0]["review"]["status"] == "PENDING"
+        assert lines[0]["citations"][0]["citation_text"] == "for five years"
+
+    def test_stream_unknown_project(self, client):
+        assert client.get("/projects/nonexistent/export/csv").status_code == 404
+
     def test_export_excel(self, client):
         project_resp = client.post("/projects", json={"name": "Excel Test"})
         project_id = project_resp.json()["id"]
@@ -176,6 +252,68 @@ class TestComparisonTableEndpoints:
         assert resp.json()["format"] == "xlsx"
 
 
+class TestColumnarExport:
+    def test_projects_as_parquet_and_arrow(self, client):
+        import io
+        pa = pytest.importorskip("pyarrow")
+        import pyarrow.parquet as pq
+        import app as app_module
+        project_ids = [client.post("/projects", json={"name": f"P{i}"}).json()["id"] for i in range(2)]
+        for project_id in project_ids:
+            doc = app_module.repo.create_document(project_id, "d.pdf", "pdf", "/tmp/d.pdf", 1, "C")
+            extraction = app_module.repo.create_extraction(project_id, doc.id, "term", "TEXT", "5 years")
+            app_module.repo.create_review_state(project_id, extraction.id, "5 years")
+            app_module.repo.create_citation(extraction.id, doc.id, "for five years", page_number=2)
+
+        resp = client.get("/exports/columnar", params={"project_id": project_ids})
+        assert resp.status_code == 200
+        table = pq.read_table(io.BytesIO(resp.content))
+        assert sorted(table.column("project_id").to_pylist()) == sorted(project_ids)
+        assert pa.types.is_dictionary(table.schema.field("field_name").type)
+        assert table.column("review_status").to_pylist() == ["PENDING", "PENDING"]
+
+        resp = client.get("/exports/columnar", params={
+            "project_id": project_ids[0], "table": "citations", "format": "arrow",
+        })
+        table = pa.ipc.open_stream(resp.content).read_all()
+        assert table.column("citation_text").to_pylist() == ["for five years"]
+        assert table.column("field_name").to_pylist() == ["term"]
+
+    def test_unknown_format(self, client):
+        pytest.importorskip("pyarrow")
+        resp = client.get("/exports/columnar", params={"project_id": "p", "format": "orc"})
+        assert resp.status_code == 400
+
+
+class TestExcelExportJob:
+    def test_export_job_writes_downloadable_file(self, client, monkeypatch, tmp_path):
+        import io
+        import openpyxl
+        import app as app_module
+        monkeypatch.setattr(app_module, "EXPORT_DIR", str(tmp_path))
+        project_id = client.post("/projects", json={"name": "Job Test"}).json()["id"]
+        doc = app_module.repo.create_document(project_id, "d.pdf", "pdf", "/tmp/d.pdf", 1, "C")
+        app_module.repo.create_extraction(project_id, doc.id, "term", "TEXT", "5 years", confidence_score=0.9)
+
+        task_id = client.post(f"/projects/{project_id}/exports/xlsx").json()["task_id"]
+        task = client.get(f"/tasks/{task_id}").json()
+        assert task["status"] == "COMPLETED"
+        assert task["result"]["download_url"] == f"/exports/{task_id}/download"
+
+        resp = client.get(task["result"]["download_url"])
+        assert resp.status_code == 200
+        ws = openpyxl.load_workbook(io.BytesIO(resp.content)).active
+        assert [c.value for c in ws[1]] == ["Field Name", "Field Type", "d.pdf (Value)", "d.pdf (Confidence)"]
+        assert [c.value for c in ws[2]] == ["Term", "TEXT", "5 years", "90%"]
+        assert ws["D2"].fill.start_color.rgb.endswith("C6EFCE")
+
+    def test_download_unknown_export(self, client):
+        assert client.get("/exports/nonexistent/download").status_code == 404
+
+    def test_export_unknown_project(self, client):
+        assert client.post("/projects/nonexistent/exports/xlsx").status_code == 404
+
+
 class TestDiffEndpoint:
     def test_get_diff_empty(self, client):
         project_resp = client.post("/projects", json={"name": "Diff Test"})
@@ -194,6 +332,13 @@ class TestAnnotationEndpoints:
         assert resp.json()["total"] == 0
 
 
+class TestCitationEndpoint:
+    def test_list_citations_empty(self, client):
+        resp = client.get("/extractions/nonexistent/citations")
+        assert resp.status_code == 200
+        assert resp.json() == {"citations": [], "total": 0}
+
+
 class TestReviewEndpoints:
     def test_get_pending_reviews_empty(self, client):
         project_resp = client.post("/projects", json={"name": "Review Test"})
@@ -218,7 +363,110 @@ class TestEvaluationEndpoints:
         assert resp.json()["total"] == 0
 
 
+class TestConditionalGet:
+    VIEWS = ["table", "diff", "extractions", "annotations", "reviews/pending"]
+
+    def test_not_modified_until_project_changes(self, client):
+        import app as app_module
+        project_id = client.post("/projects", json={"name": "ETag Test"}).json()["id"]
+
+        for view in self.VIEWS:
+            resp = client.get(f"/projects/{project_id}/{view}")
+            assert resp.status_code == 200
+            etag = resp.headers["etag"]
+            resp = client.get(f"/projects/{project_id}/{view}", headers={"If-None-Match": etag})
+            assert resp.status_code == 304, view
+            assert resp.headers["etag"] == etag
+            assert resp.content == b""
+
+        doc = app_module.repo.create_document(project_id, "d.pdf", "pdf", "/tmp/d.pdf", 1, "C")
+        extraction = app_module.repo.create_extraction(project_id, doc.id, "term", "TEXT", "5 years")
+        for view in self.VIEWS:
+            resp = client.get(f"/projects/{project_id}/{view}", headers={"If-None-Match": etag})
+            assert resp.status_code == 200, view
+        assert client.get(f"/projects/{project_id}/extractions").json()["total"] == 1
+
+        # Annotations bump the revision too
+        etag = client.get(f"/projects/{project_id}/annotations").headers["etag"]
+        client.post("/annotations", json={
+            "extraction_id": extraction.id, "comment_text": "Check", "annotated_by": "qa",
+        })
+        resp = client.get(f"/projects/{project_id}/annotations", headers={"If-None-Match": etag})
+        assert resp.status_code == 200
+        assert resp.json()["total"] == 1
+
+    def test_etag_list_and_wildcard(self, client):
+        project_id = client.post("/projects", json={"name": "ETag Test"}).json()["id"]
+        etag = client.get(f"/projects/{project_id}/table").headers["etag"]
+        for header in (f'"stale", {etag}', etag.replace('W/', ''), '*'):
+            resp = client.get(f"/projects/{project_id}/table", headers={"If-None-Match": header})
+            assert resp.status_code == 304, header
+
+    def test_unknown_project_has_no_etag(self, client):
+        resp = client.get("/projects/nonexistent/extractions")
+        assert resp.status_code == 200
+        assert "etag" not in resp.headers
+
+
+class TestChangeFeed:
+    def test_changes_since_revision(self, client):
+        import app as app_module
+        project_id = client.post("/projects", json={"name": "Feed Test"}).json()["id"]
+        doc = app_module.repo.create_document(project_id, "d.pdf", "pdf", "/tmp/d.pdf", 1, "C")
+        extraction = app_module.repo.create_extraction(project_id, doc.id, "term", "TEXT", "5 years")
+        app_module.repo.create_review_state(project_id, extraction.id, "5 years")
+
+        feed = client.get(f"/projects/{project_id}/changes", params={"since": 0}).json()
+        assert feed["revision"] == 3 and feed["full_refresh"] is False
+        assert [e["id"] for e in feed["extractions"]["upserted"]] == [extraction.id]
+        assert feed["documents"]["upserted"][0]["filename"] == "d.pdf"
+
+        client.put(f"/extractions/{extraction.id}/review", json={"status": "CONFIRMED"})
+        feed = client.get(f"/projects/{project_id}/changes", params={"since": feed["revision"]}).json()
+        assert feed["extractions"]["upserted"][0]["status"] == "CONFIRMED"
+        assert feed["reviews"]["upserted"][0]["status"] == "CONFIRMED"
+        assert feed["documents"] == {"upserted": [], "deleted": []}
+
+    def test_unknown_project(self, client):
+        resp = client.get("/projects/nonexistent/changes", params={"since": 0})
+        assert resp.status_code == 404
+
+
 class TestTaskEndpoint:
     def test_get_nonexistent_task(self, client):
         resp = client.get("/tasks/nonexistent")
         assert resp.status_code in (400, 404)
+
+
+class TestEventLoopNotBlocked:
+    def test_health_responds_during_slow_export(self, monkeypatch):
+        import asyncio
+        import time
+        import httpx
+        import app as app_module
+
+        def slow_table(project_id):
+            time.sleep(0.5)
+            return {'documents': [], 'rows': []}
+
+        monkeypatch.setattr(app_module.comparison_service, 'generate_comparison_table', slow_table)
+
+        async def run():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+                finished = []
+
+                async def request(name, method, url):
+                    response = await ac.request(method, url)
+                    finished.append(name)
+                    return response
+
+                export = asyncio.create_task(request('export', 'POST', "/projects/any/table/export-csv"))
+                await asyncio.sleep(0.05)
+                health = await request('health', 'GET', "/health")
+                return (await export), health, finished
+
+        export, health, finished = asyncio.run(run())
+        assert export.status_code == 200
+        assert health.status_code == 200
+        assert finished == ['health', 'export']
@@ -13,7 +13,9 @@ from src.services.service_orchestrator import (
     ProjectService, DocumentService, ExtractionService,
     ReviewService, ComparisonService, EvaluationService,
     TaskService, DiffService, AnnotationService, ReExtractionService,
+    ExportService,
 )
+from src.services.table_snapshot import TableSnapshotStore
 from src.models.schema import ExtractionStatus, DocumentStatus
 
 
@@ -87,6 +89,145 @@ class TestDocumentIngestion:
             finally:
                 os.unlink(f.name)
 
+    def test_ingest_streams_chunks_in_batches(self, repo):
+        ds = DocumentService(repo, chunk_batch_size=2)
+        project = repo.create_project("Test")
+
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False) as f:
+            for i in range(400):
+                f.write(f"Clause {i} of this agreement binds both parties.\n\n")
+            f.flush()
+            try:
+                result = ds.ingest_document(project.id, "long.txt", f.name)
+                assert result['status'] == 'INDEXED'
+                assert result['chunk_count'] > 2
+                chunks = repo.get_document_chunks(result['id'])
+                assert [c.chunk_index for c in chunks] == list(range(result['chunk_count']))
+                doc = repo.get_document(result['id'])
+                assert "Clause 399" in repo.get_document_text(doc.id)
+                assert doc.parsed_metadata['word_count'] == 400 * 8
+            finally:
+                os.unlink(f.name)
+
+    def test_structure_chunking_persists_section_tree(self, repo):
+        ds = DocumentService(repo, chunking_mode='structure')
+        project = repo.create_project("Test")
+
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False) as f:
+            f.write("SUPPLY AGREEMENT\n")
+            for i in range(1, 6):
+                f.write(f"{i}. Clause {i}. The supplier shall perform obligation {i} on time.\n")
+                f.write(f"(a) Sub-clause {i}a applies to every delivery.\n")
+            f.flush()
+            try:
+                result = ds.ingest_document(project.id, "supply.txt", f.name)
+                sections = repo.get_document_sections(result['id'])
+                assert [s['number'] for s in sections][:2] == ['1', '(a)']
+                assert sections[1]['parent'] == sections[0]['index']
+                chunks = repo.get_document_chunks(result['id'])
+                assert [c.section_title for c in chunks[1:]] == [f"{i} Clause {i}" for i in range(1, 6)]
+            finally:
+                os.unlink(f.name)
+
+        with pytest.raises(ValueError):
+            DocumentService(repo, chunking_mode='pages')
+
+    def test_unit_texts_joined_once(self):
+        parts = ["First unit", "Second unit"]
+        text = DocumentService._join_units(parts)
+        assert parts == [text]
+        assert DocumentService._join_units(parts) is text
+
+    def test_ingest_with_blob_store(self, sample_txt_file, tmp_path):
+        blob_repo = DatabaseRepository("sqlite:///", blob_dir=str(tmp_path / "blobs"))
+        inline_repo = DatabaseRepository("sqlite:///")
+        results = []
+        for r in (blob_repo, inline_repo):
+            project = r.create_project("Test")
+            result = DocumentService(r).ingest_document(project.id, "supply.txt", sample_txt_file)
+            results.append((r.get_document_text(result['id']),
+                            [c.text for c in r.get_document_chunks(result['id'])]))
+        assert results[0] == results[1]
+        assert len(list(blob_repo.blobs.keys())) == 1
+
+        # A second upload of the same bytes reuses the cached parse and blob
+        project = blob_repo.create_project("Copy")
+        copy = DocumentService(blob_repo).ingest_document(project.id, "copy.txt", sample_txt_file)
+        assert copy['deduplicated'] is True
+        assert [c.text for c in blob_repo.get_document_chunks(copy['id'])] == results[0][1]
+
+    def test_duplicate_upload_reuses_parse_cache(self, services, sample_txt_file):
+        repo = services['repo']
+        ds = services['document']
+        first_project = repo.create_project("First")
+        second_project = repo.create_project("Second")
+
+        first = ds.ingest_document(first_project.id, "supply.txt", sample_txt_file)
+        second = ds.ingest_document(second_project.id, "copy.txt", sample_txt_file)
+        assert 'deduplicated' not in first
+        assert second['deduplicated'] is True
+        assert second['chunk_count'] == first['chunk_count']
+
+        first_doc = repo.get_document(first['id'])
+        second_doc = repo.get_document(second['id'])
+        assert first_doc.content_hash == second_doc.content_hash
+        from src.models.schema import Document
+        session = repo.get_session()
+        try:
+            # Both share the cached text rather than storing their own
+            assert session.query(Document.content_text).filter(Document.id == second_doc.id).scalar() == ""
+        finally:
+            session.close()
+        assert repo.get_document_text(second_doc.id) == repo.get_document_text(first_doc.id)
+        assert second_doc.content_text == first_doc.content_text == repo.get_document_text(first_doc.id) != ""
+        assert [(c.text, c.token_count) for c in repo.get_document_chunks(second_doc.id)] == \
+            [(c.text, c.token_count) for c in repo.get_document_chunks(first_doc.id)]
+        assert all(c.token_count > 0 for c in repo.get_document_chunks(first_doc.id))
+        clause_index = repo.get_chunk_clauses(first_doc.id)
+        assert {'governing_law', 'dispute_resolution'} <= set(clause_index)
+        assert repo.get_chunk_clauses(second_doc.id) == clause_index
+        assert repo.get_parsed_content(first_doc.content_hash).ref_count == 2
+
+        repo.delete_project(first_project.id)
+        assert repo.get_parsed_content(first_doc.content_hash).ref_count == 1
+        repo.delete_project(second_project.id)
+        assert repo.get_parsed_content(first_doc.content_hash) is None
+
+    def test_ingest_parse_error_marks_document(self, services):
+        ds = services['document']
+        project = services['project'].create_project("Test")
+
+        with tempfile.NamedTemporaryFile(mode='wb', suffix='.pdf', delete=False) as f:
+            f.write(b"not a pdf")
+            f.flush()
+            try:
+                result = ds.ingest_document(project['id'], "broken.pdf", f.name)
+                assert result['status'] == 'ERROR'
+                assert result['chunk_count'] == 0
+            finally:
+                os.unlink(f.name)
+
+    def test_ingest_failure_after_parsing_marks_document(self, repo, monkeypatch):
+        ds = DocumentService(repo, chunk_batch_size=1)
+        project = repo.create_project("Test")
+
+        def fail(*args, **kwargs):
+            raise RuntimeError("disk full")
+        monkeypatch.setattr(repo, "save_parsed_content", fail)
+
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False) as f:
+            f.write("The governing law shall be the State of Delaware. " * 40)
+            f.flush()
+            try:
+                with pytest.raises(RuntimeError):
+                    ds.ingest_document(project.id, "agreement.txt", f.name)
+            finally:
+                os.unlink(f.name)
+
+        document = repo.list_project_documents(project.id)[0]
+        assert document.status == DocumentStatus.ERROR
+        assert repo.get_document_chunks(document.id) == []
+
     def test_ingest_html_document(self, services):
         ps = services['project']
         ds = services['document']
@@ -110,6 +251,56 @@ class TestDocumentIngestion:
             ds.ingest_document(project['id'], "data.xlsx", "/tmp/fake.xlsx")
 
 
+class TestExtractionCitations:
+    """Tests citations stored as chunk spans."""
+
+    def test_citations_reference_chunk_spans(self, services, sample_txt_file, monkeypatch):
+        from src.models.schema import Citation
+        for key in ("GROQ_API_KEY", "GOOGLE_API_KEY", "GEMINI_API_KEY"):
+            monkeypatch.delenv(key, raising=False)
+        repo = services['repo']
+        project = repo.create_project("Citations")
+        document = services['document'].ingest_document(project.id, "supply.txt", sample_txt_file)
+        fields = [
+            {'name': 'governing_law', 'display_name': 'Governing Law', 'field_type': 'TEXT'},
+            {'name': 'effective_date', 'display_name': 'Effective Date', 'field_type': 'DATE'},
+        ]
+        stored = ExtractionService(repo).extract_fields_for_document(project.id, document['id'], fields)
+
+        chunk_ids = {c.id for c in repo.get_document_chunks(document['id'])}
+        text = repo.get_document_text(document['id'])
+        citations = repo.get_citations_for_extractions([r['id'] for r in stored])
+        cited = [c for group in citations.values() for c in group]
+        assert cited
+        for citation in cited:
+            assert citation.chunk_id in chunk_ids
+            assert citation.citation_text == text[citation.start_offset:citation.end_offset]
+            assert 0 < len(citation.citation_text) <= 500
+
+        session = repo.get_session()
+        try:
+            assert {t for (t,) in session.query(Citation.citation_text)} == {""}
+        finally:
+            session.close()
+
+        assert repo.delete_project(project.id)
+
+
+    def test_document_text_read_once_per_extraction(self, sample_txt_file, tmp_path, monkeypatch):
+        for key in ("GROQ_API_KEY", "GOOGLE_API_KEY", "GEMINI_API_KEY"):
+            monkeypatch.delenv(key, raising=False)
+        repo = DatabaseRepository("sqlite:///", blob_dir=str(tmp_path / "blobs"))
+        project = repo.create_project("Test")
+        document = DocumentService(repo).ingest_document(project.id, "supply.txt", sample_txt_file)
+
+        reads = []
+        get = repo.blobs.get
+        monkeypatch.setattr(repo.blobs, "get", lambda key: reads.append(key) or get(key))
+        fields = [{'name': 'governing_law', 'display_name': 'Governing Law', 'field_type': 'TEXT'}]
+        ExtractionService(repo).extract_fields_for_document(project.id, document['id'], fields)
+        assert len(reads) == 1
+
+
 class TestReviewWorkflow:
     """Tests review approve/reject/edit workflow."""
 
@@ -188,6 +379,107 @@ class TestComparisonTable:
         assert table['row_count'] == 0
 
 
+class TestTableSnapshot:
+    """Tests the materialized comparison table."""
+
+    @pytest.fixture
+    def snapshot_services(self, repo):
+        snapshots = TableSnapshotStore(repo)
+        return {
+            'snapshots': snapshots,
+            'comparison': ComparisonService(repo, snapshots),
+            'review': ReviewService(repo, snapshots),
+            'diff': DiffService(repo, snapshots),
+        }
+
+    @pytest.fixture
+    def project(self, repo):
+        project = repo.create_project("Test")
+        doc1 = repo.create_document(project.id, "doc1.pdf", "pdf", "/tmp/1.pdf", 100, "C1")
+        doc2 = repo.create_document(project.id, "doc2.pdf", "pdf", "/tmp/2.pdf", 200, "C2")
+        ext = repo.create_extraction(project.id, doc1.id, "governing_law", "TEXT", "Delaware")
+        repo.create_review_state(project.id, ext.id, "Delaware")
+        repo.create_extraction(project.id, doc2.id, "governing_law", "TEXT", "Texas")
+        return project, doc1, doc2, ext
+
+    @staticmethod
+    def count_builds(repo, monkeypatch):
+        builds = []
+        original = repo.list_extractions_by_project
+
+        def counting(*args, **kwargs):
+            builds.append(args)
+            return original(*args, **kwargs)
+        monkeypatch.setattr(repo, 'list_extractions_by_project', counting)
+        return builds
+
+    def test_served_from_snapshot_until_changed(self, repo, snapshot_services, project, monkeypatch):
+        project, doc1, doc2, _ = project
+        comp = snapshot_services['comparison']
+        builds = self.count_builds(repo, monkeypatch)
+
+        first = comp.generate_comparison_table(project.id)
+        assert comp.generate_comparison_table(project.id) is first
+        snapshot_services['diff'].compute_diff(project.id)
+        assert len(builds) == 1
+
+        # A write that bypasses the services is noticed by its revision
+        repo.create_extraction(project.id, doc1.id, "term", "TEXT", "5 years")
+        table = comp.generate_comparison_table(project.id)
+        assert len(builds) == 2
+        assert [row['field_name'] for row in table['rows']] == ["Governing Law", "Term"]
+        assert table['rows'][1]['document_results'][doc2.id]['extracted_value'] == 'N/A'
+
+    def test_review_applied_in_place(self, repo, snapshot_services, project, monkeypatch):
+        project, doc1, _, ext = project
+        comp = snapshot_services['comparison']
+        before = comp.generate_comparison_table(project.id)
+        builds = self.count_builds(repo, monkeypatch)
+
+        snapshot_services['review'].update_extraction_review(ext.id, 'CONFIRMED')
+        table = comp.generate_comparison_table(project.id)
+        assert builds == []
+        assert table['rows'][0]['document_results'][doc1.id]['status'] == 'CONFIRMED'
+        assert before['rows'][0]['document_results'][doc1.id]['status'] == 'EXTRACTED'
+
+    def test_extraction_applied_in_place(self, repo, snapshot_services, project, monkeypatch):
+        project, _, doc2, _ = project
+        comp = snapshot_services['comparison']
+        comp.generate_comparison_table(project.id)
+        builds = self.count_builds(repo, monkeypatch)
+
+        for key in ("GROQ_API_KEY", "GOOGLE_API_KEY", "GEMINI_API_KEY"):
+            monkeypatch.delenv(key, raising=False)
+        fields = [{'name': 'parties', 'field_type': 'TEXT', 'description': 'Parties'}]
+        ExtractionService(repo, snapshot_services['snapshots']).extract_fields_for_document(
+            project.id, doc2.id, fields)
+        table = comp.generate_comparison_table(project.id)
+        assert builds == []
+        assert [row['field_name'] for row in table['rows']] == ["Governing Law", "Parties"]
+        assert 'id' in table['rows'][1]['document_results'][doc2.id]
+
+    def test_annotation_keeps_snapshot(self, repo, snapshot_services, project, monkeypatch):
+        project, _, _, ext = project
+        comp = snapshot_services['comparison']
+        annotations = AnnotationService(repo, snapshot_services['snapshots'])
+        table = comp.generate_comparison_table(project.id)
+        builds = self.count_builds(repo, monkeypatch)
+
+        annotation = annotations.create_annotation(ext.id, "Check this", "qa")
+        annotations.update_annotation(annotation['id'], "Checked")
+        assert annotations.delete_annotation(annotation['id']) is True
+        assert annotations.delete_annotation(annotation['id']) is False
+        assert comp.generate_comparison_table(project.id) is table
+        assert builds == []
+
+    def test_deleted_project(self, repo, snapshot_services, project):
+        project = project[0]
+        comp = snapshot_services['comparison']
+        assert comp.generate_comparison_table(project.id)['row_count'] == 1
+        repo.delete_project(project.id)
+        assert comp.generate_comparison_table(project.id)['row_count'] == 0
+
+
 class TestDiffService:
     """Tests diff highlighting."""
 
@@ -229,6 +521,48 @@ class TestDiffService:
         assert result['summary']['fields_with_differences'] == 0
         assert result['field_diffs'][0]['is_unanimous'] is True
 
+    def test_compute_diff_groups_canonical_and_near_duplicate_values(self, services):
+        repo = services['repo']
+        diff = services['diff']
+
+        project = repo.create_project("Test")
+        values = ["State of Delaware", "state of delaware.", "State of Delaware", "State of Delawere", "Texas"]
+        for i, value in enumerate(values):
+            doc = repo.create_document(project.id, f"doc{i}.pdf", "pdf", "/tmp/d.pdf", 100, "C")
+            repo.create_extraction(project.id, doc.id, "governing_law", "TEXT", extracted_value=value)
+
+        field = diff.compute_diff(project.id)['field_diffs'][0]
+        assert field['value_groups'] == {
+            "State of Delaware": ["doc0.pdf", "doc1.pdf", "doc2.pdf"],
+            "State of Delawere": ["doc3.pdf"],
+            "Texas": ["doc4.pdf"],
+        }
+        assert field['near_duplicate_clusters'] == [
+            {'values': ["State of Delaware", "State of Delawere"], 'document_count': 4},
+        ]
+        near = {o['value']: o['near_majority'] for o in field['outliers']}
+        assert near == {"State of Delawere": True, "Texas": False}
+        assert field['value_pairs'][0]['value_b'] == "State of Delawere"
+        assert field['similarity_pairs'] == []
+
+        pairs = diff.compute_diff(project.id, full_matrix=True)['field_diffs'][0]['similarity_pairs']
+        assert len(pairs) == 10
+        assert {p['similarity'] for p in pairs if {p['doc_a'], p['doc_b']} == {"doc0.pdf", "doc1.pdf"}} == {1.0}
+
+    def test_full_matrix_is_capped(self, services):
+        repo = services['repo']
+        diff = services['diff']
+        diff.MAX_MATRIX_DOCUMENTS = 1
+
+        project = repo.create_project("Test")
+        for i in range(2):
+            doc = repo.create_document(project.id, f"doc{i}.pdf", "pdf", "/tmp/d.pdf", 100, "C")
+            repo.create_extraction(project.id, doc.id, "governing_law", "TEXT", extracted_value="Delaware")
+
+        with pytest.raises(ValueError):
+            diff.compute_diff(project.id, full_matrix=True)
+        assert diff.compute_diff(project.id)['field_diffs'][0]['is_unanimous'] is True
+
 
 class TestAnnotationService:
     """Tests annotation CRUD."""
@@ -311,3 +645,44 @@ class TestTaskService:
         )
         assert completed['status'] == 'COMPLETED'
         assert completed['result']['extracted'] == 10
+
+
+class TestExportService:
+    """Tests streamed exports."""
+
+    def test_table_rows_grouped_by_display_name(self, repo):
+        import csv
+        project = repo.create_project("Test")
+        docs = [repo.create_document(project.id, f"d{i}.pdf", "pdf", "/tmp/d.pdf", 1, "C") for i in range(2)]
+        repo.create_extraction(project.id, docs[0].id, "audit_policy", "TEXT", "Annual")
+        repo.create_extraction(project.id, docs[0].id, "term", "TEXT", "5 years")
+        repo.create_extraction(project.id, docs[1].id, "Audit Policy", "TEXT", "Quarterly")
+
+        lines = list(csv.reader(''.join(ExportService(repo, batch_size=1).iter_table_csv(project.id)).splitlines()))
+        assert sorted(lines[1:]) == [
+            ["Audit Policy", "TEXT", "Annual", "Quarterly"],
+            ["Term", "TEXT", "5 years", "N/A"],
+        ]
+        table_fields = [row['field_name'] for row in TableSnapshotStore(repo).table(project.id)['rows']]
+        assert sorted(table_fields) == ["Audit Policy", "Term"]
+
+    def test_columnar_dictionary_grows_across_batches(self, repo):
+        import io
+        pa = pytest.importorskip("pyarrow")
+        import pyarrow.parquet as pq
+
+        project = repo.create_project("Test")
+        doc = repo.create_document(project.id, "d.pdf", "pdf", "/tmp/d.pdf", 1, "C")
+        for field in ("term", "law", "term", "parties"):
+            repo.create_extraction(project.id, doc.id, field, "TEXT", f"{field} value")
+
+        export = ExportService(repo, columnar_batch_size=2)
+        for format in ('parquet', 'arrow'):
+            data = b''.join(export.iter_columnar([project.id], format=format))
+            if format == 'parquet':
+                table = pq.read_table(io.BytesIO(data))
+            else:
+                table = pa.ipc.open_stream(data).read_all()
+            assert table.num_rows == 4
+            assert sorted(table.column("field_name").to_pylist()) == ["law", "parties", "term", "term"]
+            assert pa.types.is_dictionary(table.schema.field("status").type)
@@ -0,0 +1,92 @@
+"""
+Unit tests for the compressed, content-addressed blob store.
+"""
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.storage.blob_store import BlobStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = BlobStore(str(tmp_path / "blobs"), frame_chars=100, cache_frames=4, max_open=2)
+    yield store
+    store.close()
+
+
+TEXT = "".join(f"Clause {i}: the Supplier shall deliver — naïve café {i}.\n" for i in range(200))
+
+
+class TestBlobStore:
+
+    def test_round_trip(self, store):
+        key = store.put(TEXT)
+        assert key == BlobStore.key_for(TEXT)
+        assert store.exists(key)
+        assert store.get(key) == TEXT
+
+    def test_spans_within_and_across_frames(self, store):
+        key = store.put(TEXT)
+        for start, end in [(0, 10), (95, 105), (150, 480), (len(TEXT) - 5, len(TEXT) + 10), (40, 40)]:
+            assert store.read_span(key, start, end) == TEXT[start:end]
+        assert store.read_spans(key, [(0, 5), (300, 350)]) == [TEXT[0:5], TEXT[300:350]]
+
+    def test_content_addressed(self, store):
+        first = store.put(TEXT)
+        assert store.put(TEXT) == first
+        assert len(list(store.keys())) == 1
+
+    def test_compressed_on_disk(self, tmp_path):
+        store = BlobStore(str(tmp_path / "default"))
+        key = store.put(TEXT)
+        assert os.path.getsize(store._path(key)) < len(TEXT.encode('utf-8')) / 4
+
+    def test_empty_text(self, store):
+        key = store.put("")
+        assert store.get(key) == ""
+
+    def test_delete_and_keys_by_age(self, store):
+        key = store.put(TEXT)
+        assert list(store.keys(older_than=3600)) == []
+        assert list(store.keys(older_than=0)) == [key]
+        store.read_span(key, 0, 10)
+        assert store.delete(key)
+        assert not store.exists(key)
+        assert not store.delete(key)
+
+    def test_put_existing_refreshes_age(self, store):
+        key = store.put(TEXT)
+        os.utime(store._path(key), (0, 0))
+        assert list(store.keys(older_than=3600)) == [key]
+        store.put(TEXT)
+        assert list(store.keys(older_than=3600)) == []
+
+    def test_directory_created_on_first_write(self, tmp_path):
+        store = BlobStore(str(tmp_path / "lazy"))
+        assert not os.path.exists(tmp_path / "lazy")
+        assert list(store.keys()) == []
+        store.put(TEXT)
+        assert os.path.isdir(tmp_path / "lazy")
+
+    def test_concurrent_reads_with_eviction(self, store):
+        keys = [store.put(f"{i} {TEXT}") for i in range(4)]
+        errors = []
+
+        def read(key, prefix):
+            try:
+                for _ in range(50):
+                    assert store.read_span(key, 0, 400) == f"{prefix} {TEXT}"[:400]
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=read, args=(key, i)) for i, key in enumerate(keys)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert errors == []
@@ -0,0 +1,63 @@
+"""
+Unit tests for ingest-time clause classification.
+"""
+import os
+import sys
+
+# Add parent directories to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.services.clause_classifier import (
+    CLAUSE_FAMILIES, classify_chunk, classify_chunks, family_for_field,
+)
+
+
+class TestFamilyForField:
+
+    def test_template_fields(self):
+        assert family_for_field('governing_law', 'Governing Law') == 'governing_law'
+        assert family_for_field('audit_rights') == 'audit'
+        assert family_for_field('non_solicitation') == 'non_solicitation'
+        assert family_for_field('termination') == 'termination'
+        assert family_for_field('term') == 'term'
+
+    def test_longest_marker_wins(self):
+        assert family_for_field('liability_cap') == 'liability'
+        assert family_for_field('change_of_control') == 'change_of_control'
+
+    def test_non_clause_fields(self):
+        assert family_for_field('effective_date', 'Effective Date') is None
+        assert family_for_field('parties') is None
+        assert family_for_field('payment_terms') is None
+
+    def test_every_family_has_keywords(self):
+        for family, (markers, keywords) in CLAUSE_FAMILIES.items():
+            assert markers and keywords, family
+            assert all(k == k.lower() for k in keywords), family
+
+
+class TestClassifyChunk:
+
+    def test_keywords_in_text(self):
+        text = ("Either party may terminate this Agreement for convenience. "
+                "Upon termination all fees become due.")
+        assert classify_chunk(text) == {'termination': 3}
+
+    def test_single_mention_not_tagged(self):
+        assert classify_chunk("The supplier shall defend its position.") == {}
+
+    def test_heading_weight(self):
+        tags = classify_chunk("This Agreement is governed by the laws of Texas.", "12 Governing Law")
+        assert tags['governing_law'] == 4
+
+    def test_case_insensitive_word_start(self):
+        assert 'indemnification' in classify_chunk("INDEMNIFICATION. Supplier shall indemnify Buyer.")
+        assert classify_chunk("Reassigned and reassignment.") == {}
+
+    def test_classify_chunks_rows(self):
+        chunks = [
+            {'chunk_index': 0, 'text': "Recitals and definitions."},
+            {'chunk_index': 1, 'text': "Insurance. Supplier shall maintain insurance coverage.",
+             'section_title': '9 Insurance'},
+        ]
+        assert classify_chunks(chunks) == [{'chunk_index': 1, 'family': 'insurance', 'score': 6}]
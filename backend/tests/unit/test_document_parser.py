@@ -87,6 +87,99 @@ class TestDocumentParser:
                 os.unlink(f.name)
 
 
+class TestStreamingParser:
+    """Tests for DocumentParser.iter_units."""
+
+    def test_iter_units_txt_paragraphs(self):
+        """Units are paragraphs whose join reproduces the text."""
+        text = "First paragraph line one.\nLine two.\n\nSecond paragraph.\n\nThird."
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False) as f:
+            f.write(text)
+            f.flush()
+            try:
+                metadata = {}
+                units = list(DocumentParser.iter_units(f.name, 'txt', metadata))
+                assert len(units) == 3
+                assert DocumentParser.UNIT_SEPARATOR.join(u['text'] for u in units) == text
+                assert metadata['format'] == 'text'
+                assert metadata['word_count'] == len(text.split())
+            finally:
+                os.unlink(f.name)
+
+    def test_iter_units_html(self, sample_html_file):
+        metadata = {}
+        units = list(DocumentParser.iter_units(sample_html_file, 'html', metadata))
+        assert any("GOVERNING LAW" in u['text'] for u in units)
+        assert metadata['title'] == 'License Agreement'
+
+    def test_iter_units_html_blocks(self):
+        """Block elements end lines; scripts, styles and inline markup do not leak."""
+        html = (
+            "<html><head><title>Exhibit</title><meta name='author' content='Legal'>"
+            "<style>p { color: red; }</style><script>var x = 1;</script></head>"
+            "<body><p>Section <b>1.1</b>\n  Definitions&nbsp;apply.</p>"
+            "<table><tr><td>Term</td><td>Two years</td></tr></table>"
+            "<div>Sec<i>tion</i> 2</div></body></html>"
+        )
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.html', delete=False) as f:
+            f.write(html)
+            f.flush()
+            try:
+                metadata = {}
+                lines = [u['text'] for u in DocumentParser.iter_units(f.name, 'html', metadata)]
+                assert lines == ["Exhibit", "Section 1.1 Definitions apply.", "Term Two years", "Section 2"]
+                assert metadata['title'] == 'Exhibit'
+                assert metadata['author'] == 'Legal'
+            finally:
+                os.unlink(f.name)
+
+    def test_html_matches_soup_words(self, sample_html_file):
+        """The streaming path extracts the same words as the BeautifulSoup path."""
+        content, metadata = DocumentParser._parse_html(sample_html_file)
+        soup_content, soup_metadata = DocumentParser._parse_html_soup(sample_html_file)
+        assert content.split() == soup_content.split()
+        assert metadata['title'] == soup_metadata['title']
+
+    def test_iter_units_docx_document_order(self, tmp_path):
+        """Paragraphs and table rows stream in document order."""
+        docx = pytest.importorskip("docx")
+        doc = docx.Document()
+        doc.core_properties.title = 'Master Services Agreement'
+        doc.core_properties.author = 'Legal'
+        doc.add_paragraph("Pricing is set out below.")
+        table = doc.add_table(rows=2, cols=2)
+        for row, values in zip(table.rows, [("Item", "Price"), ("Cells", "$100")]):
+            for cell, value in zip(row.cells, values):
+                cell.text = value
+        doc.add_paragraph("")
+        doc.add_paragraph("Payment\tis due in 30 days.")
+        path = str(tmp_path / "msa.docx")
+        doc.save(path)
+
+        metadata = {}
+        lines = [u['text'] for u in DocumentParser.iter_units(path, 'docx', metadata)]
+        assert lines == [
+            "Pricing is set out below.",
+            "Item | Price",
+            "Cells | $100",
+            "Payment\tis due in 30 days.",
+        ]
+        assert metadata['format'] == 'docx'
+        assert metadata['core_properties']['title'] == 'Master Services Agreement'
+        assert metadata['core_properties']['author'] == 'Legal'
+        assert metadata['word_count'] == 17
+
+    def test_parse_invalid_docx(self, tmp_path):
+        path = tmp_path / "broken.docx"
+        path.write_text("not a zip file")
+        with pytest.raises(Exception):
+            DocumentParser.parse(str(path), 'docx')
+
+    def test_iter_units_unsupported(self):
+        with pytest.raises(ValueError):
+            list(DocumentParser.iter_units("/tmp/file.xyz", 'xyz'))
+
+
 class TestDocumentChunker:
     """Tests for DocumentChunker class."""
 
@@ -121,6 +214,25 @@ class TestDocumentChunker:
         chunks = self.chunker.chunk(text, metadata)
         assert len(chunks) >= 1
 
+    def test_chunk_pages_from_offsets(self):
+        """Every chunk, including the last, is placed on the page it starts on."""
+        chunker = DocumentChunker(chunk_size=20, overlap=0)
+        pages = ["Page one sentence number %d is here." % i for i in range(4)]
+        text = '\n'.join(pages)
+        page_offsets = [0]
+        for page in pages[:-1]:
+            page_offsets.append(page_offsets[-1] + len(page) + 1)
+        chunks = chunker.chunk(text, {'page_offsets': page_offsets})
+        assert [c['page_number'] for c in chunks] == [1, 2, 3]
+
+    def test_page_for_offset(self):
+        offsets = [0, 100, 100, 250]
+        assert DocumentParser.page_for_offset(offsets, 0) == 1
+        assert DocumentParser.page_for_offset(offsets, 99) == 1
+        assert DocumentParser.page_for_offset(offsets, 100) == 3
+        assert DocumentParser.page_for_offset(offsets, 10_000) == 4
+        assert DocumentParser.page_for_offset(None, 50) == 1
+
     def test_chunk_has_section(self):
         """Test that chunks have section detection."""
         text = "ARTICLE 1: DEFINITIONS\nThis section defines key terms. The following terms have the stated meanings."
@@ -130,6 +242,142 @@ class TestDocumentChunker:
         assert any(c.get('section') for c in chunks)
 
 
+class TestChunkStream:
+    """Tests for DocumentChunker.chunk_stream."""
+
+    @staticmethod
+    def _units(pages=5, sentences=20):
+        return [
+            {'text': ' '.join(f"Page {p} sentence {i} has words." for i in range(sentences)),
+             'page_number': p}
+            for p in range(1, pages + 1)
+        ]
+
+    def test_matches_chunk_boundaries(self):
+        chunker = DocumentChunker(chunk_size=50, overlap=10)
+        units = self._units()
+        text = DocumentParser.UNIT_SEPARATOR.join(u['text'] for u in units)
+        streamed = list(chunker.chunk_stream(units))
+        legacy = chunker.chunk(text)
+        assert len(streamed) == len(legacy)
+        assert [c['word_count'] for c in streamed] == [c['word_count'] for c in legacy]
+
+    def test_chunks_are_slices_with_pages(self):
+        chunker = DocumentChunker(chunk_size=50, overlap=10)
+        units = self._units()
+        text = DocumentParser.UNIT_SEPARATOR.join(u['text'] for u in units)
+        chunks = list(chunker.chunk_stream(units))
+        for chunk in chunks:
+            assert text[chunk['start_offset']:chunk['end_offset']] == chunk['text']
+            assert chunk['text'].startswith(f"Page {chunk['page_number']} ")
+        assert chunks[-1]['page_number'] == 5
+
+    def test_window_bounds_unterminated_text(self):
+        chunker = DocumentChunker(chunk_size=50, overlap=10, max_window_chars=200)
+        chunks = list(chunker.chunk_stream([{'text': 'word ' * 2000, 'page_number': 1}]))
+        assert len(chunks) > 1
+        # Forced breaks keep every sentence, and so every chunk, bounded
+        assert all(len(c['text']) <= 2 * 200 for c in chunks)
+
+    def test_spans_match_chunk(self):
+        """chunk_spans places the same boundaries as chunk() without copying text."""
+        text = DocumentParser.UNIT_SEPARATOR.join(u['text'] for u in self._units())
+        chunker = DocumentChunker(chunk_size=120, overlap=20)
+        spans = chunker.chunk_spans(text)
+        legacy = chunker.chunk(text)
+        assert len(spans) == len(legacy)
+        for (start, end, words), chunk in zip(spans, legacy):
+            assert words == chunk['word_count']
+            assert ' '.join(text[start:end].split()) == ' '.join(chunk['text'].split())
+
+    def test_iter_span_chunks(self):
+        text = "  First sentence here. Second one!\n\nThird?  "
+        chunker = DocumentChunker(chunk_size=3, overlap=0)
+        spans = chunker.chunk_spans(text)
+        chunks = list(chunker.iter_span_chunks(text, spans, {'page_offsets': [0, 20]}))
+        assert [c['text'] for c in chunks] == [
+            "First sentence here.",
+            "First sentence here. Second one!",
+            "Second one!\n\nThird?",
+        ]
+        assert [c['page_number'] for c in chunks] == [1, 1, 2]
+        assert chunker.chunk_spans("   ") == []
+
+    def test_empty_stream(self):
+        assert list(DocumentChunker().chunk_stream([])) == []
+
+
+CONTRACT = """MASTER SUPPLY AGREEMENT
+ARTICLE I DEFINITIONS
+Section 1.1 Defined Terms. Capitalized terms have the meanings below.
+(a) "Goods" means the products listed in Exhibit A.
+(b) "Price" means the amounts in Exhibit B.
+(i) Prices exclude taxes.
+(ii) Prices are in US dollars.
+Section 1.2 Interpretation. Headings are for convenience only, as noted in
+Section 9(c) of the Terms.
+ARTICLE II TERM AND TERMINATION
+2.1 Term. This Agreement runs for three years.
+2.2 Termination. Either party may terminate for material breach.
+"""
+
+
+class TestSectionTree:
+    """Tests for structure detection and structure-aware chunking."""
+
+    def setup_method(self):
+        self.chunker = DocumentChunker(chunk_size=25, overlap=5)
+        self.sections = self.chunker.detect_sections(CONTRACT)
+
+    def test_detects_hierarchy(self):
+        numbers = [s['number'] for s in self.sections]
+        assert numbers == [
+            'ARTICLE I', '1.1', '(a)', '(b)', '(i)', '(ii)', '1.2',
+            'ARTICLE II', '2.1', '2.2',
+        ]
+        by_number = {s['number']: s for s in self.sections}
+        assert by_number['1.1']['parent'] == by_number['ARTICLE I']['index']
+        assert by_number['(i)']['parent'] == by_number['(b)']['index']
+        assert by_number['1.2']['title'] == 'Interpretation'
+        assert by_number['ARTICLE II']['title'] == 'TERM AND TERMINATION'
+
+    def test_section_spans_nest(self):
+        by_number = {s['number']: s for s in self.sections}
+        article = by_number['ARTICLE I']
+        assert article['end_offset'] == by_number['ARTICLE II']['start_offset']
+        assert CONTRACT[by_number['(b)']['start_offset']:].startswith('(b)')
+        assert by_number['(b)']['end_offset'] == by_number['1.2']['start_offset']
+        assert by_number['2.2']['end_offset'] == len(CONTRACT)
+
+    def test_section_at(self):
+        offset = CONTRACT.index("Prices are in US dollars")
+        assert DocumentChunker.section_at(self.sections, offset)['number'] == '(ii)'
+        assert DocumentChunker.section_at(self.sections, 0) is None
+
+    def test_structure_chunks_align_with_sections(self):
+        spans = self.chunker.chunk_structure(CONTRACT, self.sections)
+        starts = {s['start_offset'] for s in self.sections}
+        texts = [CONTRACT[start:end] for start, end, _ in spans]
+        # Articles always start a chunk and every chunk but the preamble starts at a heading
+        assert any(t.startswith('ARTICLE I ') for t in texts)
+        assert any(t.startswith('ARTICLE II') for t in texts)
+        assert all(start in starts for start, _, _ in spans[1:])
+        assert all(words <= self.chunker.chunk_size for _, _, words in spans)
+
+    def test_structure_chunk_labels(self):
+        spans = self.chunker.chunk_structure(CONTRACT, self.sections)
+        chunks = list(self.chunker.iter_span_chunks(CONTRACT, spans, sections=self.sections))
+        assert chunks[0]['section'] == 'MASTER SUPPLY AGREEMENT'
+        assert 'ARTICLE II TERM AND TERMINATION' in [c['section'] for c in chunks]
+
+    def test_oversized_clause_split_by_sentences(self):
+        text = "1. Scope. " + "The supplier shall deliver goods. " * 20
+        chunker = DocumentChunker(chunk_size=25, overlap=5)
+        spans = chunker.chunk_structure(text, chunker.detect_sections(text))
+        assert len(spans) > 1
+        assert all(words <= 25 for _, _, words in spans)
+
+
 class TestParserWithRealFiles:
     """Tests using real data files if available."""
 
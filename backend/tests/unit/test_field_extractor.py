@@ -157,3 +157,146 @@ class TestCitationFinding:
         extractor = FieldExtractor()
         citations = extractor._find_citations("", [], "doc1")
         assert citations == []
+
+    def test_citation_page_from_offsets(self):
+        """A match inside a chunk is cited on the page where it occurs."""
+        extractor = FieldExtractor()
+        text = "Recitals follow here. " * 3 + "Payment is due within 30 days."
+        chunks = [{"text": text, "page_number": 1, "section": "Main", "start_offset": 1000}]
+        page_offsets = [0, 500, 1040]
+        citations = extractor._find_citations(
+            "Payment is due within 30 days", chunks, "doc1", page_offsets=page_offsets
+        )
+        assert citations[0]["page_number"] == 3
+
+
+class TestSectionTargeting:
+    """Tests for narrowing extraction to sections named after the field."""
+
+    SECTIONS = [
+        {'index': 0, 'parent': None, 'level': 2, 'number': '14', 'title': 'Governing Law; Venue',
+         'start_offset': 100, 'end_offset': 200},
+        {'index': 1, 'parent': 0, 'level': 3, 'number': '14.1', 'title': 'Governing Law',
+         'start_offset': 120, 'end_offset': 160},
+        {'index': 2, 'parent': None, 'level': 2, 'number': '15', 'title': 'Notices',
+         'start_offset': 200, 'end_offset': 300},
+    ]
+
+    def test_outermost_matching_sections(self):
+        sections = FieldExtractor._sections_for_field(self.SECTIONS, 'governing_law', 'Governing Law')
+        assert [s['number'] for s in sections] == ['14']
+        assert FieldExtractor._sections_for_field(self.SECTIONS, 'effective_date', '') == []
+        assert FieldExtractor._sections_for_field(None, 'governing_law', '') == []
+
+    def test_chunks_in_sections(self):
+        chunks = [
+            {'text': 'a', 'start_offset': 0, 'end_offset': 90},
+            {'text': 'b', 'start_offset': 90, 'end_offset': 130},
+            {'text': 'c', 'start_offset': 210, 'end_offset': 260},
+        ]
+        selected = FieldExtractor._chunks_in_sections(chunks, self.SECTIONS[:1])
+        assert [c['text'] for c in selected] == ['b']
+
+    def test_heuristics_search_target_section_first(self):
+        extractor = FieldExtractor()
+        extractor.groq_client = extractor.gemini_model = extractor.llm_client = None
+        text = (
+            "Recitals. This agreement is governed by the laws of the State of Delaware "
+            "only for tax purposes.\n"
+            "14. Governing Law. This Agreement shall be governed by the laws of the State of New York."
+        )
+        start = text.index("14. Governing Law")
+        sections = [{'index': 0, 'parent': None, 'level': 2, 'number': '14', 'title': 'Governing Law',
+                     'start_offset': start, 'end_offset': len(text)}]
+        chunks = [{'text': text[start:], 'page_number': 2, 'section': '14 Governing Law',
+                   'start_offset': start, 'end_offset': len(text)}]
+        result = extractor.extract_fields(
+            text, chunks, [{'name': 'governing_law', 'field_type': 'TEXT'}], 'doc1', sections=sections,
+        )[0]
+        assert 'New York' in result['extracted_value']
+        assert result['extraction_metadata']['sections'] == ['14 Governing Law']
+        assert result['citations'][0]['page_number'] == 2
+
+    def test_llm_prompt_packs_target_section_within_budget(self, monkeypatch):
+        class RecordingClient:
+            prompts = []
+
+            def complete(self, prompt):
+                self.prompts.append(prompt)
+                return '{"value": "New York", "raw_text": "laws of the State of New York", "confidence": 0.9}'
+
+        monkeypatch.setenv("LLM_CONTEXT_TOKENS", "1000")
+        client = RecordingClient()
+        extractor = FieldExtractor(llm_client=client)
+        extractor.groq_client = extractor.gemini_model = None
+
+        filler = "The supplier shall deliver the goods on the agreed schedule. " * 400
+        clause = "14. Governing Law. This Agreement shall be governed by the laws of the State of New York."
+        text = filler + clause
+        start = len(filler)
+        chunks = [
+            {'text': text[i:i + 600], 'start_offset': i, 'end_offset': min(start, i + 600)}
+            for i in range(0, start, 600)
+        ] + [{'text': clause, 'start_offset': start, 'end_offset': len(text)}]
+        sections = [{'index': 0, 'parent': None, 'level': 2, 'number': '14', 'title': 'Governing Law',
+                     'start_offset': start, 'end_offset': len(text)}]
+
+        extractor.extract_fields(
+            text, chunks, [{'name': 'governing_law', 'field_type': 'TEXT'}], 'doc1', sections=sections,
+        )
+        prompt = client.prompts[0]
+        assert clause in prompt
+        assert len(prompt) < len(text) / 2
+
+    def test_llm_context_packed_once_per_document(self, monkeypatch):
+        from src.services import field_extractor, token_budget
+        estimate = token_budget.estimate_tokens
+        calls = []
+
+        def counting_estimate(text):
+            calls.append(len(text or ''))
+            return estimate(text)
+
+        class Client:
+            prompts = []
+
+            def complete(self, prompt):
+                self.prompts.append(prompt)
+                return '{"value": "Value", "raw_text": "Value", "confidence": 0.9}'
+
+        monkeypatch.setattr(field_extractor, 'estimate_tokens', counting_estimate)
+        monkeypatch.setattr(token_budget, 'estimate_tokens', counting_estimate)
+        client = Client()
+        extractor = FieldExtractor(llm_client=client)
+        extractor.groq_client = extractor.gemini_model = None
+
+        text = "The supplier shall deliver the goods on the agreed schedule. " * 20
+        chunks = [{'text': text, 'start_offset': 0, 'end_offset': len(text)}]
+        fields = [{'name': f'field_{i}', 'field_type': 'TEXT'} for i in range(3)]
+        extractor.extract_fields(text, chunks, fields, 'doc1')
+
+        assert calls.count(len(text)) == 1
+        assert len(client.prompts) == 3 and text in client.prompts[2]
+
+    def test_clause_index_limits_search_to_tagged_chunks(self):
+        extractor = FieldExtractor()
+        extractor.groq_client = extractor.gemini_model = extractor.llm_client = None
+        recital = "Recitals. This agreement is governed by the laws of the State of Delaware for tax purposes. "
+        clause = "This Agreement shall be governed by the laws of the State of New York."
+        text = recital + clause
+        chunks = [
+            {'chunk_index': 0, 'text': recital, 'page_number': 1, 'start_offset': 0, 'end_offset': len(recital)},
+            {'chunk_index': 1, 'text': clause, 'page_number': 2, 'start_offset': len(recital),
+             'end_offset': len(text)},
+        ]
+        fields = [{'name': 'governing_law', 'field_type': 'TEXT'}]
+
+        result = extractor.extract_fields(text, chunks, fields, 'doc1', clause_index={'governing_law': [1]})[0]
+        assert 'New York' in result['extracted_value']
+        assert result['extraction_metadata']['clause_family'] == 'governing_law'
+        assert [c['page_number'] for c in result['citations']] == [2]
+
+        # Without tags for the field's family the whole document is searched
+        result = extractor.extract_fields(text, chunks, fields, 'doc1', clause_index={'insurance': [0]})[0]
+        assert 'Delaware' in result['extracted_value']
+        assert result['extraction_metadata']['clause_family'] is None
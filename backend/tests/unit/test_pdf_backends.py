@@ -0,0 +1,141 @@
+"""
+Unit tests for PDF extraction backends and backend selection.
+"""
+import os
+import sys
+import pytest
+
+# Add parent directories to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.services import pdf_backends
+from src.services.document_parser import DocumentParser
+from src.services.pdf_backends import (
+    PDFBackend, PDFPages, available_backends, select_backend, text_quality,
+)
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'data')
+SAMPLE_PDF = os.path.join(DATA_DIR, 'Supply Agreement.pdf')
+
+
+class _FakePages(PDFPages):
+    def __init__(self, file_path, texts):
+        super().__init__(file_path)
+        self.texts = texts
+
+    @property
+    def page_count(self):
+        return len(self.texts)
+
+    def extract_page(self, page_number):
+        text = self.texts[page_number - 1]
+        if isinstance(text, Exception):
+            raise text
+        return text
+
+
+def _fake_backend(name, texts):
+    class FakeBackend(PDFBackend):
+        @classmethod
+        def is_available(cls):
+            return True
+
+        def open(self, file_path):
+            return _FakePages(file_path, texts)
+
+    FakeBackend.name = name
+    return FakeBackend
+
+
+GOOD_PAGE = "This Supply Agreement is entered into by and between the parties named below. " * 5
+SPACED_PAGE = "G I G A F A C T O R Y  A M E N D E D  A N D  R E S T A T E D " * 5
+
+
+class TestTextQuality:
+
+    def test_clean_text_scores_high(self):
+        assert text_quality(GOOD_PAGE) > 0.9
+
+    def test_spaced_glyphs_score_low(self):
+        assert text_quality(SPACED_PAGE) < 0.2
+
+    def test_empty_text_scores_zero(self):
+        assert text_quality("") == 0.0
+        assert text_quality("12 34 --") == 0.0
+
+
+class TestSelectBackend:
+
+    def test_prefers_higher_quality(self, monkeypatch):
+        monkeypatch.delenv("PDF_BACKEND", raising=False)
+        monkeypatch.setattr(pdf_backends, 'BACKENDS', [
+            _fake_backend('spaced', [SPACED_PAGE]),
+            _fake_backend('clean', [GOOD_PAGE]),
+        ])
+        backend, reports = select_backend('contract.pdf')
+        assert backend.name == 'clean'
+        assert [r['backend'] for r in reports] == ['spaced', 'clean']
+
+    def test_skips_failing_backend(self, monkeypatch):
+        monkeypatch.delenv("PDF_BACKEND", raising=False)
+        monkeypatch.setattr(pdf_backends, 'BACKENDS', [
+            _fake_backend('broken', [ValueError("bad xref")]),
+            _fake_backend('clean', [GOOD_PAGE]),
+        ])
+        backend, reports = select_backend('contract.pdf')
+        assert backend.name == 'clean'
+        assert 'error' in reports[0]
+
+    def test_env_override(self, monkeypatch):
+        monkeypatch.setenv("PDF_BACKEND", 'spaced')
+        monkeypatch.setattr(pdf_backends, 'BACKENDS', [
+            _fake_backend('spaced', [SPACED_PAGE]),
+            _fake_backend('clean', [GOOD_PAGE]),
+        ])
+        backend, reports = select_backend('contract.pdf')
+        assert backend.name == 'spaced'
+        assert reports == []
+
+
+class TestPDFParsing:
+
+    def test_page_fallback(self, monkeypatch):
+        """A page the selected backend cannot read is taken from another one."""
+        monkeypatch.setenv("PDF_BACKEND", 'primary')
+        monkeypatch.setattr(pdf_backends, 'BACKENDS', [
+            _fake_backend('primary', [GOOD_PAGE, RuntimeError("broken page")]),
+            _fake_backend('secondary', ["unused", "Second page text."]),
+        ])
+        content, metadata = DocumentParser().parse('contract.pdf', 'pdf')
+        assert metadata['pdf_backend'] == 'primary'
+        assert metadata['pdf_fallback_pages'] == {'2': 'secondary'}
+        assert "--- Page 2 ---\nSecond page text." in content
+        assert content[metadata['page_offsets'][1]:].startswith("\n--- Page 2 ---")
+
+    def test_page_offsets_skip_empty_pages(self, monkeypatch):
+        monkeypatch.setenv("PDF_BACKEND", 'only')
+        monkeypatch.setattr(pdf_backends, 'BACKENDS', [
+            _fake_backend('only', ["First page.", "", "Third page."]),
+        ])
+        content, metadata = DocumentParser().parse('contract.pdf', 'pdf')
+        offsets = metadata['page_offsets']
+        assert len(offsets) == 3
+        third = content.index("Third page.")
+        assert DocumentParser.page_for_offset(offsets, third) == 3
+        assert DocumentParser.page_for_offset(offsets, content.index("First page.")) == 1
+
+    @pytest.mark.skipif(not os.path.exists(SAMPLE_PDF), reason="Real data file not available")
+    def test_real_pdf_every_backend(self):
+        for backend in available_backends():
+            pages = backend.open(SAMPLE_PDF)
+            try:
+                assert pages.page_count > 0
+                assert text_quality(pages.extract_page(1)) > 0.5
+            finally:
+                pages.close()
+
+    @pytest.mark.skipif(not os.path.exists(SAMPLE_PDF), reason="Real data file not available")
+    def test_real_pdf_records_backend(self):
+        content, metadata = DocumentParser().parse(SAMPLE_PDF, 'pdf')
+        assert metadata['pdf_backend'] in {b.name for b in available_backends()}
+        assert len(content) > 0
@@ -58,6 +58,40 @@ class TestProjectOperations:
     def test_delete_nonexistent_project(self, repo):
         assert repo.delete_project("nonexistent") is False
 
+    def test_revision_bumped_by_writes(self, repo):
+        project = repo.create_project("Test")
+        assert repo.get_project_revision(project.id) == 0
+        doc = repo.create_document(project.id, "t.pdf", "pdf", "/tmp/t.pdf", 100, "Content")
+        ext = repo.create_extraction(project.id, doc.id, "f1", "TEXT", "v1")
+        repo.update_extraction(ext.id, extracted_value="v2")
+        assert repo.get_project_revision(project.id) == 3
+        repo.update_document_status(doc.id, DocumentStatus.INDEXED)  # Shown in the change feed
+        assert repo.get_project_revision(project.id) == 4
+        repo.update_project(project.id, name="Renamed")
+        assert repo.get_project_revision(project.id) == 5
+        assert repo.get_project_revision("nonexistent") is None
+
+    def test_revision_bumped_by_annotations(self, repo):
+        project = repo.create_project("Test")
+        doc = repo.create_document(project.id, "t.pdf", "pdf", "/tmp/t.pdf", 100, "Content")
+        ext = repo.create_extraction(project.id, doc.id, "f1", "TEXT", "v1")
+        annotation = repo.create_annotation(ext.id, "Note", "user")
+        repo.update_annotation(annotation.id, "Edited")
+        repo.delete_annotation(annotation.id)
+        assert repo.get_project_revision(project.id) == 5
+
+    def test_revision_bumped_once_per_unit(self, repo):
+        project = repo.create_project("Test")
+        other = repo.create_project("Other")
+        with repo.unit_of_work():
+            doc = repo.create_document(project.id, "t.pdf", "pdf", "/tmp/t.pdf", 100, "Content")
+            for i in range(3):
+                ext = repo.create_extraction(project.id, doc.id, f"f{i}", "TEXT", "v")
+                repo.create_review_state(project.id, ext.id, "v")
+            assert repo.get_project_revision(project.id) == 1
+        assert repo.get_project_revision(project.id) == 1
+        assert repo.get_project_revision(other.id) == 0
+
 
 class TestDocumentOperations:
     def test_create_document(self, repo):
@@ -81,6 +115,29 @@ class TestDocumentOperations:
         docs = repo.list_project_documents(project.id)
         assert len(docs) == 2
 
+    def test_list_defers_large_columns(self, repo):
+        from sqlalchemy import event
+        project = repo.create_project("Test")
+        doc = repo.create_document(project.id, "doc1.pdf", "pdf", "/tmp/1.pdf", 100, "Full text",
+                                   parsed_metadata={"pages": 3})
+        statements = []
+        event.listen(repo.engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+        [listed] = repo.list_project_documents(project.id)
+        assert listed.filename == "doc1.pdf"
+        assert "content_text" not in statements[-1] and "parsed_metadata" not in statements[-1]
+        fetched = repo.get_document(doc.id)
+        assert fetched.content_text == "Full text"
+        assert fetched.parsed_metadata == {"pages": 3}
+
+    def test_counts(self, repo):
+        project = repo.create_project("Test")
+        doc = repo.create_document(project.id, "doc1.pdf", "pdf", "/tmp/1.pdf", 100, "Content 1")
+        repo.create_document(project.id, "doc2.pdf", "pdf", "/tmp/2.pdf", 100, "Content 2")
+        repo.create_extraction(project.id, doc.id, "f1", "TEXT", "v1")
+        assert repo.count_project_documents(project.id) == 2
+        assert repo.count_extractions_by_project(project.id) == 1
+        assert repo.count_project_documents("missing") == 0
+
     def test_update_document_status(self, repo):
         project = repo.create_project("Test")
         doc = repo.create_document(project.id, "test.pdf", "pdf", "/tmp/t.pdf", 100, "Content")
@@ -154,6 +211,89 @@ class TestExtractionOperations:
         extractions = repo.list_extractions_by_project(project.id)
         assert len(extractions) == 2
 
+    def test_table_window(self, repo):
+        project = repo.create_project("Test")
+        docs = [repo.create_document(project.id, f"d{i}.pdf", "pdf", "/tmp/t.pdf", 100, "C") for i in range(4)]
+        for i, doc in enumerate(docs):
+            for field in ("c", "a", "b"):
+                repo.create_extraction(project.id, doc.id, field, "TEXT", f"{field}{i}", confidence_score=i / 4)
+
+        window = repo.get_table_window(project.id, row_limit=2, column_limit=3)
+        assert window['rows'] == [('a', FieldType.TEXT), ('b', FieldType.TEXT)]
+        assert [d.filename for d in window['documents']] == ["d0.pdf", "d1.pdf", "d2.pdf"]
+        assert len(window['extractions']) == 6
+        assert (window['total_rows'], window['total_columns']) == (3, 4)
+        assert window['more_rows'] and window['more_columns']
+
+        window = repo.get_table_window(project.id, row_cursor='b', column_cursor=docs[2].id)
+        assert window['rows'] == [('c', FieldType.TEXT)]
+        assert [d.filename for d in window['documents']] == ["d3.pdf"]
+        assert not window['more_rows'] and not window['more_columns']
+
+        window = repo.get_table_window(project.id, row_offset=1, column_offset=3, row_limit=1)
+        assert [name for name, _ in window['rows']] == ['b']
+        assert [d.filename for d in window['documents']] == ["d3.pdf"]
+
+    def test_table_window_types_of_rows_without_cells(self, repo):
+        from sqlalchemy import event
+        project = repo.create_project("Test")
+        docs = [repo.create_document(project.id, f"d{i}.pdf", "pdf", "/tmp/t.pdf", 100, "C") for i in range(2)]
+        repo.create_extraction(project.id, docs[0].id, "a", "TEXT", "v")
+        for field, field_type in (("b", "DATE"), ("c", "CURRENCY"), ("d", "TEXT")):
+            repo.create_extraction(project.id, docs[1].id, field, field_type, "v")
+
+        statements = []
+        listener = lambda *args: statements.append(args[2])
+        event.listen(repo.engine, "before_cursor_execute", listener)
+        try:
+            window = repo.get_table_window(project.id, column_limit=1)
+        finally:
+            event.remove(repo.engine, "before_cursor_execute", listener)
+        assert window['rows'] == [
+            ('a', FieldType.TEXT), ('b', FieldType.DATE), ('c', FieldType.CURRENCY), ('d', FieldType.TEXT),
+        ]
+        assert sum('min(' in statement.lower() for statement in statements) == 1
+
+    def test_table_window_filters(self, repo):
+        project = repo.create_project("Test")
+        docs = [repo.create_document(project.id, f"d{i}.pdf", "pdf", "/tmp/t.pdf", 100, "C") for i in range(3)]
+        for i, doc in enumerate(docs):
+            repo.create_extraction(project.id, doc.id, "a", "TEXT", "v", confidence_score=i / 2)
+            repo.create_extraction(project.id, doc.id, "b", "TEXT", "v", confidence_score=0.9)
+        confirmed = repo.list_extractions_by_project(project.id, field_name="b", document_id=docs[2].id)[0]
+        repo.update_extraction(confirmed.id, status=ExtractionStatus.CONFIRMED)
+
+        window = repo.get_table_window(project.id, max_confidence=0.6)
+        assert [name for name, _ in window['rows']] == ['a']
+        assert [d.filename for d in window['documents']] == ["d0.pdf", "d1.pdf"]
+
+        window = repo.get_table_window(project.id, statuses=[ExtractionStatus.CONFIRMED])
+        assert [name for name, _ in window['rows']] == ['b']
+        assert [e.id for e in window['extractions']] == [confirmed.id]
+
+        window = repo.get_table_window(project.id, document_ids=[docs[1].id], field_names=['b'])
+        assert window['total_rows'] == 1 and window['total_columns'] == 1
+
+    def test_iter_extraction_rows(self, repo):
+        project = repo.create_project("Test")
+        docs = [repo.create_document(project.id, f"d{i}.pdf", "pdf", "/tmp/t.pdf", 100, "C") for i in range(2)]
+        for doc in docs:
+            for field in ("b", "a"):
+                repo.create_extraction(project.id, doc.id, field, "TEXT", "v")
+        reviewed = repo.list_extractions_by_project(project.id, field_name="a", document_id=docs[0].id)[0]
+        repo.create_review_state(project.id, reviewed.id, ai_value="v")
+
+        batches = list(repo.iter_extraction_rows(project.id, batch_size=3))
+        assert [len(batch) for batch in batches] == [3, 1]
+        rows = [row for batch in batches for row in batch]
+        assert [row.field_name for row in rows] == ["a", "a", "b", "b"]
+        assert [row.review_status for row in rows if row.id == reviewed.id] == [ExtractionStatus.PENDING]
+
+        rows = [row for batch in repo.iter_extraction_rows(project.id, order_by='document') for row in batch]
+        assert [(row.filename, row.field_name) for row in rows][:2] in (
+            [("d0.pdf", "a"), ("d0.pdf", "b")], [("d1.pdf", "a"), ("d1.pdf", "b")],
+        )
+
     def test_update_extraction(self, repo):
         project = repo.create_project("Test")
         doc = repo.create_document(project.id, "t.pdf", "pdf", "/tmp/t.pdf", 100, "Content")
@@ -298,3 +438,376 @@ class TestBulkOperations:
         count = repo.delete_extractions_for_project(project.id)
         assert count == 2
         assert len(repo.list_extractions_by_project(project.id)) == 0
+
+
+class TestChangeLog:
+
+    @pytest.fixture
+    def project(self, repo):
+        project = repo.create_project("Test")
+        doc = repo.create_document(project.id, "t.pdf", "pdf", "/tmp/t.pdf", 100, "Content")
+        ext = repo.create_extraction(project.id, doc.id, "f1", "TEXT", "v1")
+        review = repo.create_review_state(project.id, ext.id, "v1")
+        return project, doc, ext, review
+
+    @staticmethod
+    def summary(changes):
+        return {
+            entity: (sorted(row.id for row in changes[entity]['upserted']), changes[entity]['deleted'])
+            for entity in DatabaseRepository.CHANGE_ENTITIES
+        }
+
+    def test_changes_since(self, repo, project):
+        project, doc, ext, review = project
+        assert repo.get_project_revision(project.id) == 3
+        annotation = repo.create_annotation(ext.id, "Note", "user")
+        repo.update_review_state(review.id, status=ExtractionStatus.CONFIRMED)
+        repo.update_review_state(review.id, reviewer_notes="Checked")
+        repo.delete_annotation(annotation.id)
+
+        changes = repo.get_changes(project.id, since=3)
+        assert changes['revision'] == 7 and changes['full_refresh'] is False
+        assert self.summary(changes) == {
+            'document': ([], []),
+            'extraction': ([], []),
+            'review': ([review.id], []),
+            'annotation': ([], [annotation.id]),
+        }
+        assert changes['review']['upserted'][0].reviewer_notes == "Checked"
+
+        changes = repo.get_changes(project.id, since=0)
+        assert self.summary(changes)['document'] == ([doc.id], [])
+        assert self.summary(changes)['extraction'] == ([ext.id], [])
+        assert self.summary(repo.get_changes(project.id, since=7)) == {
+            entity: ([], []) for entity in DatabaseRepository.CHANGE_ENTITIES
+        }
+        assert repo.get_changes("nonexistent", since=0) is None
+
+    def test_document_status_change_logged(self, repo, project):
+        from src.models.schema import DocumentStatus
+        project, doc, _, _ = project
+        repo.update_document_status(doc.id, DocumentStatus.INDEXED)
+        changes = repo.get_changes(project.id, since=3)
+        assert changes['revision'] == 4
+        assert self.summary(changes)['document'] == ([doc.id], [])
+        assert changes['document']['upserted'][0].status == DocumentStatus.INDEXED
+
+    def test_compaction_keeps_latest_entry(self, repo, project):
+        project, _, ext, review = project
+        for notes in ("a", "b", "c"):
+            repo.update_review_state(review.id, reviewer_notes=notes)
+        before = {since: self.summary(repo.get_changes(project.id, since)) for since in range(7)}
+
+        assert repo.compact_change_log(project.id) == 3  # Review insert and two older updates
+        after = {since: self.summary(repo.get_changes(project.id, since)) for since in range(7)}
+        assert after == before
+
+    def test_compaction_drops_old_entries(self, repo, project):
+        project = project[0]
+        assert repo.compact_change_log(max_age_seconds=0) == 3
+        assert repo.get_changes(project.id, since=2)['full_refresh'] is True
+        changes = repo.get_changes(project.id, since=3)
+        assert changes['full_refresh'] is False
+        assert changes['extraction'] == {'upserted': [], 'deleted': []}
+
+    def test_re_extraction_restarts_log(self, repo, project):
+        project, doc, _, _ = project
+        repo.delete_extractions_for_project(project.id)
+        assert repo.get_changes(project.id, since=3)['full_refresh'] is True
+        ext = repo.create_extraction(project.id, doc.id, "f2", "TEXT", "v2")
+        assert self.summary(repo.get_changes(project.id, since=4))['extraction'] == ([ext.id], [])
+
+    def test_deleted_with_project(self, repo, project):
+        from src.models.schema import ChangeLogEntry
+        repo.delete_project(project[0].id)
+        session = repo.get_session()
+        try:
+            assert session.query(ChangeLogEntry).count() == 0
+        finally:
+            session.close()
+
+
+class TestMigrations:
+
+    @pytest.fixture
+    def legacy_db_url(self, tmp_path):
+        """A database laid out like older versions: no secondary indexes or newer columns."""
+        from sqlalchemy import create_engine, text
+        url = f"sqlite:///{tmp_path / 'legacy.db'}"
+        engine = create_engine(url)
+        with engine.begin() as connection:
+            connection.execute(text(
+                "CREATE TABLE document_chunks (id VARCHAR(36) PRIMARY KEY, document_id VARCHAR(36) NOT NULL, "
+                "chunk_index INTEGER NOT NULL, text TEXT NOT NULL, page_number INTEGER, "
+                "section_title VARCHAR(512), embedding JSON, metadata JSON NOT NULL)"
+            ))
+            connection.execute(text(
+                "CREATE TABLE document_sections (id VARCHAR(36) PRIMARY KEY, document_id VARCHAR(36) NOT NULL, "
+                "section_index INTEGER NOT NULL, parent_index INTEGER, level INTEGER NOT NULL, "
+                "number VARCHAR(64) NOT NULL, title VARCHAR(512) NOT NULL, "
+                "start_offset INTEGER NOT NULL, end_offset INTEGER NOT NULL)"
+            ))
+        engine.dispose()
+        return url
+
+    def test_upgrade_adds_columns_and_indexes(self, legacy_db_url):
+        from sqlalchemy import inspect
+        from src.storage.migrations import MIGRATIONS, current_version
+
+        repo = DatabaseRepository(legacy_db_url)
+        inspector = inspect(repo.engine)
+        columns = {c['name'] for c in inspector.get_columns('document_chunks')}
+        assert {'start_offset', 'end_offset', 'token_count'} <= columns
+        chunk_indexes = {ix['name'] for ix in inspector.get_indexes('document_chunks')}
+        assert 'ix_document_chunks_document_index' in chunk_indexes
+        section_indexes = {ix['name'] for ix in inspector.get_indexes('document_sections')}
+        assert section_indexes == {'ix_document_sections_document_index'}
+        assert current_version(repo.engine) == MIGRATIONS[-1][0]
+
+        # Upgrading again is a no-op
+        repo.engine.dispose()
+        DatabaseRepository(legacy_db_url)
+
+    def test_fresh_database_has_declared_indexes(self, repo):
+        from sqlalchemy import inspect
+        indexes = {ix['name']: ix['column_names'] for ix in inspect(repo.engine).get_indexes('extraction_results')}
+        assert indexes['ix_extraction_results_project_document_field'] == ['project_id', 'document_id', 'field_name']
+        review_indexes = {ix['name'] for ix in inspect(repo.engine).get_indexes('review_states')}
+        assert 'ix_review_states_project_status' in review_indexes
+
+
+class TestUnitOfWork:
+
+    def test_commits_together(self, repo):
+        with repo.unit_of_work():
+            project = repo.create_project("Test")
+            doc = repo.create_document(project.id, "t.pdf", "pdf", "/tmp/t.pdf", 100, "Content")
+            repo.create_chunks_bulk([{'document_id': doc.id, 'chunk_index': 0, 'text': 'Chunk'}])
+            repo.update_document_status(doc.id, DocumentStatus.INDEXED)
+        assert repo.get_document(doc.id).status == DocumentStatus.INDEXED
+        assert len(repo.get_document_chunks(doc.id)) == 1
+        assert doc.filename == "t.pdf"  # Usable after the unit closed
+
+    def test_rolls_back_on_error(self, repo):
+        project = repo.create_project("Test")
+        with pytest.raises(ValueError):
+            with repo.unit_of_work():
+                doc = repo.create_document(project.id, "t.pdf", "pdf", "/tmp/t.pdf", 100, "Content")
+                repo.create_extraction(project.id, doc.id, "f1", "TEXT", "v1")
+                raise ValueError("parse failed")
+        assert repo.list_project_documents(project.id) == []
+        assert repo.list_extractions_by_project(project.id) == []
+
+    def test_identity_map_serves_reads_by_id(self, repo):
+        from sqlalchemy import event
+        project = repo.create_project("Test")
+        statements = []
+        event.listen(repo.engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+        with repo.unit_of_work():
+            first = repo.get_project(project.id)
+            count = len(statements)
+            assert repo.get_project(project.id) is first
+            assert len(statements) == count
+
+    def test_nested_unit_joins_outer(self, repo):
+        project = repo.create_project("Test")
+        with pytest.raises(RuntimeError):
+            with repo.unit_of_work():
+                with repo.unit_of_work():
+                    repo.update_project(project.id, name="Renamed")
+                assert repo.get_project(project.id).name == "Renamed"
+                raise RuntimeError("abort")
+        assert repo.get_project(project.id).name == "Test"
+
+    def test_failed_operation_fails_unit(self, repo):
+        project = repo.create_project("Test")
+        with pytest.raises(RuntimeError):
+            with repo.unit_of_work():
+                repo.create_project("Kept?")
+                try:
+                    repo.create_extraction(project.id, None, "f1", "TEXT", "v1")
+                except Exception:
+                    pass
+        assert [p.name for p in repo.list_projects()] == ["Test"]
+        assert not repo.in_unit_of_work
+
+    def test_parse_cache_race_keeps_unit(self, repo, monkeypatch):
+        from sqlalchemy.orm import Query
+        args = dict(file_type="txt", file_path="/tmp/a.txt", file_size=1, content_text="Text",
+                    parsed_metadata={}, chunk_config="c", chunk_spans=[])
+        repo.save_parsed_content("hash", **args)
+
+        # The lookup misses, as if a concurrent ingest committed the entry
+        # between it and the insert
+        first = Query.first
+        misses = []
+
+        def first_missing_once(query):
+            if not misses:
+                misses.append(query)
+                return None
+            return first(query)
+        monkeypatch.setattr(Query, "first", first_missing_once)
+
+        with repo.unit_of_work():
+            project = repo.create_project("Test")
+            entry = repo.save_parsed_content("hash", **dict(args, file_path="/tmp/b.txt"))
+        assert entry.file_path == "/tmp/a.txt"
+        assert repo.get_project(project.id) is not None
+
+
+class TestSingleWriter:
+
+    @pytest.fixture
+    def file_repo(self, tmp_path):
+        db = DatabaseRepository(f"sqlite:///{tmp_path / 'writer.db'}", single_writer=True)
+        yield db
+        db.close()
+
+    def test_enabled_for_file_databases_only(self, repo, file_repo):
+        assert repo._writer is None
+        assert file_repo._writer is not None
+
+    def test_concurrent_writes_from_threads(self, file_repo):
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            projects = list(pool.map(lambda i: file_repo.create_project(f"P{i}"), range(40)))
+        assert len({p.id for p in projects}) == 40
+        assert len(file_repo.list_projects(limit=100)) == 40
+
+    def test_submit_write_returns_future(self, file_repo):
+        project = file_repo.create_project("Test")
+        doc = file_repo.create_document(project.id, "t.pdf", "pdf", "/tmp/t.pdf", 100, "Content")
+        futures = [
+            file_repo.submit_write(file_repo.create_chunks_bulk, [
+                {'document_id': doc.id, 'chunk_index': i, 'text': f"Chunk {i}"}
+            ])
+            for i in range(5)
+        ]
+        assert all(f.result(timeout=10) for f in futures)
+        assert len(file_repo.get_document_chunks(doc.id)) == 5
+
+    def test_failing_write_does_not_affect_its_group(self, file_repo):
+        project = file_repo.create_project("Test")
+        good = file_repo.submit_write(file_repo.create_project, "Kept")
+        bad = file_repo.submit_write(file_repo.create_extraction, project.id, None, "f1", "TEXT", "v1")
+        with pytest.raises(Exception):
+            bad.result(timeout=10)
+        assert good.result(timeout=10).name == "Kept"
+        assert sorted(p.name for p in file_repo.list_projects()) == ["Kept", "Test"]
+
+    def test_failing_single_write_runs_once(self, file_repo):
+        calls = []
+
+        def failing(repo):
+            calls.append(1)
+            raise ValueError("bad write")
+
+        with pytest.raises(ValueError):
+            file_repo.submit_write(failing).result(timeout=10)
+        assert len(calls) == 1
+
+    def test_unit_of_work_holds_writer_turn(self, file_repo):
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            with file_repo.unit_of_work():
+                file_repo.create_project("In unit")
+                queued = pool.submit(file_repo.create_project, "Queued")
+                with pytest.raises(TimeoutError):
+                    queued.result(timeout=0.2)
+            assert queued.result(timeout=10).name == "Queued"
+        assert sorted(p.name for p in file_repo.list_projects()) == ["In unit", "Queued"]
+
+    def test_units_of_work_from_threads(self, file_repo):
+        from concurrent.futures import ThreadPoolExecutor
+
+        def unit(i):
+            with file_repo.unit_of_work():
+                project = file_repo.create_project(f"P{i}")
+                file_repo.update_project(project.id, description="set")
+            return project.id
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            ids = list(pool.map(unit, range(20)))
+        assert len(set(ids)) == 20
+        assert all(file_repo.get_project(i).description == "set" for i in ids)
+
+    def test_close_finishes_queued_writes(self, tmp_path):
+        url = f"sqlite:///{tmp_path / 'close.db'}"
+        db = DatabaseRepository(url, single_writer=True)
+        futures = [db.submit_write(db.create_project, f"P{i}") for i in range(10)]
+        db.close()
+        assert all(f.done() for f in futures)
+        assert len(DatabaseRepository(url, single_writer=False).list_projects()) == 10
+
+
+class TestBlobStorage:
+
+    @pytest.fixture
+    def blob_repo(self, tmp_path):
+        return DatabaseRepository("sqlite:///", blob_dir=str(tmp_path / "blobs"))
+
+    def test_document_text_in_blob_store(self, blob_repo):
+        from src.models.schema import Document
+        project = blob_repo.create_project("Test")
+        doc = blob_repo.create_document(project.id, "t.txt", "txt", "/tmp/t.txt", 100, "Full contract text")
+        assert doc.blob_key is not None
+        session = blob_repo.get_session()
+        try:
+            assert session.query(Document.content_text).filter(Document.id == doc.id).scalar() == ""
+        finally:
+            session.close()
+        assert blob_repo.get_document(doc.id).content_text == "Full contract text"
+        assert blob_repo.get_document_text(doc.id) == "Full contract text"
+
+    def test_chunks_stored_as_spans(self, blob_repo):
+        from src.models.schema import DocumentChunk
+        text = "First clause. Second clause. Third clause."
+        project = blob_repo.create_project("Test")
+        doc = blob_repo.create_document(project.id, "t.txt", "txt", "/tmp/t.txt", 100, text)
+        blob_repo.create_chunks_bulk([
+            {'document_id': doc.id, 'chunk_index': 0, 'text': text[0:13], 'start_offset': 0, 'end_offset': 13},
+            {'document_id': doc.id, 'chunk_index': 1, 'text': text[14:28], 'start_offset': 14, 'end_offset': 28},
+            {'document_id': doc.id, 'chunk_index': 2, 'text': "No span"},
+        ])
+        session = blob_repo.get_session()
+        try:
+            stored = [t for (t,) in session.query(DocumentChunk.text).order_by(DocumentChunk.chunk_index)]
+        finally:
+            session.close()
+        assert stored == ["", "", "No span"]
+        assert [c.text for c in blob_repo.get_document_chunks(doc.id)] == \
+            ["First clause.", "Second clause.", "No span"]
+
+    def test_delete_unreferenced_blobs(self, blob_repo):
+        project = blob_repo.create_project("Test")
+        kept = blob_repo.create_document(project.id, "a.txt", "txt", "/tmp/a.txt", 1, "Kept text")
+        orphan = blob_repo.blobs.put("Orphaned text")
+        assert blob_repo.delete_unreferenced_blobs() == 0  # Too recent
+        assert blob_repo.delete_unreferenced_blobs(min_age_seconds=0) == 1
+        assert not blob_repo.blobs.exists(orphan)
+        assert blob_repo.blobs.exists(kept.blob_key)
+
+
+class TestCitationSpans:
+    def test_span_citations_resolved_in_batch(self, repo):
+        text = "Governing law. This Agreement is governed by the laws of Delaware."
+        project = repo.create_project("Test")
+        doc = repo.create_document(project.id, "t.txt", "txt", "/tmp/t.txt", 100, text)
+        repo.create_chunks_bulk([{'document_id': doc.id, 'chunk_index': 0, 'text': text,
+                                  'start_offset': 0, 'end_offset': len(text)}])
+        chunk = repo.get_document_chunks(doc.id)[0]
+        first = repo.create_extraction(project.id, doc.id, "governing_law", "TEXT", "Delaware")
+        second = repo.create_extraction(project.id, doc.id, "notes", "TEXT", "n/a")
+        repo.create_citations_bulk([
+            {'extraction_id': first.id, 'document_id': doc.id, 'chunk_id': chunk.id,
+             'citation_text': text[15:], 'start_offset': 15, 'end_offset': len(text), 'relevance_score': 0.9},
+            {'extraction_id': first.id, 'document_id': doc.id, 'chunk_id': chunk.id,
+             'citation_text': text[:14], 'start_offset': 0, 'end_offset': 14, 'relevance_score': 0.2},
+        ])
+        repo.create_citation(second.id, doc.id, "Inline citation text")
+
+        citations = repo.get_citations_for_extractions([first.id, second.id])
+        assert [c.citation_text for c in citations[first.id]] == [text[15:], "Governing law."]
+        assert [c.citation_text for c in citations[second.id]] == ["Inline citation text"]
+        assert repo.get_citations_for_extraction(first.id)[0].start_offset == 15
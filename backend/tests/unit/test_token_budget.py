@@ -0,0 +1,88 @@
+"""
+Unit tests for offline token estimation and prompt packing.
+"""
+import os
+import sys
+
+# Add parent directories to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.services.token_budget import (
+    CONTEXT_GAP, context_budget, estimate_tokens, pack_context,
+)
+
+
+def _chunks(text, size):
+    return [
+        {'text': text[start:start + size], 'start_offset': start, 'end_offset': min(len(text), start + size)}
+        for start in range(0, len(text), size)
+    ]
+
+
+class TestEstimateTokens:
+
+    def test_empty_text(self):
+        assert estimate_tokens("") == 0
+        assert estimate_tokens(None) == 0
+
+    def test_common_words_are_one_token(self):
+        assert estimate_tokens("the party shall pay") == 4
+
+    def test_long_words_numbers_and_punctuation(self):
+        # indemnification: 15 letters -> 3 tokens; 2024 -> 2; "-" and "." -> 1 each
+        assert estimate_tokens("indemnification 2024-01.") == 3 + 2 + 1 + 1 + 1
+
+    def test_english_prose_ratio(self):
+        text = "The Supplier shall deliver the Products to the Buyer's facility within thirty (30) days. " * 20
+        chars_per_token = len(text) / estimate_tokens(text)
+        assert 3.5 < chars_per_token < 5.5
+
+
+class TestContextBudget:
+
+    def test_reserves_prompt_tokens(self, monkeypatch):
+        monkeypatch.delenv("GROQ_CONTEXT_TOKENS", raising=False)
+        assert 0 < context_budget('groq') < 8000
+        assert context_budget('gemini') > context_budget('groq') > context_budget('llm')
+
+    def test_env_override(self, monkeypatch):
+        monkeypatch.setenv("GROQ_CONTEXT_TOKENS", "20000")
+        assert context_budget('groq') > 15000
+        monkeypatch.setenv("GROQ_CONTEXT_TOKENS", "lots")
+        assert context_budget('groq') < 8000
+
+
+class TestPackContext:
+
+    TEXT = " ".join(f"Clause {i} sets out obligation number {i} of the supplier." for i in range(200))
+
+    def test_whole_document_when_it_fits(self):
+        assert pack_context(self.TEXT, _chunks(self.TEXT, 500), 100000) == self.TEXT
+
+    def test_respects_budget(self):
+        packed = pack_context(self.TEXT, _chunks(self.TEXT, 500), 300)
+        passages = packed.split(CONTEXT_GAP)
+        assert sum(estimate_tokens(p) for p in passages) <= 300
+        assert self.TEXT.startswith(passages[0])
+        positions = [self.TEXT.index(p) for p in passages]
+        assert positions == sorted(positions)
+
+    def test_priority_chunks_first_in_document_order(self):
+        chunks = _chunks(self.TEXT, 500)
+        packed = pack_context(self.TEXT, chunks, 300, priority_chunks=[chunks[-1]])
+        passages = packed.split(CONTEXT_GAP)
+        assert passages[-1] == chunks[-1]['text']
+        assert self.TEXT.startswith(passages[0])
+
+    def test_overlapping_chunks_are_merged(self):
+        chunks = [
+            {'text': self.TEXT[0:400], 'start_offset': 0, 'end_offset': 400},
+            {'text': self.TEXT[300:700], 'start_offset': 300, 'end_offset': 700},
+        ]
+        assert pack_context(self.TEXT, chunks, 250) == self.TEXT[:700]
+
+    def test_truncates_oversized_chunk(self):
+        chunks = [{'text': self.TEXT, 'start_offset': 0, 'end_offset': len(self.TEXT)}]
+        packed = pack_context(self.TEXT + " tail", chunks, 50)
+        assert 0 < estimate_tokens(packed) <= 50
+        assert self.TEXT.startswith(packed)
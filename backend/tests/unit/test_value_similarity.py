@@ -0,0 +1,53 @@
+"""
+Unit tests for near-duplicate detection of extracted values.
+"""
+import os
+import sys
+
+# Add parent directories to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.services.value_similarity import (
+    MinHashIndex, canonical_value, clusters, near_duplicate_pairs, similarity,
+)
+
+
+class TestCanonicalValue:
+
+    def test_case_whitespace_and_edge_punctuation(self):
+        assert canonical_value("  State of  Delaware. ") == "state of delaware"
+        assert canonical_value("STATE OF DELAWARE") == canonical_value("state of delaware;")
+
+    def test_inner_punctuation_kept(self):
+        assert canonical_value("$1,000.00") == "$1,000.00"
+
+
+class TestNearDuplicates:
+
+    def test_similar_values_are_candidates(self):
+        values = [
+            "the laws of the state of delaware",
+            "the laws of the state of delawere",
+            "net 30 days from receipt of invoice",
+        ]
+        pairs = near_duplicate_pairs(values)
+        assert (0, 1) in pairs
+        assert pairs[(0, 1)] == similarity(values[0], values[1])
+        assert (0, 2) not in pairs and (1, 2) not in pairs
+
+    def test_top_k_bounds_candidates(self):
+        values = [f"payment due within {n} days of invoice" for n in range(10, 40)]
+        candidates = MinHashIndex(values).candidates(top_k=2)
+        # The values are all alike, but each keeps only its two nearest
+        assert 0 < len(candidates) <= 2 * len(values)
+        assert all(0 < estimate <= 1 for estimate in candidates.values())
+
+    def test_single_value(self):
+        assert near_duplicate_pairs(["only"]) == {}
+
+
+class TestClusters:
+
+    def test_connected_pairs_above_threshold(self):
+        pairs = {(0, 1): 0.9, (1, 2): 0.85, (3, 4): 0.4}
+        assert clusters(5, pairs, threshold=0.8) == [[0, 1, 2]]
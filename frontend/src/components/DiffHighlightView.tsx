@@ -22,6 +22,7 @@ interface DiffField {
     confidence: number;
   }>;
   document_values: Record<string, { value: string; confidence: number; document_id: string }>;
+  value_pairs: Array<{ value_a: string; value_b: string; doc_a: string; doc_b: string; similarity: number }>;
   similarity_pairs: Array<{ doc_a: string; doc_b: string; similarity: number }>;
 }
 
@@ -238,6 +239,36 @@ const DiffHighlightView: React.FC<DiffHighlightViewProps> = ({ projectId }) => {
                     </div>
                   </div>
 
+                  {/* Similar Values */}
+                  {field.value_pairs.length > 0 && (
+                    <div>
+                      <p className="text-xs font-medium text-gray-500 uppercase mb-2">Similar Values</p>
+                      <div className="grid grid-cols-1 sm:grid-cols-2 gap-2">
+                        {field.value_pairs.map((pair, idx) => (
+                          <div
+                            key={idx}
+                            className="flex items-center justify-between bg-gray-50 rounded p-2 text-xs"
+                          >
+                            <span className="text-gray-700 truncate flex-1" title={`${pair.doc_a} vs ${pair.doc_b}`}>
+                              "{pair.value_a}" vs "{pair.value_b}"
+                            </span>
+                            <span
+                              className={`ml-2 font-semibold ${
+                                pair.similarity > 0.8
+                                  ? "text-green-600"
+                                  : pair.similarity > 0.5
+                                    ? "text-yellow-600"
+                                    : "text-red-600"
+                              }`}
+                            >
+                              {(pair.similarity * 100).toFixed(0)}%
+                            </span>
+                          </div>
+                        ))}
+                      </div>
+                    </div>
+                  )}
+
                   {/* Similarity Pairs */}
                   {field.similarity_pairs.length > 0 && (
                     <div>